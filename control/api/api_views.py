@@ -1,21 +1,37 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import hashlib
 from datetime import datetime
-import qrcode
-from io import BytesIO
-from email.mime.image import MIMEImage
-from django.http import HttpResponse
-from django.core.mail import EmailMultiAlternatives
+import tempfile
+import uuid
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse, JsonResponse
 from django.conf import settings
-from django.db.models import Q
-from django.template.loader import render_to_string
+from django.db import transaction
+from django.db.models import Q, Count, Min, Max
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.http import condition
+from django.utils.decorators import method_decorator
+from django.utils.cache import get_conditional_response
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView, ListAPIView, RetrieveAPIView
 from control.models import (
-    Sede, Empleado, RegistroAsistencia, CorreoInstitucional, TipoDocumento, AreaTrabajo, TipoNovedad, NovedadAsistencia, Horario
+    Sede, Empleado, RegistroAsistencia, CorreoInstitucional, TipoDocumento, AreaTrabajo, TipoNovedad, NovedadAsistencia, Horario, EmpleadoBusqueda,
+    EnvioCorreoQR,
 )
+from control.services.attendance_state import refresh_attendance_state
+from control.services.daily_rollup import refresh_daily_rollups, rollup_day
+from control.services.record_counts import count_total_records, count_filtered_records
+from control.services.local_dates import local_day_start, local_day_range
+from control.services.qr_codes import qr_cache, qr_cache_key
+from control.services.qr_sheets import qr_sheet_employees, stream_qr_zip, stream_qr_sheet_html
+from control.services.qr_mail import enqueue_qr_emails
+from control.services.employee_search import normalize_search_text, search_employee_ids, filter_employee_search
 from .serializers import *
-from email.mime.image import MIMEImage
+from .exports import stream_records_csv, write_records_xlsx
+from .events import stream_record_events, latest_record_id
 
 # ---------------------
 # Sedes API
@@ -50,18 +66,122 @@ class SedeRegistroCountView(APIView):
 # ---------------------
 
 class EmpleadoListCreateView(ListAPIView):
-    # Info: Lista todos los empleados o permite crear uno nuevo
-    queryset = Empleado.objects.all().order_by(
-        'primer_apellido', 'segundo_apellido', 'primer_nombre', 'segundo_nombre')
+    # Info: Lista todos los empleados (una sola consulta con tipo de documento y correo); ?activo=true|false filtra por estado
     serializer_class = EmpleadoSerializer
 
+    def get_queryset(self):
+        queryset = employee_queryset()
+        activo = _parse_activo(self.request.GET.get("activo", ""))
+        return queryset if activo is None else queryset.filter(activo=activo)
+
 
 class EmpleadoDetailView(RetrieveAPIView):
     # Info: Obtiene un empleado específico
-    queryset = Empleado.objects.all()
+    queryset = employee_queryset()
     serializer_class = EmpleadoSerializer
 
 
+def _parse_activo(value: str) -> bool | None:
+    # Info: Filtro opcional por estado del empleado ("true"/"1" o "false"/"0"; otro valor no filtra)
+    return {"true": True, "1": True, "false": False, "0": False}.get(value.lower())
+
+
+def _employee_options_rows(request) -> list[tuple]:
+    '''
+    Info:
+        Filas de la lista compacta de empleados (EMPLOYEE_OPTION_FIELDS), leídas una vez por solicitud:
+        sirven para calcular el ETag y, si la lista cambió, para la respuesta.
+
+    Params:
+        request: Solicitud en curso.
+
+    Return:
+        list[tuple]: Filas en el orden del listado (apellidos y nombres).
+    '''
+
+    if not hasattr(request, "_employee_options_rows"):
+        queryset = Empleado.objects.order_by("primer_apellido", "segundo_apellido", "primer_nombre", "segundo_nombre", "id")
+        activo = _parse_activo(request.GET.get("activo", ""))
+        if activo is not None:
+            queryset = queryset.filter(activo=activo)
+        request._employee_options_rows = list(queryset.values_list(*EMPLOYEE_OPTION_FIELDS))
+    return request._employee_options_rows
+
+
+def _employee_options_etag(request) -> str:
+    # Warn: Hash de las columnas que se devuelven: la tabla empleados no es administrada y otro sistema puede
+    # renombrar o desactivar empleados sin cambiar la cantidad, el id máximo ni empleados_busqueda
+    return hashlib.sha256(repr(_employee_options_rows(request)).encode()).hexdigest()
+
+
+@method_decorator(condition(etag_func=_employee_options_etag), name="get")
+class EmpleadoOpcionesView(APIView):
+    # Info: Lista compacta de empleados (id, nombre completo, estado) para selects y filtros; responde 304 si no cambió
+
+    def get(self, request):
+        response = Response(serialize_employee_options(_employee_options_rows(request)))
+        response["Cache-Control"] = "private, no-cache"  # Info: El navegador guarda la lista y la revalida en cada uso
+        return response
+
+
+# Info: Resultados por página del buscador de empleados (limit por defecto y tope)
+EMPLOYEE_SEARCH_LIMIT, EMPLOYEE_SEARCH_MAX_LIMIT = 20, 100
+
+
+class EmpleadoBuscarView(APIView):
+    # Info: Buscador de empleados (typeahead) por nombres o documento, sin tildes, paginado por cursor (nombre, id)
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get("limit", EMPLOYEE_SEARCH_LIMIT)), 1), EMPLOYEE_SEARCH_MAX_LIMIT)
+            area = int(request.GET["area"]) if request.GET.get("area") else None
+        except ValueError:
+            return Response({"error": "Parámetros inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Info: Sobre empleados_busqueda: texto normalizado para el filtro, nombre normalizado para el orden
+        queryset = filter_employee_search(EmpleadoBusqueda.objects.all(), request.GET.get("q", ""))
+        activo = _parse_activo(request.GET.get("activo", ""))
+        if activo is not None:
+            queryset = queryset.filter(fk_empleado__activo=activo)
+        if area is not None:
+            queryset = queryset.filter(fk_empleado__grupos__id=area)
+
+        # Info: Página siguiente a partir del cursor, recorriendo emp_busqueda_nombre_idx sin OFFSET
+        if cursor := _decode_employee_cursor(request.GET.get("cursor", "")):
+            nombre, employee_id = cursor
+            queryset = queryset.filter(Q(nombre__gt=nombre) | Q(nombre=nombre, fk_empleado_id__gt=employee_id))
+
+        rows = list(
+            queryset.order_by("nombre", "fk_empleado_id")
+            .values_list("nombre", *(f"fk_empleado__{field}" for field in EMPLOYEE_OPTION_FIELDS), "fk_empleado__numero_documento")
+            [:limit + 1]
+        )
+        page = rows[:limit]
+
+        results = serialize_employee_options(row[1:-1] for row in page)
+        for result, row in zip(results, page):
+            result["numero_documento"] = row[-1]
+
+        return Response({
+            "results": results,
+            "next": _encode_employee_cursor(page[-1][0], page[-1][1]) if len(rows) > limit else None,
+        })
+
+
+def _encode_employee_cursor(nombre: str, employee_id: int) -> str:
+    # Info: Cursor opaco con la llave de orden del buscador (nombre normalizado + id)
+    return urlsafe_b64encode(f"{employee_id}|{nombre}".encode()).decode()
+
+
+def _decode_employee_cursor(token: str) -> tuple | None:
+    # Info: Un cursor vacío o inválido inicia desde la primera página
+    try:
+        employee_id, nombre = urlsafe_b64decode(token.encode()).decode().split("|", 1)
+        return nombre, int(employee_id)
+    except ValueError:
+        return None
+
+
 # ---------------------
 # Registros de Asistencia API
 # ---------------------
@@ -72,104 +192,419 @@ class RegistroAsistenciaListCreateView(ListCreateAPIView):
     def get(self, request):
         # Parámetros estándar de DataTables
         draw = int(request.GET.get("draw", 1))
-        start = int(request.GET.get("start", 0))
-        length = int(request.GET.get("length", 15))
-        search_value = request.GET.get("search[value]", "").strip()
-
-        # Parámetros de filtro personalizados
-        emp_id = request.GET.get("employee", "")
-        start_date = request.GET.get("start_date", "")
-        end_date = request.GET.get("end_date", "")
-        description = request.GET.get("description", "")
-        work_area = request.GET.get("work_area", "")
-        sede = request.GET.get("sede", "")
-
-        # Query base
-        queryset = (
-            RegistroAsistencia.objects
-            .select_related("fk_empleado", "lugar_registro")
-            .prefetch_related("fk_empleado__grupos")
-            .order_by("-fecha_hora_registro")
+
+        # Query base (orden total por fecha e id, atendido por reg_asist_fecha_idx)
+        queryset = _filter_assistance_records(
+            RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id"), request.GET)
+
+        # Conteos: total estimado y filtrado memorizado por firma de filtros (sin recorrer la tabla en cada draw)
+        total_records, approximate = count_total_records()
+        if signature := _filters_signature(request.GET):
+            filtered_records, approximate = count_filtered_records(queryset, signature)
+        else:
+            filtered_records = total_records
+
+        data, cursor = _paginate_records(queryset, request.GET)
+        return Response({
+            "draw": draw,
+            "recordsTotal": total_records,
+            "recordsFiltered": filtered_records,
+            "recordsApproximate": approximate,
+            "data": data,
+            "cursor": cursor,
+        })
+
+
+# Info: Descripciones posibles de un registro (búsqueda global)
+RECORD_DESCRIPTIONS = ("Entrada", "Salida")
+
+# Info: Parámetros GET que filtran el listado de registros (definen la firma del conteo memorizado)
+RECORD_FILTER_PARAMS = ("employee", "start_date", "end_date", "description", "work_area", "sede", "search[value]")
+
+
+def _filter_assistance_records(queryset, params):
+    '''
+    Info:
+        Aplica al listado de registros de asistencia los filtros del tablero (empleado, fechas, descripción,
+        área de trabajo, sede y búsqueda global de DataTables).
+
+    Params:
+        queryset (QuerySet): Registros de asistencia a filtrar.
+        params (QueryDict): Parámetros GET de la solicitud.
+
+    Return:
+        QuerySet: Registros filtrados.
+    '''
+
+    emp_id = params.get("employee", "")
+    start_date = params.get("start_date", "")
+    end_date = params.get("end_date", "")
+    description = params.get("description", "")
+    work_area = params.get("work_area", "")
+    sede = params.get("sede", "")
+    search_value = params.get("search[value]", "").strip()
+
+    if emp_id:
+        queryset = queryset.filter(fk_empleado_id=emp_id)
+
+    # Rango de fechas como límites de día local (semiabierto), atendido por los índices sobre fecha_hora_registro
+    if start_date:
+        try:
+            fecha_inicio = datetime.strptime(start_date, "%Y-%m-%d").date()
+            queryset = queryset.filter(fecha_hora_registro__gte=local_day_start(fecha_inicio))
+        except ValueError:
+            pass
+
+    if end_date:
+        try:
+            fecha_fin = datetime.strptime(end_date, "%Y-%m-%d").date()
+            queryset = queryset.filter(fecha_hora_registro__lt=local_day_range(fecha_fin)[1])
+        except ValueError:
+            pass
+
+    if description:
+        queryset = queryset.filter(
+            descripcion_registro__iexact=description)
+
+    if work_area:
+        queryset = queryset.filter(fk_empleado__grupos__id=work_area)
+
+    if sede:
+        queryset = queryset.filter(lugar_registro_id=sede)
+
+    # Filtro de búsqueda global
+    if search_value:
+        queryset = queryset.filter(_search_records_q(search_value))
+
+    return queryset
+
+
+def _search_records_q(search_value: str) -> Q:
+    '''
+    Info:
+        Traduce la búsqueda global de DataTables a filtros por id sobre registros_asistencia.
+        Los empleados (nombres y documento, sin tildes y en cualquier orden), las sedes y las descripciones
+        coincidentes se resuelven primero en sus tablas pequeñas; el listado filtra luego por esos ids
+        con los índices de la tabla de registros en lugar de un ILIKE por fila sobre tres tablas unidas.
+
+    Params:
+        search_value (str): Término de la búsqueda global.
+
+    Return:
+        Q: Condición sobre los registros (vacía si nada coincide).
+    '''
+
+    term = normalize_search_text(search_value)
+    employee_ids = search_employee_ids(search_value)
+    sede_ids = [
+        sede_id for sede_id, ubicacion in Sede.objects.values_list("id", "ubicacion")
+        if term in normalize_search_text(ubicacion)
+    ]
+    descriptions = [description for description in RECORD_DESCRIPTIONS if term in normalize_search_text(description)]
+
+    condition = Q(pk__in=[])
+    if employee_ids:
+        condition |= Q(fk_empleado_id__in=employee_ids)
+    if sede_ids:
+        condition |= Q(lugar_registro_id__in=sede_ids)
+    if descriptions:
+        condition |= Q(descripcion_registro__in=descriptions)
+    return condition
+
+
+def _filters_signature(params) -> str:
+    # Info: Firma de los filtros aplicados al listado; vacía si no hay filtros
+    values = [params.get(key, "").strip() for key in RECORD_FILTER_PARAMS]
+    return "|".join(values) if any(values) else ""
+
+
+def _paginate_records(queryset, params, default_length: int = 15) -> tuple[list, dict]:
+    '''
+    Info:
+        Obtiene una página de registros por cursor (costo constante) o por desplazamiento (start/length,
+        compatibilidad con DataTables), como filas planas (.values) para el serializador rápido.
+        El tamaño de página se acota con RECORD_PAGE_MAX_LENGTH; length <= 0 ("todos" en DataTables) usa el tope.
+
+    Params:
+        queryset (QuerySet): Registros filtrados, ordenados por (-fecha_hora_registro, -id).
+        params (QueryDict): Parámetros GET (start, length, cursor, direction).
+        default_length (int): Tamaño de página si no se indica length.
+
+    Return:
+        tuple: (registros serializados, cursores {"previous", "next"} de las páginas vecinas).
+    '''
+
+    max_length = getattr(settings, "RECORD_PAGE_MAX_LENGTH", 500)
+    start = max(int(params.get("start", 0)), 0)
+    length = int(params.get("length", default_length))
+    length = max_length if length <= 0 else min(length, max_length)
+
+    # Parámetros de paginación por cursor (opcionales; sin cursor se usa start/length)
+    cursor = _decode_record_cursor(params.get("cursor", ""))
+    direction = params.get("direction", "next")
+
+    rows = queryset.values(*RECORD_ROW_FIELDS)
+    if cursor:
+        records, has_previous, has_next = _paginate_by_cursor(rows, cursor, direction, length)
+    else:
+        records = list(rows[start:start + length + 1])
+        has_previous, has_next = start > 0, len(records) > length
+        records = records[:length]
+
+    return serialize_record_rows(records), {
+        "previous": _encode_record_cursor(records[0]) if records and has_previous else None,
+        "next": _encode_record_cursor(records[-1]) if records and has_next else None,
+    }
+
+
+def _paginate_by_cursor(queryset, cursor: tuple, direction: str, length: int) -> tuple[list, bool, bool]:
+    '''
+    Info:
+        Obtiene la página anterior o siguiente a un cursor (fecha_hora_registro, id) sin OFFSET:
+        la consulta parte del cursor en el índice, por lo que su costo no depende de la profundidad.
+
+    Params:
+        queryset (QuerySet): Registros filtrados, ordenados por (-fecha_hora_registro, -id).
+        cursor (tuple): Llave (fecha_hora_registro, id) del primer o último registro de la página actual.
+        direction (str): "next" para registros más antiguos que el cursor, "prev" para más recientes.
+        length (int): Tamaño de página.
+
+    Return:
+        tuple: (registros, hay_anterior, hay_siguiente) con los registros en el orden del listado.
+    '''
+
+    fecha, record_id = cursor
+
+    # Info: La condición redundante sobre la fecha acota el recorrido del índice; el OR resuelve los empates
+    if direction == "prev":
+        page = list(
+            queryset.filter(Q(fecha_hora_registro__gt=fecha) | Q(fecha_hora_registro=fecha, id__gt=record_id))
+            .filter(fecha_hora_registro__gte=fecha)
+            .order_by("fecha_hora_registro", "id")[:length + 1]
         )
+        has_more = len(page) > length
+        return page[:length][::-1], has_more, True
 
-        # Filtros personalizados
-        if emp_id:
-            queryset = queryset.filter(fk_empleado_id=emp_id)
+    page = list(
+        queryset.filter(Q(fecha_hora_registro__lt=fecha) | Q(fecha_hora_registro=fecha, id__lt=record_id))
+        .filter(fecha_hora_registro__lte=fecha)[:length + 1]
+    )
+    return page[:length], True, len(page) > length
 
-        if start_date:
-            try:
-                fecha_inicio = datetime.strptime(start_date, "%Y-%m-%d")
-                queryset = queryset.filter(fecha_hora_registro__date__gte=fecha_inicio)
-            except ValueError:
-                pass
 
-        if end_date:
-            try:
-                fecha_fin = datetime.strptime(end_date, "%Y-%m-%d")
-                queryset = queryset.filter(
-                    fecha_hora_registro__date__lte=fecha_fin)
-            except ValueError:
-                pass
+def _encode_record_cursor(record: dict) -> str:
+    # Info: Cursor opaco con la llave de orden del registro (fecha ISO + id)
+    key = f"{record['fecha_hora_registro'].isoformat()}|{record['id']}"
+    return urlsafe_b64encode(key.encode()).decode()
 
-        if description:
-            queryset = queryset.filter(
-                descripcion_registro__iexact=description)
 
-        if work_area:
-            queryset = queryset.filter(fk_empleado__grupos__id=work_area)
+def _decode_record_cursor(token: str) -> tuple | None:
+    # Info: Un cursor vacío o inválido hace que el listado use la paginación por desplazamiento
+    try:
+        fecha, record_id = urlsafe_b64decode(token.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha), int(record_id)
+    except ValueError:
+        return None
 
-        if sede:
-            queryset = queryset.filter(lugar_registro_id=sede)
 
-        # Filtro de búsqueda global
-        if search_value:
-            queryset = queryset.filter(
-                Q(fk_empleado__primer_nombre__icontains=search_value)
-                | Q(fk_empleado__primer_apellido__icontains=search_value)
-                | Q(descripcion_registro__icontains=search_value)
-                | Q(lugar_registro__ubicacion__icontains=search_value)
-            )
+# Info: Tamaño de página por defecto de los registros de un día (sin length)
+DAY_RECORDS_PAGE_LENGTH = 100
+
+
+class RegistroAsistenciaPorDiaView(APIView):
+    # Info: Registros de un día local (tabla del inicio), paginados con el mismo contrato del listado (DataTables y cursor)
+
+    def get(self, request):
+        fecha_param = request.GET.get("fecha")
+        if fecha_param:
+            try:
+                fecha = datetime.strptime(fecha_param, "%Y-%m-%d").date()
+            except ValueError:
+                return Response({"error": "Fecha inválida (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            fecha = timezone.localdate()  # Por defecto, el día actual (hora local)
 
-        total_records = RegistroAsistencia.objects.count()
-        filtered_records = queryset.count()
+        # Día local como rango semiabierto de instantes (usa reg_asist_fecha_idx)
+        inicio, fin = local_day_range(fecha)
+        queryset = (
+            RegistroAsistencia.objects
+            .filter(fecha_hora_registro__gte=inicio, fecha_hora_registro__lt=fin)
+            .order_by("-fecha_hora_registro", "-id")
+        )
 
-        # Paginación
-        queryset = queryset[start:start + length]
-        serializer = self.serializer_class(queryset, many=True)
+        # Conteo del día acotado y memorizado (RECORD_COUNT_CAP / RECORD_COUNT_CACHE_TTL)
+        total_records, approximate = count_filtered_records(queryset, f"dia|{fecha.isoformat()}")
+        data, cursor = _paginate_records(queryset, request.GET, default_length=DAY_RECORDS_PAGE_LENGTH)
 
         return Response({
-            "draw": draw,
+            "draw": int(request.GET.get("draw", 1)),
             "recordsTotal": total_records,
-            "recordsFiltered": filtered_records,
-            "data": serializer.data
+            "recordsFiltered": total_records,
+            "recordsApproximate": approximate,
+            "data": data,
+            "cursor": cursor,
         })
 
 
-class RegistroAsistenciaPorDiaView(ListAPIView):
-    serializer_class = RegistroAsistenciaSerializer
+# Info: Franjas horarias de las gráficas del inicio (de 5 a. m. a 11 p. m., cada 2 horas)
+DAY_BUCKET_START, DAY_BUCKET_END, DAY_BUCKET_STEP = 5, 23, 2
 
-    def get_queryset(self):
-        fecha_param = self.request.query_params.get('fecha')
+
+class RegistroAsistenciaResumenDiaView(APIView):
+    # Info: Conteos de entradas y salidas de un día local por franja horaria, sede y área (gráficas del inicio)
+
+    def get(self, request):
+        fecha_param = request.GET.get("fecha")
         if fecha_param:
             try:
-                fecha = datetime.strptime(fecha_param, '%Y-%m-%d').date()
+                fecha = datetime.strptime(fecha_param, "%Y-%m-%d").date()
             except ValueError:
-                return RegistroAsistencia.objects.none()
+                return Response({"error": "Fecha inválida (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
         else:
-            fecha = datetime.now().date()  # Por defecto, el día actual
-
-        return (
-            RegistroAsistencia.objects
-            .filter(fecha_hora_registro__date=fecha)
-            .order_by('-fecha_hora_registro')
+            fecha = timezone.localdate()
+
+        inicio, fin = local_day_range(fecha)
+        records = RegistroAsistencia.objects.filter(fecha_hora_registro__gte=inicio, fecha_hora_registro__lt=fin)
+
+        # Info: Un GROUP BY (hora local, descripción, sede) resume todo el día en pocas filas
+        grouped = (
+            records
+            .annotate(hora=ExtractHour("fecha_hora_registro"))
+            .values("hora", "descripcion_registro", "lugar_registro_id")
+            .annotate(registros=Count("id"))
+            .order_by()
         )
 
+        rangos = {
+            hour: {"hora_inicio": hour, "hora_fin": hour + DAY_BUCKET_STEP, "entradas": 0, "salidas": 0}
+            for hour in range(DAY_BUCKET_START, DAY_BUCKET_END, DAY_BUCKET_STEP)
+        }
+        fuera_de_rango = {"entradas": 0, "salidas": 0}
+        sedes = {}
+        total = 0
+        for row in grouped:
+            key = _summary_key(row["descripcion_registro"])
+            total += row["registros"]
+            in_range = DAY_BUCKET_START <= row["hora"] < DAY_BUCKET_END
+            bucket = rangos[row["hora"] - (row["hora"] - DAY_BUCKET_START) % DAY_BUCKET_STEP] if in_range else fuera_de_rango
+            sede = sedes.setdefault(row["lugar_registro_id"], {"id": row["lugar_registro_id"], "registros": 0, "entradas": 0, "salidas": 0})
+            sede["registros"] += row["registros"]
+            if key:
+                bucket[key] += row["registros"]
+                sede[key] += row["registros"]
+
+        # Info: Nombres de las sedes del día (tabla pequeña)
+        for sede_id, ubicacion, ciudad in Sede.objects.filter(id__in=sedes).values_list("id", "ubicacion", "ciudad"):
+            sedes[sede_id]["sede"] = f"{ubicacion} - {ciudad}"
+
+        # Info: Por área en una consulta aparte: un empleado puede pertenecer a varias áreas
+        areas = [
+            {"id": row["fk_empleado__grupos__id"], "area": row["fk_empleado__grupos__area"], "entradas": row["entradas"], "salidas": row["salidas"]}
+            for row in (
+                records
+                .filter(fk_empleado__grupos__isnull=False)
+                .values("fk_empleado__grupos__id", "fk_empleado__grupos__area")
+                .annotate(
+                    entradas=Count("id", filter=Q(descripcion_registro="Entrada")),
+                    salidas=Count("id", filter=Q(descripcion_registro="Salida")),
+                )
+                .order_by("fk_empleado__grupos__area")
+            )
+        ]
+
+        # Info: Primer y último día con registros (extremos de reg_asist_fecha_idx)
+        extremos = RegistroAsistencia.objects.aggregate(primero=Min("fecha_hora_registro"), ultimo=Max("fecha_hora_registro"))
+
+        return Response({
+            "fecha": fecha.isoformat(),
+            "fecha_min": timezone.localdate(extremos["primero"]).isoformat() if extremos["primero"] else None,
+            "fecha_max": timezone.localdate(extremos["ultimo"]).isoformat() if extremos["ultimo"] else None,
+            "total": total,
+            "rangos": list(rangos.values()),
+            "fuera_de_rango": fuera_de_rango,
+            "sedes": sorted(sedes.values(), key=lambda sede: sede.get("sede", "")),
+            "areas": areas,
+        })
+
+
+def _summary_key(descripcion: str) -> str | None:
+    # Info: Clave del conteo ("entradas" / "salidas") según la descripción del registro
+    return {"Entrada": "entradas", "Salida": "salidas"}.get(descripcion)
+
 
 class RegistroAsistenciaDetailView(RetrieveUpdateDestroyAPIView):
     # Info: Obtiene, actualiza o elimina un registro de asistencia específico
     queryset = RegistroAsistencia.objects.all().order_by('-fecha_hora_registro')
     serializer_class = RegistroAsistenciaSerializer
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Info: Recalcular el estado y el resumen diario del empleado tras editar el registro
+        record = serializer.save()
+        refresh_attendance_state(record.fk_empleado_id)
+        refresh_daily_rollups({record.fk_empleado_id: {rollup_day(record)}})
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Info: Recalcular el estado y el resumen diario del empleado tras eliminar el registro
+        employee_id, day = instance.fk_empleado_id, rollup_day(instance)
+        instance.delete()
+        refresh_attendance_state(employee_id)
+        refresh_daily_rollups({employee_id: {day}})
+
+
+class RegistroAsistenciaExportView(APIView):
+    # Info: Exporta los registros filtrados (mismos filtros del listado) completos, en CSV o XLSX
+
+    def get(self, request):
+        file_format = request.GET.get("file_format", "csv")
+        if file_format not in ("csv", "xlsx"):
+            return Response({"error": "Formato no soportado (csv o xlsx)"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = _filter_assistance_records(
+            RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id"), request.GET)
+        filename = f"registros_asistencia_{timezone.localtime():%Y%m%d_%H%M}.{file_format}"
+
+        # Info: CSV transmitido fila a fila mientras se recorre la consulta
+        if file_format == "csv":
+            response = StreamingHttpResponse(stream_records_csv(queryset), content_type="text/csv; charset=utf-8")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
+
+        # Info: XLSX armado en un archivo temporal (el formato ZIP requiere cerrar el libro) y transmitido por bloques
+        file = tempfile.TemporaryFile()
+        write_records_xlsx(queryset, file)
+        file.seek(0)
+        return FileResponse(
+            file, as_attachment=True, filename=filename,
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+class RegistroAsistenciaEventosView(View):
+    # Info: Flujo SSE de los registros nuevos (vista de Django: la negociación de DRF rechaza text/event-stream)
+
+    def get(self, request):
+        sede_param = request.GET.get("sede")
+        try:
+            sede_id = int(sede_param) if sede_param else None
+            last_id = int(request.headers.get("Last-Event-ID") or request.GET.get("desde") or latest_record_id())
+        except ValueError:
+            return JsonResponse({"error": "Parámetros inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_record_events(
+                last_id, sede_id,
+                poll_seconds=getattr(settings, "RECORD_EVENTS_POLL_SECONDS", 5),
+                max_seconds=getattr(settings, "RECORD_EVENTS_MAX_SECONDS", 300),
+                overlap_seconds=getattr(settings, "RECORD_EVENTS_OVERLAP_SECONDS", 30),
+                max_streams=getattr(settings, "RECORD_EVENTS_MAX_STREAMS", 2) or None,
+            ),
+            content_type="text/event-stream; charset=utf-8",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Info: Sin búfer en un proxy nginx
+        return response
+
 
 # ---------------------
 # Correo Institucional API
@@ -280,124 +715,144 @@ class HorarioDetailView(RetrieveUpdateDestroyAPIView):
 
 
 class QRGeneratorView(APIView):
-    def get(self, request, empleado_id):
-        try:
-            empleado = Empleado.objects.get(id=empleado_id)
-            # Extraer solo el número del documento
-            numero_documento = empleado.numero_documento
-
-            # Crear QR
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(str(numero_documento))
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
+    # Info: Imagen QR del empleado desde la caché direccionada por contenido; responde 304 si el navegador ya la tiene
 
-            # Devolver imagen
-            return HttpResponse(buffer.getvalue(), content_type='image/png')
-
-        except Empleado.DoesNotExist:
+    def get(self, request, empleado_id):
+        numero_documento = Empleado.objects.filter(id=empleado_id).values_list("numero_documento", flat=True).first()
+        if numero_documento is None:
             return Response({"error": "Empleado no encontrado"}, status=404)
 
+        # Info: El ETag es la llave de la caché (hash del contenido y del dibujo): se valida sin dibujar la imagen
+        payload = str(numero_documento)
+        etag = f'"{qr_cache_key(payload)}"'
+        if (not_modified := get_conditional_response(request, etag=etag)) is not None:
+            response = not_modified
+        else:
+            _, png = qr_cache.get_png(payload)
+            response = HttpResponse(png, content_type="image/png")
+            response["ETag"] = etag
 
-class QREmailView(APIView):
-    def post(self, request, empleado_id):
-        try:
-            empleado = Empleado.objects.get(id=empleado_id)
-            correo = CorreoInstitucional.objects.get(fk_empleado=empleado)
-
-            # Crear QR
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(str(empleado.numero_documento))
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-
-            # Email
-            asunto = "Código QR para Control de Asistencia - Unicorsalud"
-
-            cuerpo_texto = f"""
-Estimado/a {empleado.primer_nombre.title()} {empleado.primer_apellido.title()},
-
-Le saludamos cordialmente desde el Sistema de Control de Asistencia de Unicorsalud.
-
-Adjunto a este correo encontrará su código QR personal para el registro de entrada y salida en nuestras instalaciones. Este código es único e intransferible.
-
-INSTRUCCIONES DE USO:
-• Presente el código QR en los lectores ubicados en las entradas principales
-• Mantenga el código visible y en buen estado
-• En caso de pérdida o daño, contacte al departamento de Talento Humano
+        # Info: El documento casi nunca cambia; tras max-age el navegador revalida con If-None-Match
+        response["Cache-Control"] = f"private, max-age={getattr(settings, 'QR_CACHE_MAX_AGE', 86400)}"
+        return response
 
-IMPORTANTE: Este es un correo automático generado por nuestro sistema. Por favor, no responda a este mensaje.
 
-Si tiene alguna consulta o inconveniente, puede contactarnos a través de los canales oficiales de comunicación.
+def _parse_qr_batch_filters(params) -> dict | None:
+    # Info: Filtros de las acciones masivas de QR (sede, area, activo, ids separados por comas); None si son inválidos
+    try:
+        return {
+            "sede_id": int(params["sede"]) if params.get("sede") else None,
+            "area_id": int(params["area"]) if params.get("area") else None,
+            "activo": _parse_activo(str(params.get("activo", ""))),
+            "ids": [int(value) for value in str(params.get("ids", "")).split(",") if value.strip()],
+        }
+    except ValueError:
+        return None
 
-Atentamente,
 
-Sistema de Control de Asistencia
-Unicorsalud
+class QRLoteView(APIView):
+    # Info: Códigos QR de varios empleados (filtros sede, area, activo, ids) en un ZIP de PNG o en una hoja imprimible
 
----
-Este mensaje y sus adjuntos son confidenciales y están dirigidos exclusivamente al destinatario indicado.
-            """
+    def get(self, request):
+        file_format = request.GET.get("file_format", "zip")
+        if file_format not in ("zip", "html"):
+            return Response({"error": "Formato no soportado (zip o html)"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # HTML
-            cuerpo_html = render_to_string(
-                "utilities/mail_qr.html",
-                {"empleado": empleado}
-            )
+        if (filters := _parse_qr_batch_filters(request.GET)) is None:
+            return Response({"error": "Parámetros inválidos"}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Crear email con alternativa HTML
-            email = EmailMultiAlternatives(
-                subject=asunto,
-                body=cuerpo_texto,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[correo.correo_institucional],
-            )
-            email.attach_alternative(cuerpo_html, "text/html")
+        rows = qr_sheet_employees(**filters)
+        filename = f"codigos_qr_{timezone.localtime():%Y%m%d_%H%M}.{file_format}"
 
-            # Adjuntar QR como imagen inline (para cid:qr_code)
-            qr_img = MIMEImage(buffer.getvalue())
-            qr_img.add_header("Content-ID", "<qr_code>")
-            qr_img.add_header("Content-Disposition", "inline", filename=f"QR_Asistencia_{empleado.numero_documento}.png")
-            email.attach(qr_img)
+        # Info: Transmitido por bloques de empleados a medida que se dibujan los códigos
+        if file_format == "zip":
+            response = StreamingHttpResponse(stream_qr_zip(rows.iterator()), content_type="application/zip")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        else:
+            response = StreamingHttpResponse(stream_qr_sheet_html(rows.iterator()), content_type="text/html; charset=utf-8")
+            response["Content-Disposition"] = f'inline; filename="{filename}"'
+        return response
 
-            # Enviar correo
-            email.send()
 
-            return Response({
-                "message": f"Código QR enviado exitosamente a {correo.correo_institucional}",
-                "empleado": f"{empleado.primer_nombre} {empleado.primer_apellido}",
-                "documento": empleado.numero_documento
-            }, status=200)
+class QREmailView(APIView):
+    # Info: Encola el correo con el código QR del empleado y responde de inmediato (lo envía send_qr_emails o qr_mail_worker)
 
-        except Empleado.DoesNotExist:
+    def post(self, request, empleado_id):
+        employees = Empleado.objects.filter(id=empleado_id)
+        if not employees.exists():
             return Response({
                 "error": "Empleado no encontrado",
                 "codigo": "EMPLEADO_NOT_FOUND"
             }, status=404)
-        except CorreoInstitucional.DoesNotExist:
+
+        result = enqueue_qr_emails(employees)
+        if result["sin_correo"]:
             return Response({
                 "error": "El empleado no tiene correo institucional registrado",
                 "codigo": "EMAIL_NOT_FOUND"
             }, status=404)
-        except Exception as e:
-            return Response({
-                "error": f"Error interno del servidor: {str(e)}",
-                "codigo": "INTERNAL_ERROR"
-            }, status=500)
+
+        # Info: Si ya tenía un correo en cola, se informa ese envío en lugar de duplicarlo
+        envio = result["envios"][0] if result["envios"] else (
+            EnvioCorreoQR.objects.filter(fk_empleado_id=empleado_id).latest("id"))
+        return Response({
+            "message": f"Código QR en cola de envío a {envio.destinatario}",
+            "envio": EnvioCorreoQRSerializer(envio).data,
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class QREmailLoteView(APIView):
+    # Info: Encola el correo con el código QR de los empleados filtrados (sede, area, activo, ids) en un lote
+
+    def post(self, request):
+        filters = _parse_qr_batch_filters(request.data)
+        if filters is None:
+            return Response({"error": "Parámetros inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+        # Warn: Sin ningún filtro no se envía a todos los empleados por accidente
+        if not any(value is not None and value != [] for value in filters.values()):
+            return Response({"error": "Indique al menos un filtro (sede, area, activo o ids)"}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = enqueue_qr_emails(Empleado.objects.filter(id__in=qr_sheet_employees(**filters).values("id")))
+        return Response({
+            "lote": result["lote"],
+            "encolados": len(result["envios"]),
+            "sin_correo": result["sin_correo"],
+            "en_cola": result["en_cola"],
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+# Info: Envíos por respuesta del estado de la cola de correos QR (limit por defecto y tope)
+QR_MAIL_STATUS_LIMIT, QR_MAIL_STATUS_MAX_LIMIT = 100, 500
+
+
+class EnvioCorreoQRListView(APIView):
+    # Info: Estado de la cola de correos QR: conteo por estado y últimos envíos (filtros lote, empleado, estado)
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get("limit", QR_MAIL_STATUS_LIMIT)), 1), QR_MAIL_STATUS_MAX_LIMIT)
+            lote = uuid.UUID(request.GET["lote"]) if request.GET.get("lote") else None
+            empleado = int(request.GET["empleado"]) if request.GET.get("empleado") else None
+        except ValueError:
+            return Response({"error": "Parámetros inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = EnvioCorreoQR.objects.all()
+        if lote is not None:
+            queryset = queryset.filter(lote=lote)
+        if empleado is not None:
+            queryset = queryset.filter(fk_empleado_id=empleado)
+        if estado := request.GET.get("estado"):
+            queryset = queryset.filter(estado=estado)
+
+        resumen = {estado: 0 for estado, _ in EnvioCorreoQR.ESTADOS}
+        resumen.update(queryset.order_by().values_list("estado").annotate(total=Count("id")))
+        return Response({
+            "resumen": resumen,
+            "data": EnvioCorreoQRSerializer(queryset.order_by("-id")[:limit], many=True).data,
+        })
+
+
+class EnvioCorreoQRDetailView(RetrieveAPIView):
+    # Info: Estado de un correo QR encolado
+    queryset = EnvioCorreoQR.objects.all()
+    serializer_class = EnvioCorreoQRSerializer
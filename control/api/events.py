@@ -0,0 +1,148 @@
+import json
+import time
+from collections import deque
+from typing import Iterator
+from control.models import RegistroAsistencia
+from control.services.record_events import record_events
+from .serializers import RECORD_ROW_FIELDS, serialize_record_rows
+
+
+# ---------------------
+# Eventos en vivo de registros de asistencia (Server-Sent Events)
+# ---------------------
+
+
+# Info: Milisegundos que espera el navegador (EventSource) antes de reconectarse
+SSE_RETRY_MS = 3000
+
+# Info: Máximo de registros por consulta de respaldo (un reenganche con Last-Event-ID se pone al día por bloques)
+SSE_POLL_LIMIT = 500
+
+# Info: Milisegundos de espera antes de reintentar cuando se alcanzó el máximo de flujos del proceso
+SSE_BUSY_RETRY_MS = 60000
+
+
+def build_record_events(ids: list[int]) -> list[dict]:
+    '''
+    Info:
+        Construye los eventos de los registros indicados, con el mismo formato de las filas del listado
+        (serialize_record_rows), para que el tablero los agregue a la tabla sin transformarlos.
+
+    Params:
+        ids (list[int]): IDs de los registros nuevos.
+
+    Return:
+        list[dict]: Registros serializados, en orden de id.
+    '''
+
+    rows = RegistroAsistencia.objects.filter(id__in=ids).order_by("id").values(*RECORD_ROW_FIELDS)
+    return serialize_record_rows(list(rows))
+
+
+def latest_record_id() -> int:
+    # Info: Id del último registro insertado (punto de partida de un flujo nuevo sin Last-Event-ID)
+    return RegistroAsistencia.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def _poll_records(after_id: int, sede_id: int | None) -> list[dict]:
+    # Info: Consulta de respaldo: una página de registros con id posterior a after_id (rango sobre la llave primaria)
+    queryset = RegistroAsistencia.objects.filter(id__gt=after_id)
+    if sede_id is not None:
+        queryset = queryset.filter(lugar_registro_id=sede_id)
+    rows = queryset.order_by("id").values(*RECORD_ROW_FIELDS)[:SSE_POLL_LIMIT]
+    return serialize_record_rows(list(rows))
+
+
+def _format_event(events: list[dict], watermark: int) -> str:
+    # Info: Un evento "registros" por grupo; el id es la marca segura desde la que se reanuda con Last-Event-ID
+    data = json.dumps(events, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {watermark}\nevent: registros\ndata: {data}\n\n"
+
+
+def stream_record_events(
+    last_id: int, sede_id: int | None, poll_seconds: float, max_seconds: float,
+    overlap_seconds: float = 30, max_streams: int | None = None,
+) -> Iterator[str]:
+    '''
+    Info:
+        Flujo SSE de los registros insertados a partir de last_id (opcionalmente de una sola sede).
+        Los registros del proceso llegan al instante por el bus en memoria (record_events); cada poll_seconds
+        (o si la cola de la suscripción se desbordó) se consulta la base de datos para recoger los insertados
+        por otros procesos.
+
+        Los ids se asignan al insertar pero son visibles al confirmar: un registro puede aparecer después de otro
+        con id mayor. Por eso la marca desde la que se consulta (watermark) solo avanza con las consultas y
+        con un retraso de overlap_seconds: cada consulta vuelve a leer la ventana de registros recientes y
+        descarta los ya enviados. Un registro se pierde solo si su transacción dura más que overlap_seconds.
+        La marca viaja como id de cada evento y de cada keepalive: al reconectarse (Last-Event-ID) el flujo
+        vuelve a leer la ventana y el tablero descarta los registros que ya recibió.
+
+        El flujo se cierra tras max_seconds para liberar el hilo del servidor. Si el proceso ya atiende
+        max_streams flujos, se responde solo con un retry largo para no ocupar los hilos de los lectores QR.
+
+    Params:
+        last_id (int): Marca recibida por el cliente (todos los registros hasta este id ya fueron vistos).
+        sede_id (int | None): Sede a filtrar, o None para todas.
+        poll_seconds (float): Segundos entre consultas de respaldo.
+        max_seconds (float): Duración máxima del flujo.
+        overlap_seconds (float): Ventana de registros recientes que se vuelve a consultar.
+        max_streams (int | None): Máximo de flujos simultáneos del proceso, o None sin límite.
+
+    Return:
+        Iterator[str]: Fragmentos del flujo text/event-stream.
+    '''
+
+    if (subscription := record_events.subscribe(sede_id, limit=max_streams)) is None:
+        yield f"retry: {SSE_BUSY_RETRY_MS}\n: ocupado\n\n"
+        return
+
+    watermark = top = last_id
+    # Info: Ids enviados por encima de la marca y (instante, id más alto consultado) de cada consulta de respaldo
+    sent: set[int] = set()
+    polls: deque[tuple[float, int]] = deque()
+    deadline = time.monotonic() + max_seconds
+
+    def pending(events: list[dict]) -> list[dict]:
+        events = [event for event in events if event["id"] not in sent]
+        sent.update(event["id"] for event in events)
+        return events
+
+    def poll() -> Iterator[str]:
+        nonlocal watermark, top
+        # Info: Todo lo consultado hace más de overlap_seconds ya está confirmado: la marca avanza hasta ahí
+        while polls and polls[0][0] <= time.monotonic() - overlap_seconds:
+            watermark = max(watermark, polls.popleft()[1])
+        sent.difference_update([event_id for event_id in sent if event_id <= watermark])
+
+        after_id = watermark
+        while True:
+            rows = _poll_records(after_id, sede_id)
+            if rows:
+                after_id = rows[-1]["id"]
+                top = max(top, after_id)
+            if events := pending(rows):
+                yield _format_event(events, watermark)
+            if len(rows) < SSE_POLL_LIMIT:
+                break
+        polls.append((time.monotonic(), top))
+
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+
+        # Info: Reenganche: registros insertados mientras el cliente estuvo desconectado
+        yield from poll()
+        next_poll = time.monotonic() + poll_seconds
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            events = subscription.get(timeout=max(0, min(next_poll - time.monotonic(), remaining)))
+            if events := pending(events or []):
+                yield _format_event(events, watermark)
+
+            # Info: Consulta periódica aunque el bus entregue eventos (recoge los de otros procesos y avanza la marca)
+            if subscription.overflow or time.monotonic() >= next_poll:
+                subscription.overflow = False
+                chunks = list(poll())
+                next_poll = time.monotonic() + poll_seconds
+                yield from chunks or [f"id: {watermark}\n: ping\n\n"]
+    finally:
+        record_events.unsubscribe(subscription)
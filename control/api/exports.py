@@ -0,0 +1,80 @@
+import csv
+from itertools import islice
+from typing import Iterator
+from django.db.models import QuerySet
+from openpyxl import Workbook
+from .serializers import RECORD_ROW_FIELDS, serialize_record_rows
+
+
+# ---------------------
+# Exportación de registros de asistencia
+# ---------------------
+
+
+# Info: Columnas exportadas (encabezado, campo de serialize_record_rows), en el orden del listado del tablero
+EXPORT_COLUMNS = (
+    ("Empleado", "nombre_empleado"),
+    ("Documento", "documento"),
+    ("Fecha", "fecha"),
+    ("Hora", "hora"),
+    ("Descripción", "descripcion_registro"),
+    ("Estado", "estado_registro"),
+    ("Minutos", "minutos"),
+    ("Lugar", "lugar_registro"),
+)
+
+# Info: Filas leídas por viaje a la base de datos (cursor del lado del servidor en PostgreSQL)
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    # Info: Pseudo-archivo para csv.writer: retorna la línea escrita en lugar de almacenarla
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_export_rows(queryset: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+    '''
+    Info:
+        Recorre los registros filtrados por bloques de chunk_size filas (.values().iterator()) y produce
+        cada fila con el mismo formato del serializador del listado. Solo un bloque vive en memoria a la vez.
+
+    Params:
+        queryset (QuerySet): Registros filtrados y ordenados.
+        chunk_size (int): Filas por bloque.
+
+    Return:
+        Iterator[list]: Valores de cada fila en el orden de EXPORT_COLUMNS.
+    '''
+
+    rows = queryset.values(*RECORD_ROW_FIELDS).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        for record in serialize_record_rows(chunk):
+            yield [record[field] for _, field in EXPORT_COLUMNS]
+
+
+def stream_records_csv(queryset: QuerySet) -> Iterator[str]:
+    # Info: CSV línea por línea; el BOM inicial permite a Excel reconocer UTF-8 (tildes y eñes)
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for row in iter_export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_records_xlsx(queryset: QuerySet, file) -> None:
+    '''
+    Info:
+        Escribe los registros en un libro XLSX de solo escritura (openpyxl write_only): las filas se vuelcan
+        a disco a medida que se agregan, por lo que la memoria no crece con la cantidad de registros.
+
+    Params:
+        queryset (QuerySet): Registros filtrados y ordenados.
+        file: Archivo binario de destino.
+    '''
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Registros")
+    sheet.append([header for header, _ in EXPORT_COLUMNS])
+    for row in iter_export_rows(queryset):
+        sheet.append(row)
+    workbook.save(file)
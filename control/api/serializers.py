@@ -1,7 +1,9 @@
 from rest_framework import serializers
-from django.utils.timezone import localtime
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils.timezone import localtime, get_current_timezone
 from control.models import (
-    Sede, Empleado, RegistroAsistencia, CorreoInstitucional, TipoDocumento, AreaTrabajo, TipoNovedad, NovedadAsistencia, Horario
+    Sede, Empleado, RegistroAsistencia, CorreoInstitucional, TipoDocumento, AreaTrabajo, TipoNovedad, NovedadAsistencia, Horario,
+    EnvioCorreoQR,
 )
 
 # ---------------------
@@ -39,11 +41,58 @@ class EmpleadoSerializer(serializers.ModelSerializer):
         return f"{obj.primer_apellido} {obj.segundo_apellido or ''} {obj.primer_nombre} {obj.segundo_nombre or ''}".strip()
 
     def get_correo_institucional(self, obj):
-        # Info: Devuelve el correo institucional del empleado si existe
-        correo = CorreoInstitucional.objects.filter(fk_empleado=obj).first()
+        # Info: Devuelve el correo institucional del empleado si existe (anotado por employee_queryset, sin consulta por fila)
+        if hasattr(obj, "correo"):
+            return obj.correo
+        correo = CorreoInstitucional.objects.filter(fk_empleado=obj).order_by("id").first()
         return correo.correo_institucional if correo else None
 
 
+def employee_queryset() -> QuerySet:
+    '''
+    Info:
+        Empleados listos para EmpleadoSerializer en una sola consulta: tipo de documento unido (select_related)
+        y primer correo institucional anotado con una subconsulta correlacionada.
+
+    Return:
+        QuerySet: Empleados ordenados por apellidos y nombres.
+    '''
+
+    correo = CorreoInstitucional.objects.filter(fk_empleado=OuterRef("pk")).order_by("id").values("correo_institucional")[:1]
+    return (
+        Empleado.objects
+        .select_related("fk_tipo_documento")
+        .annotate(correo=Subquery(correo))
+        .order_by("primer_apellido", "segundo_apellido", "primer_nombre", "segundo_nombre")
+    )
+
+
+# Info: Campos de las opciones de empleados (selects y filtros de las páginas)
+EMPLOYEE_OPTION_FIELDS = ("id", "primer_apellido", "segundo_apellido", "primer_nombre", "segundo_nombre", "activo")
+
+
+def serialize_employee_options(rows) -> list[dict]:
+    '''
+    Info:
+        Variante compacta de EmpleadoSerializer para listas de selección: solo id, nombre completo y estado.
+
+    Params:
+        rows: Filas obtenidas con .values_list(*EMPLOYEE_OPTION_FIELDS).
+
+    Return:
+        list[dict]: Opciones {"id", "nombre_completo", "activo"}, con el mismo nombre completo del serializador.
+    '''
+
+    return [
+        {
+            "id": employee_id,
+            "nombre_completo": f"{primer_apellido} {segundo_apellido or ''} {primer_nombre} {segundo_nombre or ''}".strip(),
+            "activo": activo,
+        }
+        for employee_id, primer_apellido, segundo_apellido, primer_nombre, segundo_nombre, activo in rows
+    ]
+
+
 # ---------------------
 # Registro de Asistencia Serializer
 # ---------------------
@@ -85,6 +134,63 @@ class RegistroAsistenciaSerializer(serializers.ModelSerializer):
         return list(obj.fk_empleado.grupos.values_list("id", flat=True))
 
 
+# Info: Columnas que lee el serializador rápido (una sola consulta .values() con los JOIN necesarios)
+RECORD_ROW_FIELDS = (
+    "id", "fecha_hora_registro", "descripcion_registro", "minutos", "estado_registro",
+    "fk_empleado_id", "fk_empleado__primer_nombre", "fk_empleado__primer_apellido", "fk_empleado__segundo_apellido",
+    "fk_empleado__numero_documento", "fk_empleado__fk_tipo_documento__tipo_documento",
+    "lugar_registro_id", "lugar_registro__ubicacion", "lugar_registro__ciudad",
+)
+
+
+def serialize_record_rows(rows: list[dict]) -> list[dict]:
+    '''
+    Info:
+        Ruta rápida de RegistroAsistenciaSerializer: produce el mismo JSON a partir de filas .values(RECORD_ROW_FIELDS),
+        sin instancias de modelo ni consultas por fila. Las áreas de trabajo de todos los empleados de la página
+        se obtienen con una única consulta adicional, y la fecha se convierte a hora local una sola vez por fila.
+
+    Params:
+        rows (list[dict]): Filas obtenidas con .values(*RECORD_ROW_FIELDS).
+
+    Return:
+        list[dict]: Registros serializados, idénticos a RegistroAsistenciaSerializer(many=True).data.
+    '''
+
+    tz = get_current_timezone()
+
+    # Info: Áreas de trabajo por empleado para toda la página (una consulta)
+    areas = {}
+    employee_ids = {row["fk_empleado_id"] for row in rows}
+    for employee_id, area_id in (
+        AreaTrabajo.miembros.through.objects
+        .filter(empleado_id__in=employee_ids)
+        .order_by("areatrabajo_id")
+        .values_list("empleado_id", "areatrabajo_id")
+    ):
+        areas.setdefault(employee_id, []).append(area_id)
+
+    data = []
+    for row in rows:
+        local = row["fecha_hora_registro"].astimezone(tz)
+        numero = f"{row['fk_empleado__numero_documento']:,}".replace(",", ".")
+        data.append({
+            "id": row["id"],
+            "nombre_empleado": f"{row['fk_empleado__primer_apellido']} {row['fk_empleado__segundo_apellido'] or ''} {row['fk_empleado__primer_nombre']}".strip(),
+            "documento": f"{row['fk_empleado__fk_tipo_documento__tipo_documento']} - {numero}",
+            "fecha": local.strftime("%d/%m/%Y"),
+            "hora": local.strftime("%I:%M:%S %p"),
+            "descripcion_registro": row["descripcion_registro"],
+            "lugar_registro": f"{row['lugar_registro__ubicacion']} - {row['lugar_registro__ciudad']}",
+            "fk_empleado": row["fk_empleado_id"],
+            "fk_areas_trabajo": areas.get(row["fk_empleado_id"], []),
+            "fk_sede": row["lugar_registro_id"],
+            "minutos": row["minutos"],
+            "estado_registro": row["estado_registro"],
+        })
+    return data
+
+
 # ---------------------
 # Correo Institucional Serializer
 # ---------------------
@@ -96,6 +202,13 @@ class CorreoInstitucionalSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class EnvioCorreoQRSerializer(serializers.ModelSerializer):
+    # Info: Estado de un correo con el código QR en la cola de envío
+    class Meta:
+        model = EnvioCorreoQR
+        fields = ["id", "fk_empleado", "destinatario", "estado", "intentos", "error", "lote", "fecha_creacion", "fecha_programada", "fecha_envio"]
+
+
 # ---------------------
 # Tipo Documento Serializer
 # ---------------------
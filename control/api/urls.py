@@ -6,10 +6,19 @@ urlpatterns = [
     path('sedes/<int:pk>/', SedeDetailView.as_view(), name='ApiSedeDetail'),
     path('sedes/<int:pk>/conteo-registros/', SedeRegistroCountView.as_view(), name='ApiSedeRegistroCount'),
     path('empleados/', EmpleadoListCreateView.as_view(), name='ApiEmpleados'),
+    path('empleados/buscar/', EmpleadoBuscarView.as_view(), name='ApiEmpleadosBuscar'),
+    path('empleados/opciones/', EmpleadoOpcionesView.as_view(), name='ApiEmpleadosOpciones'),
+    path('empleados/qr/lote/', QRLoteView.as_view(), name='ApiEmpleadosQRLote'),
     path('empleados/<int:pk>/', EmpleadoDetailView.as_view(), name='ApiEmpleadoDetail'),
     path('empleados/<int:empleado_id>/qr/', QRGeneratorView.as_view(), name='ApiEmpleadoQR'),
     path('empleados/<int:empleado_id>/qr/email/', QREmailView.as_view(), name='ApiEmpleadoEmailQR'),
+    path('empleados/qr/email/lote/', QREmailLoteView.as_view(), name='ApiEmpleadosEmailQRLote'),
+    path('envios-correo-qr/', EnvioCorreoQRListView.as_view(), name='ApiEnviosCorreoQR'),
+    path('envios-correo-qr/<int:pk>/', EnvioCorreoQRDetailView.as_view(), name='ApiEnvioCorreoQRDetail'),
     path('registros-asistencias/', RegistroAsistenciaListCreateView.as_view(), name='ApiRegistrosAsistencias'),
+    path('registros-asistencias/exportar/', RegistroAsistenciaExportView.as_view(), name='ApiRegistrosAsistenciasExport'),
+    path('registros-asistencias/eventos/', RegistroAsistenciaEventosView.as_view(), name='ApiRegistrosAsistenciasEventos'),
+    path('registros-asistencias-dia/resumen/', RegistroAsistenciaResumenDiaView.as_view(), name='ApiRegistrosAsistenciasResumenDia'),
     path('registros-asistencias-dia/', RegistroAsistenciaPorDiaView.as_view(), name='ApiRegistrosAsistenciasPorDia'),
     path('registros-asistencias/<int:pk>/', RegistroAsistenciaDetailView.as_view(), name='ApiRegistroAsistenciaDetail'),
     path('correos-institucionales/', CorreoInstitucionalListCreateView.as_view(), name='ApiCorreosInstitucionales'),
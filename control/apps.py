@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ControlConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'control'
+
+    def ready(self):
+        # Info: Registrar señales de la aplicación
+        from control import signals  # noqa: F401
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.db.models.functions import TruncDate
+from control.models import RegistroAsistencia
+
+
+class Command(BaseCommand):
+    help = (
+        "Llena la columna fecha_local (día local America/Bogota) de los registros de asistencia que aún no la tienen. "
+        "Procesa rangos de id en transacciones cortas para no bloquear a los lectores QR; puede reanudarse."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=20000, help="Cantidad de ids por actualización.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        pending = RegistroAsistencia.objects.filter(fecha_local__isnull=True)
+        bounds = pending.aggregate(first=Min("id"), last=Max("id"))
+
+        if bounds["first"] is None:
+            self.stdout.write(self.style.SUCCESS("Todos los registros tienen fecha_local."))
+            return
+
+        # Info: UPDATE por rangos de id; TruncDate convierte a la zona horaria local en la base de datos
+        updated = 0
+        for low in range(bounds["first"], bounds["last"] + 1, chunk_size):
+            updated += pending.filter(id__gte=low, id__lt=low + chunk_size).update(
+                fecha_local=TruncDate("fecha_hora_registro"))
+            self.stdout.write(f"  hasta id {min(low + chunk_size - 1, bounds['last'])}: {updated:,} registros", ending="\r")
+
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"fecha_local completada en {updated:,} registros"))
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import path
+from control.models import Empleado, Sede, RegistroAsistencia
+from control.services.attendance_state import refresh_attendance_state
+from control.services.roster_cache import roster_cache
+from control.views import saveRecord, saveRecordAsync
+
+
+# Info: URLconf mínimas para medir cada variante de saveRecord con el mismo stack de middleware
+class _SyncUrls:
+    urlpatterns = [path("save/", saveRecord)]
+
+
+class _AsyncUrls:
+    urlpatterns = [path("save/", saveRecordAsync)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara solicitudes por segundo y latencia p99 de saveRecord síncrono (WSGI, pool de hilos como waitress) "
+        "y saveRecordAsync (ASGI, un solo event loop) con N lectores QR simulados enviando escaneos a la vez. "
+        "Se ejecuta en proceso (sin red) sobre la base de datos configurada; los registros creados se eliminan al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kiosks", type=int, default=200, help="Lectores QR simultáneos.")
+        parser.add_argument("--scans", type=int, default=5, help="Escaneos secuenciales por lector.")
+        parser.add_argument("--threads", type=int, default=8, help="Hilos del servidor WSGI simulado.")
+        parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON.")
+
+    def handle(self, *args, **options):
+        kiosks, scans = options["kiosks"], options["scans"]
+
+        if not (sede := Sede.objects.first()):
+            raise CommandError("No hay sedes registradas.")
+
+        # Info: Cada variante usa empleados distintos para que todos los escaneos sean registros reales
+        needed = kiosks * scans * 2
+        codes = list(Empleado.objects.filter(activo=True).order_by("id").values_list("numero_documento", flat=True)[:needed])
+        if len(codes) < needed:
+            raise CommandError(f"Se requieren {needed} empleados activos ({len(codes)} disponibles).")
+
+        employee_ids = list(Empleado.objects.filter(numero_documento__in=codes).values_list("id", flat=True))
+        last_id = RegistroAsistencia.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+        # Info: Roster precargado: se mide el camino caliente de ambas variantes
+        for code in codes:
+            roster_cache.get(code)
+        connection.close()
+
+        plans = [codes[i * scans:(i + 1) * scans] for i in range(kiosks * 2)]
+        self._sessions = []
+        try:
+            results = {
+                "wsgi_sync": self._run_wsgi(sede, plans[:kiosks], options["threads"]),
+                "asgi_async": self._run_asgi(sede, plans[kiosks:]),
+            }
+        finally:
+            self._cleanup(last_id, employee_ids)
+
+        results = {"kiosks": kiosks, "scans_por_kiosk": scans, "wsgi_threads": options["threads"], **results}
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{kiosks} lectores x {scans} escaneos (WSGI con {options['threads']} hilos)")
+        for name in ("wsgi_sync", "asgi_async"):
+            r = results[name]
+            self.stdout.write(
+                f"  {name:<11} {r['rps']:>8.1f} req/s  p50 {r['p50_ms']:>8.1f} ms  p99 {r['p99_ms']:>8.1f} ms  "
+                f"errores {r['errores']}")
+
+    def _run_wsgi(self, sede: Sede, plans: list[list[int]], threads: int) -> dict:
+        # Info: Cada lector es un hilo cliente; el semáforo limita la concurrencia a los hilos del servidor
+        clients = [self._client(Client, sede) for _ in plans]
+        server_threads = threading.BoundedSemaphore(threads)
+        latencies, statuses = [], []
+
+        def kiosk(client, plan):
+            for code in plan:
+                started = time.perf_counter()
+                with server_threads:
+                    response = client.post("/save/", data=json.dumps({"codigo": code}), content_type="application/json")
+                latencies.append(time.perf_counter() - started)
+                statuses.append(response.status_code)
+
+        with override_settings(ROOT_URLCONF=_SyncUrls):
+            started = time.perf_counter()
+            workers = [threading.Thread(target=kiosk, args=pair) for pair in zip(clients, plans)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+
+        return self._summary(latencies, statuses, elapsed)
+
+    def _run_asgi(self, sede: Sede, plans: list[list[int]]) -> dict:
+        # Info: Todos los lectores comparten un event loop, como un worker ASGI (uvicorn/daphne)
+        clients = [self._client(AsyncClient, sede) for _ in plans]
+        latencies, statuses = [], []
+
+        async def kiosk(client, plan):
+            for code in plan:
+                started = time.perf_counter()
+                response = await client.post("/save/", data=json.dumps({"codigo": code}), content_type="application/json")
+                latencies.append(time.perf_counter() - started)
+                statuses.append(response.status_code)
+
+        async def run_all():
+            await asyncio.gather(*(kiosk(client, plan) for client, plan in zip(clients, plans)))
+
+        with override_settings(ROOT_URLCONF=_AsyncUrls):
+            started = time.perf_counter()
+            asyncio.run(run_all())
+            elapsed = time.perf_counter() - started
+
+        return self._summary(latencies, statuses, elapsed)
+
+    def _client(self, client_class, sede: Sede):
+        # Info: Sesión de lector con la sede definida (equivalente a defineLocation)
+        client = client_class()
+        session = client.session
+        session["sede_id"] = sede.id
+        session.save()
+        self._sessions.append(session)
+        return client
+
+    def _summary(self, latencies: list[float], statuses: list[int], elapsed: float) -> dict:
+        ms = sorted(latency * 1000 for latency in latencies)
+        return {
+            "solicitudes": len(ms),
+            "errores": sum(status != 200 for status in statuses),
+            "segundos": round(elapsed, 3),
+            "rps": round(len(ms) / elapsed, 1),
+            "p50_ms": round(statistics.median(ms), 1),
+            "p99_ms": round(statistics.quantiles(ms, n=100)[98], 1) if len(ms) > 1 else round(ms[0], 1),
+        }
+
+    def _cleanup(self, last_id: int, employee_ids: list[int]) -> None:
+        # Warn: Elimina solo los registros creados por el benchmark y recalcula el estado de esos empleados
+        RegistroAsistencia.objects.filter(id__gt=last_id, fk_empleado_id__in=employee_ids).delete()
+        for employee_id in employee_ids:
+            refresh_attendance_state(employee_id)
+        for session in self._sessions:
+            session.delete()
@@ -0,0 +1,155 @@
+import json
+import re
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from control.models import RegistroAsistencia
+from control.services.local_dates import local_day_range
+
+
+# Info: Consultas críticas sobre registros_asistencia (mismas expresiones ORM que usan las vistas)
+HOT_QUERIES = {
+    "ultimo_registro_empleado": lambda ctx: (
+        RegistroAsistencia.objects.filter(fk_empleado_id=ctx["employee_id"])
+        .order_by("-fecha_hora_registro", "-id")[:1]
+    ),
+    "ultima_entrada_empleado": lambda ctx: (
+        RegistroAsistencia.objects.filter(fk_empleado_id=ctx["employee_id"], descripcion_registro="Entrada")
+        .order_by("-fecha_hora_registro")[:1]
+    ),
+    "registros_por_dia": lambda ctx: (
+        RegistroAsistencia.objects.filter(
+            fecha_hora_registro__gte=local_day_range(ctx["date"])[0],
+            fecha_hora_registro__lt=local_day_range(ctx["date"])[1],
+        ).order_by("-fecha_hora_registro")
+    ),
+    "listado_sede_rango_fechas": lambda ctx: (
+        RegistroAsistencia.objects.filter(
+            lugar_registro_id=ctx["sede_id"],
+            fecha_hora_registro__gte=local_day_range(ctx["date"] - timedelta(days=30), ctx["date"])[0],
+            fecha_hora_registro__lt=local_day_range(ctx["date"] - timedelta(days=30), ctx["date"])[1],
+        ).order_by("-fecha_hora_registro")[:15]
+    ),
+    "registros_por_fecha_local": lambda ctx: (
+        RegistroAsistencia.objects.filter(fecha_local=ctx["date"]).order_by("-fecha_hora_registro")
+    ),
+    "listado_primera_pagina": lambda ctx: (
+        RegistroAsistencia.objects.order_by("-fecha_hora_registro")[:15]
+    ),
+    "registros_con_estado": lambda ctx: (
+        RegistroAsistencia.objects.filter(estado_registro__isnull=False).order_by("-fecha_hora_registro")[:15]
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN ANALYZE de las consultas críticas sobre registros_asistencia, sin y con los índices "
+        "declarados en RegistroAsistencia.Meta.indexes. Solo PostgreSQL; usar en una base de datos local: "
+        "la medición 'antes' elimina los índices dentro de una transacción que luego se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Cantidad de registros sintéticos a insertar antes de medir.")
+        parser.add_argument("--employees", type=int, default=2000, help="Empleados sintéticos para la siembra.")
+        parser.add_argument("--sedes", type=int, default=5, help="Sedes sintéticas para la siembra.")
+        parser.add_argument("--years", type=int, default=5, help="Años de historial simulados en la siembra.")
+        parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("El benchmark de índices requiere PostgreSQL.")
+
+        if options["seed"]:
+            self._seed(options["seed"], options["employees"], options["sedes"], options["years"])
+
+        if not (sample := RegistroAsistencia.objects.order_by("-fecha_hora_registro").first()):
+            raise CommandError("No hay registros para medir. Use --seed N para generar datos sintéticos.")
+
+        ctx = {
+            "employee_id": sample.fk_empleado_id,
+            "sede_id": sample.lugar_registro_id,
+            "date": timezone.localdate(sample.fecha_hora_registro),
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE registros_asistencia")
+
+        # Info: Medición sin índices (DROP INDEX transaccional, revertido al finalizar)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for index in RegistroAsistencia._meta.indexes:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+            before = self._explain_all(ctx)
+            transaction.set_rollback(True)
+
+        # Info: Medición con los índices de la migración
+        after = self._explain_all(ctx)
+
+        results = {
+            "filas": RegistroAsistencia.objects.count(),
+            "consultas": {
+                name: {"antes": before[name], "despues": after[name]} for name in HOT_QUERIES
+            },
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2, default=str))
+            return
+
+        self.stdout.write(f"Filas en registros_asistencia: {results['filas']:,}")
+        for name, result in results["consultas"].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f"  antes:   {result['antes']['ms']:>10.3f} ms  {result['antes']['plan']}")
+            self.stdout.write(f"  después: {result['despues']['ms']:>10.3f} ms  {result['despues']['plan']}")
+
+    def _explain_all(self, ctx: dict) -> dict:
+        # Info: EXPLAIN ANALYZE de cada consulta; se reporta el tiempo de ejecución y el nodo raíz/de acceso del plan
+        results = {}
+        for name, build in HOT_QUERIES.items():
+            plan = build(ctx).explain(analyze=True, buffers=True)
+            execution = re.search(r"Execution Time: ([\d.]+) ms", plan)
+            access = [line.strip(" ->") for line in plan.splitlines() if "Scan" in line]
+            results[name] = {
+                "ms": float(execution.group(1)) if execution else 0.0,
+                "plan": access[0].split("  (")[0] if access else plan.splitlines()[0].split("  (")[0],
+            }
+        return results
+
+    def _seed(self, total: int, employees: int, sedes: int, years: int) -> None:
+        # Info: Siembra masiva con generate_series (empleados con documento >= 9e11 para no chocar con datos reales)
+        self.stdout.write(f"Sembrando {total:,} registros...")
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO tipo_documentos (tipo_documento, descripcion, fecha_creacion, fecha_modificacion) "
+                "SELECT 'CC', 'Benchmark', now(), now() WHERE NOT EXISTS (SELECT 1 FROM tipo_documentos)"
+            )
+            cursor.execute(
+                "INSERT INTO sedes (ubicacion, ciudad) SELECT 'Sede benchmark ' || g, 'Benchmark' "
+                "FROM generate_series(1, %s) g",
+                [sedes]
+            )
+            cursor.execute(
+                "INSERT INTO empleados (cargo, primer_nombre, primer_apellido, fk_tipo_documento_id, numero_documento, activo) "
+                "SELECT 'Benchmark', 'Nombre ' || g, 'Apellido ' || g, (SELECT min(id) FROM tipo_documentos), 900000000000 + g, true "
+                "FROM generate_series(1, %s) g ON CONFLICT (numero_documento) DO NOTHING",
+                [employees]
+            )
+            cursor.execute(
+                """
+                WITH e AS (SELECT array_agg(id) AS ids FROM empleados WHERE numero_documento > 900000000000),
+                     s AS (SELECT array_agg(id) AS ids FROM sedes WHERE ciudad = 'Benchmark')
+                INSERT INTO registros_asistencia
+                    (fk_empleado_id, descripcion_registro, fecha_hora_registro, lugar_registro_id, minutos, estado_registro)
+                SELECT
+                    e.ids[1 + (g %% array_length(e.ids, 1))],
+                    CASE WHEN g %% 2 = 0 THEN 'Entrada' ELSE 'Salida' END,
+                    now() - random() * (%s * interval '365 days'),
+                    s.ids[1 + (g %% array_length(s.ids, 1))],
+                    CASE WHEN g %% 10 = 0 THEN (g %% 60) END,
+                    CASE WHEN g %% 10 = 0 THEN 'Con retraso' END
+                FROM generate_series(1, %s) g, e, s
+                """,
+                [years, total]
+            )
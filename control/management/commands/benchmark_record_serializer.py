@@ -0,0 +1,64 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from control.models import RegistroAsistencia
+from control.api.serializers import RegistroAsistenciaSerializer, RECORD_ROW_FIELDS, serialize_record_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara filas por segundo y consultas por página de RegistroAsistenciaSerializer (DRF) y del serializador "
+        "rápido serialize_record_rows, para páginas del listado de registros de asistencia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[15, 100, 1000], help="Tamaños de página a medir.")
+        parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (se toma la mejor).")
+        parser.add_argument("--json", action="store_true", help="Imprime el resultado en formato JSON.")
+
+    def handle(self, *args, **options):
+        queryset = RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id")
+        if not queryset.exists():
+            raise CommandError("No hay registros para medir.")
+
+        results = []
+        for size in options["sizes"]:
+            # Info: Mismo query base que el listado antes del cambio (select_related + prefetch)
+            drf_ms, drf_queries = self._measure(options["repeat"], lambda: RegistroAsistenciaSerializer(
+                queryset.select_related("fk_empleado", "lugar_registro").prefetch_related("fk_empleado__grupos")[:size],
+                many=True).data)
+            fast_ms, fast_queries = self._measure(options["repeat"], lambda: serialize_record_rows(
+                list(queryset.values(*RECORD_ROW_FIELDS)[:size])))
+            results.append({
+                "filas": size,
+                "drf": {"ms": drf_ms, "filas_s": round(size / drf_ms * 1000), "consultas": drf_queries},
+                "rapido": {"ms": fast_ms, "filas_s": round(size / fast_ms * 1000), "consultas": fast_queries},
+            })
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for r in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{r['filas']} filas"))
+            for name in ("drf", "rapido"):
+                m = r[name]
+                self.stdout.write(f"  {name:<7} {m['ms']:>9.2f} ms  {m['filas_s']:>9,} filas/s  {m['consultas']:>5} consultas")
+
+    def _measure(self, repeat: int, serialize) -> tuple[float, int]:
+        # Info: Mejor tiempo de varias repeticiones (incluye consultas y serialización)
+        best, queries = None, [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        for _ in range(repeat):
+            queries[0] = 0
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                serialize()
+                elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 2), queries[0]
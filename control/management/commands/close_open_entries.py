@@ -0,0 +1,75 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from control.models import EstadoAsistencia, RegistroAsistencia
+from control.services.attendance_rules import AUTOMATIC_EXIT_AFTER, build_automatic_exit
+from control.services.attendance_state import save_attendance_states
+from control.services.daily_rollup import update_daily_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Cierra con una salida automática las Entradas sin Salida más antiguas que el umbral (18 h por defecto), "
+        "con las mismas reglas de horario del lector QR. Idempotente: pensado para ejecutarse cada noche (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=AUTOMATIC_EXIT_AFTER.total_seconds() / 3600, help="Antigüedad mínima de la Entrada abierta, en horas.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Cantidad de salidas insertadas por lote.")
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las entradas abiertas, sin insertar salidas.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        chunk_size = options["chunk_size"]
+
+        # Info: Entradas abiertas vencidas en una sola consulta sobre la tabla de estados
+        employee_ids = list(
+            self._open_states(cutoff).order_by("pk").values_list("pk", flat=True)
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(f"Entradas abiertas anteriores a {timezone.localtime(cutoff):%Y-%m-%d %H:%M}: {len(employee_ids)}")
+            return
+
+        closed = 0
+        for offset in range(0, len(employee_ids), chunk_size):
+            closed += self._close_chunk(employee_ids[offset:offset + chunk_size], cutoff)
+
+        skipped = len(employee_ids) - closed
+        self.stdout.write(self.style.SUCCESS(
+            f"Entradas abiertas encontradas: {len(employee_ids)} | Salidas automáticas creadas: {closed} | "
+            f"Omitidas (cerradas por un escaneo durante el proceso): {skipped}"
+        ))
+
+    def _open_states(self, cutoff):
+        return EstadoAsistencia.objects.filter(
+            fk_entrada_abierta__isnull=False,
+            entrada_abierta_fecha_hora__lt=cutoff,
+        )
+
+    @transaction.atomic
+    def _close_chunk(self, employee_ids: list[int], cutoff) -> int:
+        # Info: Bloquear los estados del lote y volver a filtrar: un escaneo pudo cerrar la entrada entretanto
+        states = list(
+            self._open_states(cutoff)
+            .filter(pk__in=employee_ids)
+            .annotate(sede_entrada_id=F("fk_entrada_abierta__lugar_registro_id"))
+            .select_for_update(of=("self",))
+            .order_by("pk")
+        )
+
+        # Info: La salida automática se registra en la sede de la Entrada que cierra
+        exits = [
+            build_automatic_exit(state.fk_empleado_id, state.entrada_abierta_fecha_hora, state.sede_entrada_id)
+            for state in states
+        ]
+        RegistroAsistencia.objects.bulk_create(exits)
+
+        for state, record in zip(states, exits):
+            state.apply(record)
+        save_attendance_states(states)
+        update_daily_rollups(exits)
+
+        return len(exits)
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from control.services.qr_sheets import qr_sheet_employees, stream_qr_zip, stream_qr_sheet_html
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los códigos QR de varios empleados en un ZIP de imágenes PNG o en una hoja HTML imprimible. "
+        "Las imágenes se dibujan en paralelo en un pool de procesos y el archivo se escribe por bloques."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=("zip", "html"), default="zip", help="Formato del archivo.")
+        parser.add_argument("--output", required=True, help="Ruta del archivo a generar.")
+        parser.add_argument("--sede", type=int, help="Solo empleados con registros en la sede.")
+        parser.add_argument("--area", type=int, help="Solo empleados del área de trabajo.")
+        parser.add_argument("--activo", choices=("true", "false"), help="Solo empleados activos o inactivos.")
+        parser.add_argument("--ids", type=int, nargs="+", help="IDs puntuales de empleados.")
+        parser.add_argument("--workers", type=int, help="Procesos del pool de dibujo (por defecto QR_SHEET_WORKERS).")
+
+    def handle(self, *args, **options):
+        activo = None if options["activo"] is None else options["activo"] == "true"
+        rows = qr_sheet_employees(options["sede"], options["area"], activo, options["ids"])
+        total = rows.count()
+
+        if options["format"] == "zip":
+            chunks = stream_qr_zip(rows.iterator(), options["workers"])
+        else:
+            chunks = (chunk.encode() for chunk in stream_qr_sheet_html(rows.iterator(), options["workers"]))
+
+        with open(options["output"], "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Códigos QR generados: {total} | Archivo: {options['output']}"))
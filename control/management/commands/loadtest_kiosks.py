@@ -0,0 +1,175 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import time as time_of_day
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from control.models import Empleado, TipoDocumento, Sede, Horario, RegistroAsistencia
+from control.services.attendance_state import refresh_attendance_state
+from control.services.roster_cache import roster_cache
+
+
+# Info: Rango de documentos reservado para los empleados de carga (no choca con datos reales ni con el benchmark de índices)
+LOADTEST_DOCUMENT_BASE = 800_000_000_000
+LOADTEST_CITY = "Carga"
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del lector QR: siembra empleados, sedes y horarios en la base de datos local y simula K lectores "
+        "enviando escaneos a la URL real de saveRecord con una curva de llegadas alrededor del inicio de turno. "
+        "Reporta en JSON rendimiento, latencias p50/p95/p99, consultas por escaneo y tasa de errores."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=1000, help="Empleados que llegan al turno (uno o más escaneos cada uno).")
+        parser.add_argument("--kiosks", type=int, default=10, help="Lectores QR simultáneos (uno por sede, repartidos en las sedes).")
+        parser.add_argument("--sedes", type=int, default=3, help="Sedes sintéticas.")
+        parser.add_argument("--window", type=float, default=60, help="Duración en segundos de la ventana de llegadas.")
+        parser.add_argument("--duplicates", type=float, default=0.05, help="Fracción de empleados que escanean dos veces seguidas.")
+        parser.add_argument("--seed", type=int, default=1, help="Semilla aleatoria (misma curva de llegadas entre ramas).")
+        parser.add_argument("--label", default="", help="Etiqueta para identificar la ejecución (p. ej. nombre de la rama).")
+        parser.add_argument("--keep", action="store_true", help="Conserva los registros creados (por defecto se eliminan al final).")
+
+    def handle(self, *args, **options):
+        if options["kiosks"] < 1 or options["employees"] < 1:
+            raise CommandError("--kiosks y --employees deben ser mayores que cero.")
+
+        rng = random.Random(options["seed"])
+        codes, sedes = self._seed(options["employees"], options["sedes"])
+        employee_ids = list(Empleado.objects.filter(numero_documento__in=codes).values_list("id", flat=True))
+        last_id = RegistroAsistencia.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        roster_cache.clear()
+        connection.close()
+
+        schedules = self._arrivals(codes, options["kiosks"], options["window"], options["duplicates"], rng)
+        kiosks = [self._client(sedes[index % len(sedes)]) for index in range(options["kiosks"])]
+
+        samples = []
+        try:
+            started = time.perf_counter()
+            threads = [
+                threading.Thread(target=self._kiosk, args=(client, schedule, started, samples))
+                for client, schedule in zip(kiosks, schedules)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options["keep"]:
+                self._cleanup(last_id, employee_ids)
+            for client in kiosks:
+                client.session.delete()
+
+        self.stdout.write(json.dumps(self._report(samples, elapsed, options), indent=2))
+
+    def _seed(self, employees: int, sedes: int) -> tuple[list[int], list[Sede]]:
+        # Info: Siembra idempotente: reutiliza los datos de carga de ejecuciones anteriores
+        tipo = TipoDocumento.objects.first() or TipoDocumento.objects.create(tipo_documento="CC", descripcion="Carga")
+        codes = [LOADTEST_DOCUMENT_BASE + n for n in range(1, employees + 1)]
+        Empleado.objects.bulk_create([
+            Empleado(
+                cargo="Carga", primer_nombre=f"Nombre {code}", primer_apellido="Carga",
+                fk_tipo_documento=tipo, numero_documento=code, activo=True)
+            for code in codes
+        ], ignore_conflicts=True, batch_size=1000)
+
+        sede_list = [
+            Sede.objects.get_or_create(ubicacion=f"Sede carga {n}", ciudad=LOADTEST_CITY)[0]
+            for n in range(1, sedes + 1)
+        ]
+
+        # Info: Dos turnos (mañana y tarde) para que también se evalúe la puntualidad
+        shifts = [
+            Horario.objects.get_or_create(hora_entrada=time_of_day(7, 0), hora_salida=time_of_day(16, 0))[0],
+            Horario.objects.get_or_create(hora_entrada=time_of_day(14, 0), hora_salida=time_of_day(22, 0))[0],
+        ]
+        ids = Empleado.objects.filter(numero_documento__in=codes).order_by("numero_documento").values_list("id", flat=True)
+        Membership = Horario.miembros.through
+        Membership.objects.bulk_create([
+            Membership(horario_id=shifts[index % 2].id, empleado_id=employee_id)
+            for index, employee_id in enumerate(ids)
+        ], ignore_conflicts=True, batch_size=1000)
+
+        return codes, sede_list
+
+    def _arrivals(self, codes: list[int], kiosks: int, window: float, duplicates: float, rng: random.Random) -> list[list[tuple[float, int]]]:
+        # Info: Llegadas con distribución normal centrada en el inicio del turno (mitad de la ventana)
+        schedules = [[] for _ in range(kiosks)]
+        for code in codes:
+            at = min(max(rng.gauss(window / 2, window / 6), 0), window)
+            kiosk = rng.randrange(kiosks)
+            schedules[kiosk].append((at, code))
+            if rng.random() < duplicates:
+                schedules[kiosk].append((at + rng.uniform(0.5, 3), code))  # Info: Doble lectura del mismo QR
+        return [sorted(schedule) for schedule in schedules]
+
+    def _kiosk(self, client: Client, schedule: list[tuple[float, int]], started: float, samples: list) -> None:
+        # Info: Cuenta las consultas de cada escaneo en la conexión de este hilo
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        url = reverse("saveRecord")
+        try:
+            with connection.execute_wrapper(count_queries):
+                for at, code in schedule:
+                    if (wait := started + at - time.perf_counter()) > 0:
+                        time.sleep(wait)
+                    queries[0] = 0
+                    sent = time.perf_counter()
+                    response = client.post(url, data=json.dumps({"codigo": code}), content_type="application/json")
+                    samples.append({
+                        "latency": time.perf_counter() - sent,
+                        "lateness": sent - (started + at),
+                        "status": response.status_code,
+                        "queries": queries[0],
+                    })
+        finally:
+            connection.close()
+
+    def _client(self, sede: Sede) -> Client:
+        # Info: Sesión de lector con la sede definida (equivalente a defineLocation)
+        client = Client()
+        session = client.session
+        session["sede_id"] = sede.id
+        session.save()
+        return client
+
+    def _report(self, samples: list[dict], elapsed: float, options: dict) -> dict:
+        ms = sorted(sample["latency"] * 1000 for sample in samples)
+        lateness = sorted(max(sample["lateness"], 0) * 1000 for sample in samples)
+        queries = [sample["queries"] for sample in samples]
+        statuses = Counter(sample["status"] for sample in samples)
+        percentile = lambda values, p: round(statistics.quantiles(values, n=100)[p - 1], 2) if len(values) > 1 else round(values[0], 2)
+
+        return {
+            "label": options["label"],
+            "config": {key: options[key] for key in ("employees", "kiosks", "sedes", "window", "duplicates", "seed")},
+            "db_vendor": connection.vendor,
+            "scans": len(samples),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "latency_ms": {
+                "p50": percentile(ms, 50), "p95": percentile(ms, 95), "p99": percentile(ms, 99), "max": round(ms[-1], 2),
+            },
+            "kiosk_queue_delay_ms": {"p50": percentile(lateness, 50), "p99": percentile(lateness, 99)},
+            "queries_per_scan": {"avg": round(statistics.mean(queries), 2), "max": max(queries)},
+            "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+            "error_rate": round(sum(count for code, count in statuses.items() if code >= 500) / len(samples), 4),
+        }
+
+    def _cleanup(self, last_id: int, employee_ids: list[int]) -> None:
+        # Warn: Elimina solo los registros creados durante la prueba y recalcula el estado de esos empleados
+        RegistroAsistencia.objects.filter(id__gt=last_id, fk_empleado_id__in=employee_ids).delete()
+        for employee_id in employee_ids:
+            refresh_attendance_state(employee_id)
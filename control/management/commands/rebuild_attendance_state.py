@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from control.models import Empleado, EstadoAsistencia, RegistroAsistencia
+from control.services.attendance_state import lock_attendance_states, save_attendance_states
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla estados_asistencia a partir del historial de registros_asistencia."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employee", type=int, help="Reconstruir solo el estado de un empleado (ID).")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Cantidad de estados bloqueados y guardados por lote.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        has_records = Exists(RegistroAsistencia.objects.filter(fk_empleado_id=OuterRef("pk")))
+        employees = Empleado.objects.filter(has_records)
+        existing = EstadoAsistencia.objects.all()
+        if options["employee"]:
+            employees = employees.filter(pk=options["employee"])
+            existing = existing.filter(pk=options["employee"])
+        employee_ids = list(employees.order_by("pk").values_list("pk", flat=True))
+
+        # Info: Último registro de cada empleado en una sola consulta correlacionada
+        last_record = (
+            RegistroAsistencia.objects
+            .filter(fk_empleado_id=OuterRef("pk"))
+            .order_by("-fecha_hora_registro", "-id")
+            .values("id")[:1]
+        )
+
+        # Info: Quitar los estados de empleados que ya no tienen registros (transacción corta aparte)
+        with transaction.atomic():
+            existing.exclude(has_records).delete()
+
+        rebuilt = 0
+        for offset in range(0, len(employee_ids), chunk_size):
+            chunk = employee_ids[offset:offset + chunk_size]
+
+            # Warn: Una transacción por lote: los bloqueos de cada lote se liberan al confirmarlo, así los escaneos
+            # QR solo esperan a su propio lote y no a toda la reconstrucción
+            with transaction.atomic():
+                # Info: Filas vacías para los empleados sin estado, para bloquear todos los estados del lote
+                EstadoAsistencia.objects.bulk_create(
+                    [EstadoAsistencia(fk_empleado_id=employee_id) for employee_id in chunk], ignore_conflicts=True)
+                states = lock_attendance_states(chunk)
+
+                # Warn: El último registro se lee después del bloqueo: un escaneo concurrente espera a la reconstrucción
+                # o ya está confirmado y se incluye; leerlo antes sobrescribiría su estado
+                last_ids = (
+                    Empleado.objects.filter(pk__in=chunk)
+                    .annotate(last_record_id=Subquery(last_record))
+                    .values_list("last_record_id", flat=True)
+                )
+                for record in RegistroAsistencia.objects.filter(id__in=last_ids):
+                    states[record.fk_empleado_id].apply(record)
+
+                save_attendance_states(list(states.values()))
+            rebuilt += len(states)
+
+        self.stdout.write(self.style.SUCCESS(f"Estados de asistencia reconstruidos: {rebuilt}"))
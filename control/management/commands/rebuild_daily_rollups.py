@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from control.models import Empleado, RegistroAsistencia
+from control.services.daily_rollup import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye desde registros_asistencia los resúmenes diarios (resumenes_diarios_asistencia) de un rango de días. "
+        "Procesa bloques de empleados y de días en transacciones cortas; sin fechas recorre todo el historial."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="Primer día local (YYYY-MM-DD). Por defecto, el primer registro.")
+        parser.add_argument("--end", type=date.fromisoformat, help="Último día local (YYYY-MM-DD). Por defecto, el último registro.")
+        parser.add_argument("--employee", type=int, action="append", dest="employees", help="ID de empleado (repetible). Por defecto, todos.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Cantidad de empleados por transacción.")
+        parser.add_argument("--days", type=int, default=31, help="Cantidad de días por transacción.")
+
+    def handle(self, *args, **options):
+        bounds = RegistroAsistencia.objects.aggregate(first=Min("fecha_hora_registro"), last=Max("fecha_hora_registro"))
+        if bounds["first"] is None:
+            self.stdout.write(self.style.SUCCESS("No hay registros de asistencia."))
+            return
+
+        start = options["start"] or timezone.localdate(bounds["first"])
+        end = options["end"] or timezone.localdate(bounds["last"])
+        if start > end:
+            raise CommandError("--start debe ser anterior o igual a --end")
+
+        employee_ids = options["employees"] or list(Empleado.objects.order_by("id").values_list("id", flat=True))
+        chunk_size, window = options["chunk_size"], timedelta(days=options["days"])
+
+        written = 0
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + window - timedelta(days=1), end)
+            for offset in range(0, len(employee_ids), chunk_size):
+                # Info: Cada bloque es una transacción corta (rebuild_daily_rollups es atómica)
+                written += rebuild_daily_rollups(employee_ids[offset:offset + chunk_size], window_start, window_end)
+            self.stdout.write(f"  {window_start} a {window_end}: {written:,} resúmenes", ending="\r")
+            window_start = window_end + timedelta(days=1)
+
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes diarios reconstruidos del {start} al {end}: {written:,}"))
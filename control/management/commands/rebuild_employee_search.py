@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from control.models import Empleado, EmpleadoBusqueda
+from control.services.employee_search import sync_employee_search
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye el texto de búsqueda normalizado (empleados_busqueda) de todos los empleados. "
+        "Necesario cuando los empleados se modifican fuera de Django (la tabla empleados no es administrada)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Cantidad de empleados por INSERT.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        employees = Empleado.objects.order_by("id").only(
+            "id", "primer_nombre", "segundo_nombre", "primer_apellido", "segundo_apellido", "numero_documento")
+
+        synced = 0
+        batch = []
+        for employee in employees.iterator(chunk_size=chunk_size):
+            batch.append(employee)
+            if len(batch) == chunk_size:
+                sync_employee_search(batch)
+                synced += len(batch)
+                batch = []
+        sync_employee_search(batch)
+        synced += len(batch)
+
+        # Info: Quitar filas de empleados eliminados fuera de Django
+        removed, _ = EmpleadoBusqueda.objects.exclude(fk_empleado_id__in=Empleado.objects.values("id")).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"Empleados sincronizados: {synced} | Filas eliminadas: {removed}"))
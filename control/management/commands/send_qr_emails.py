@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from control.services.qr_mail import send_pending_qr_emails
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía los correos QR vencidos de la cola (envios_correo_qr) por lotes, una conexión por lote. "
+        "Con --loop queda como worker: es el worker por defecto (QR_MAIL_WORKER = False), como servicio aparte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Correos por conexión (por defecto QR_MAIL_BATCH_SIZE).")
+        parser.add_argument("--loop", action="store_true", help="Seguir consultando la cola en lugar de terminar.")
+        parser.add_argument("--poll-seconds", type=float, default=10, help="Espera entre consultas con --loop.")
+
+    def handle(self, *args, **options):
+        totals = {"enviados": 0, "reintentos": 0, "fallidos": 0}
+        while True:
+            # Info: Lotes hasta que no queden correos vencidos
+            while any((result := send_pending_qr_emails(options["batch_size"])).values()):
+                for key, value in result.items():
+                    totals[key] += value
+
+            if not options["loop"]:
+                break
+            time.sleep(options["poll_seconds"])
+            close_old_connections()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Enviados: {totals['enviados']} | Reintentos programados: {totals['reintentos']} | Fallidos: {totals['fallidos']}"))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoAsistencia',
+            fields=[
+                ('fk_empleado', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estado_asistencia', serialize=False, to='control.empleado')),
+                ('ultima_descripcion', models.CharField(blank=True, max_length=20, null=True)),
+                ('ultima_fecha_hora', models.DateTimeField(blank=True, null=True)),
+                ('entrada_abierta_fecha_hora', models.DateTimeField(blank=True, null=True)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+                ('fk_entrada_abierta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='control.registroasistencia')),
+                ('fk_ultimo_registro', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='control.registroasistencia')),
+            ],
+            options={
+                'verbose_name': 'Estado de Asistencia',
+                'verbose_name_plural': 'Estados de Asistencia',
+                'db_table': 'estados_asistencia',
+            },
+        ),
+    ]
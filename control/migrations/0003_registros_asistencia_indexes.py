@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:21
+
+import django.db.models.functions.datetime
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Info: CREATE INDEX CONCURRENTLY no bloquea las inserciones de los lectores QR durante la migración
+    atomic = False
+
+    dependencies = [
+        ('control', '0002_estado_asistencia'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(fields=['fk_empleado', '-fecha_hora_registro', '-id'], name='reg_asist_empleado_fecha_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(fields=['-fecha_hora_registro', '-id'], name='reg_asist_fecha_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(fields=['lugar_registro', '-fecha_hora_registro'], name='reg_asist_sede_fecha_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(django.db.models.functions.datetime.TruncDate('fecha_hora_registro'), name='reg_asist_dia_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(condition=models.Q(('descripcion_registro', 'Entrada')), fields=['fk_empleado', '-fecha_hora_registro'], name='reg_asist_entradas_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(condition=models.Q(('estado_registro__isnull', False)), fields=['-fecha_hora_registro'], name='reg_asist_estado_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Info: Índice único CONCURRENTLY para no bloquear las inserciones de los lectores QR; luego se
+    # convierte en restricción con USING INDEX (sin reconstruirlo). La columna se agrega vacía (sin reescribir la tabla)
+    atomic = False
+
+    dependencies = [
+        ('control', '0003_registros_asistencia_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registroasistencia',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "reg_asist_clave_idem_uniq" '
+                        'ON "registros_asistencia" ("clave_idempotencia")',
+                        'ALTER TABLE "registros_asistencia" ADD CONSTRAINT "reg_asist_clave_idem_uniq" '
+                        'UNIQUE USING INDEX "reg_asist_clave_idem_uniq"',
+                    ],
+                    reverse_sql='ALTER TABLE "registros_asistencia" DROP CONSTRAINT IF EXISTS "reg_asist_clave_idem_uniq"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='registroasistencia',
+                    constraint=models.UniqueConstraint(fields=('clave_idempotencia',), name='reg_asist_clave_idem_uniq'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:51
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Info: Índices CONCURRENTLY para no bloquear las inserciones de los lectores QR.
+    # La columna se agrega vacía (sin reescribir la tabla); llenar con: python manage.py backfill_fecha_local
+    atomic = False
+
+    dependencies = [
+        ('control', '0004_registro_clave_idempotencia'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='registroasistencia',
+            name='reg_asist_dia_idx',
+        ),
+        migrations.AddField(
+            model_name='registroasistencia',
+            name='fecha_local',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='registroasistencia',
+            index=models.Index(fields=['fecha_local'], name='reg_asist_fecha_local_idx'),
+        ),
+    ]
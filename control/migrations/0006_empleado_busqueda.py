@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_search_text(apps, schema_editor):
+    # Info: Texto de búsqueda inicial de los empleados existentes
+    from control.services.employee_search import employee_search_text
+
+    Empleado = apps.get_model('control', 'Empleado')
+    EmpleadoBusqueda = apps.get_model('control', 'EmpleadoBusqueda')
+    EmpleadoBusqueda.objects.bulk_create(
+        (EmpleadoBusqueda(fk_empleado_id=employee.id, texto=employee_search_text(employee))
+         for employee in Empleado.objects.iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    # Info: Índice GIN de trigramas para LIKE '%texto%'; solo en PostgreSQL con la extensión pg_trgm disponible.
+    # Sin ella la búsqueda funciona igual, recorriendo la tabla de empleados (no la de registros)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS emp_busqueda_texto_trgm_idx ON empleados_busqueda USING gin (texto gin_trgm_ops)")
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS emp_busqueda_texto_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control', '0005_registro_fecha_local'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmpleadoBusqueda',
+            fields=[
+                ('fk_empleado', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='busqueda', serialize=False, to='control.empleado')),
+                ('texto', models.TextField()),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Búsqueda de Empleado',
+                'verbose_name_plural': 'Búsquedas de Empleados',
+                'db_table': 'empleados_busqueda',
+            },
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control', '0006_empleado_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiarioAsistencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('primera_entrada', models.DateTimeField(blank=True, null=True)),
+                ('ultima_salida', models.DateTimeField(blank=True, null=True)),
+                ('minutos_trabajados', models.IntegerField(default=0)),
+                ('minutos_retraso', models.IntegerField(default=0)),
+                ('minutos_anticipacion', models.IntegerField(default=0)),
+                ('registros', models.IntegerField(default=0)),
+                ('sedes', models.JSONField(default=list)),
+                ('salida_automatica', models.BooleanField(default=False)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+                ('fk_empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to='control.empleado')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Asistencia',
+                'verbose_name_plural': 'Resúmenes Diarios de Asistencia',
+                'db_table': 'resumenes_diarios_asistencia',
+                'indexes': [models.Index(fields=['fecha'], name='resumen_diario_fecha_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fk_empleado', 'fecha'), name='resumen_diario_empleado_fecha_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+def populate_sort_name(apps, schema_editor):
+    # Info: Nombre normalizado de los empleados que ya tienen texto de búsqueda
+    from control.services.employee_search import employee_sort_name
+
+    Empleado = apps.get_model('control', 'Empleado')
+    EmpleadoBusqueda = apps.get_model('control', 'EmpleadoBusqueda')
+    rows = [
+        EmpleadoBusqueda(fk_empleado_id=employee.id, nombre=employee_sort_name(employee))
+        for employee in Empleado.objects.filter(busqueda__isnull=False).iterator(chunk_size=1000)
+    ]
+    EmpleadoBusqueda.objects.bulk_update(rows, ["nombre"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    # Info: Índice CONCURRENTLY para no bloquear empleados_busqueda mientras se crea.
+    # El llenado de la columna sí corre en su propia transacción.
+    atomic = False
+
+    dependencies = [
+        ('control', '0007_resumen_diario_asistencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleadobusqueda',
+            name='nombre',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(populate_sort_name, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name='empleadobusqueda',
+            index=models.Index(fields=['nombre', 'fk_empleado'], name='emp_busqueda_nombre_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:02
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('control', '0008_empleado_busqueda_nombre'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnvioCorreoQR',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.EmailField(max_length=254)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=10)),
+                ('intentos', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('lote', models.UUIDField(default=uuid.uuid4)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_programada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+                ('fk_empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios_correo_qr', to='control.empleado')),
+            ],
+            options={
+                'verbose_name': 'Envío de Correo QR',
+                'verbose_name_plural': 'Envíos de Correos QR',
+                'db_table': 'envios_correo_qr',
+                'indexes': [models.Index(fields=['estado', 'fecha_programada'], name='envio_qr_estado_prog_idx'), models.Index(fields=['lote'], name='envio_qr_lote_idx')],
+            },
+        ),
+    ]
@@ -3,4 +3,8 @@ from .registro_asistencia import *
 from .sedes import *
 from .areas import *
 from .novedades import *
-from .horarios import *
\ No newline at end of file
+from .horarios import *
+from .estado_asistencia import *
+from .empleado_busqueda import *
+from .resumen_diario import *
+from .envio_correo_qr import *
@@ -0,0 +1,25 @@
+from django.db import models
+from .empleados import Empleado
+
+
+class EmpleadoBusqueda(models.Model):
+    # Info: Texto de búsqueda normalizado (sin tildes, en minúsculas) con nombres y documento de cada empleado.
+    # En PostgreSQL con pg_trgm se indexa con GIN (gin_trgm_ops) desde la migración 0006
+    fk_empleado = models.OneToOneField(
+        Empleado, on_delete=models.CASCADE, primary_key=True, related_name="busqueda")
+    texto = models.TextField()
+    # Info: Nombre completo normalizado en el orden del listado (apellidos y nombres): orden y cursor del buscador
+    nombre = models.TextField(default="")
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'empleados_busqueda'
+        verbose_name = 'Búsqueda de Empleado'
+        verbose_name_plural = 'Búsquedas de Empleados'
+        indexes = [
+            # Info: Páginas del buscador de empleados por cursor (nombre, id)
+            models.Index(fields=['nombre', 'fk_empleado'], name='emp_busqueda_nombre_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fk_empleado_id} - {self.texto}"
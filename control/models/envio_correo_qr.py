@@ -0,0 +1,40 @@
+import uuid
+from django.db import models
+from django.utils import timezone
+from .empleados import Empleado
+
+
+class EnvioCorreoQR(models.Model):
+    # Info: Correo con el código QR de un empleado en la cola de envío (ver control/services/qr_mail.py).
+    # fecha_programada es el próximo intento de un envío pendiente o el vencimiento del envío en curso
+    PENDIENTE, ENVIANDO, ENVIADO, FALLIDO = "pendiente", "enviando", "enviado", "fallido"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (ENVIANDO, "Enviando"),
+        (ENVIADO, "Enviado"),
+        (FALLIDO, "Fallido"),
+    ]
+
+    fk_empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name="envios_correo_qr")
+    destinatario = models.EmailField()
+    estado = models.CharField(max_length=10, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    # Info: Envíos encolados juntos (un envío individual o una acción masiva)
+    lote = models.UUIDField(default=uuid.uuid4)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_programada = models.DateTimeField(default=timezone.now)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'envios_correo_qr'
+        verbose_name = 'Envío de Correo QR'
+        verbose_name_plural = 'Envíos de Correos QR'
+        indexes = [
+            # Info: Envíos vencidos que toma el worker (pendientes y en curso abandonados)
+            models.Index(fields=['estado', 'fecha_programada'], name='envio_qr_estado_prog_idx'),
+            models.Index(fields=['lote'], name='envio_qr_lote_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fk_empleado_id} - {self.destinatario} - {self.estado}"
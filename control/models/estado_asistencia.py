@@ -0,0 +1,53 @@
+from django.db import models
+from .empleados import Empleado
+from .registro_asistencia import RegistroAsistencia
+
+class EstadoAsistencia(models.Model):
+    # Info: Estado actual de asistencia por empleado, actualizado en la misma transacción que cada registro
+    fk_empleado = models.OneToOneField(
+        Empleado, on_delete=models.CASCADE, primary_key=True, related_name="estado_asistencia")
+    fk_ultimo_registro = models.ForeignKey(
+        RegistroAsistencia, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    ultima_descripcion = models.CharField(max_length=20, null=True, blank=True)
+    ultima_fecha_hora = models.DateTimeField(null=True, blank=True)
+    fk_entrada_abierta = models.ForeignKey(
+        RegistroAsistencia, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    entrada_abierta_fecha_hora = models.DateTimeField(null=True, blank=True)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'estados_asistencia'
+        verbose_name = 'Estado de Asistencia'
+        verbose_name_plural = 'Estados de Asistencia'
+
+    def __str__(self):
+        return f"{self.fk_empleado_id} - {self.ultima_descripcion or 'Sin registros'}"
+
+    @classmethod
+    def from_history(cls, employee_id: int) -> "EstadoAsistencia":
+        # Info: Construye el estado (sin guardar) a partir del último registro histórico del empleado
+        state = cls(fk_empleado_id=employee_id)
+        last_record = (
+            RegistroAsistencia.objects
+            .filter(fk_empleado_id=employee_id)
+            .order_by('-fecha_hora_registro', '-id')
+            .first()
+        )
+        if last_record:
+            state.apply(last_record)
+        return state
+
+    def apply(self, record: RegistroAsistencia) -> None:
+        # Info: Avanza el estado en memoria con un nuevo registro del empleado
+        self.fk_ultimo_registro_id = record.id
+        self.ultima_descripcion = record.descripcion_registro
+        self.ultima_fecha_hora = record.fecha_hora_registro
+
+        # Info: La entrada abierta es el último registro cuando este es una Entrada
+        is_entry = record.descripcion_registro == "Entrada"
+        self.fk_entrada_abierta_id = record.id if is_entry else None
+        self.entrada_abierta_fecha_hora = record.fecha_hora_registro if is_entry else None
+
+    def persist(self) -> None:
+        # Info: Inserta el estado si es nuevo o lo actualiza por llave primaria en caso contrario
+        self.save(force_insert=self._state.adding)
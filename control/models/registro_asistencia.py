@@ -1,9 +1,31 @@
 from django.db import models
+from django.db.models import Q
+from django.dispatch import Signal
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .empleados import Empleado
 from .sedes import Sede
 
+# Info: Registros de asistencia insertados (save() o bulk_create); args: records (list[RegistroAsistencia])
+records_created = Signal()
+
+
+class RegistroAsistenciaQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Info: bulk_create no llama a save(); la fecha local se completa aquí para las inserciones masivas
+        objs = list(objs)
+        for obj in objs:
+            obj.set_local_date()
+        created = super().bulk_create(objs, *args, **kwargs)
+
+        # Warn: Con ignore_conflicts los objetos no reciben id; esos registros no se notifican
+        records = [obj for obj in created if obj.pk is not None]
+        if records:
+            records_created.send(sender=self.model, records=records)
+        return created
+
+
 class RegistroAsistencia(models.Model):
     fk_empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE)
     descripcion_registro = models.CharField(
@@ -15,11 +37,56 @@ class RegistroAsistencia(models.Model):
     lugar_registro = models.ForeignKey(Sede, on_delete=models.CASCADE)
     minutos = models.IntegerField(null=True, blank=True)
     estado_registro = models.CharField(max_length=50, null=True, blank=True)
+    # Info: Clave generada por el lector QR para ingestas por lote (evita duplicados en reintentos)
+    # Unicidad con reg_asist_clave_idem_uniq (índice creado CONCURRENTLY en la migración 0004)
+    clave_idempotencia = models.CharField(max_length=64, null=True, blank=True)
+    # Info: Día local (America/Bogota) del registro, desnormalizado para agrupar por día en reportes
+    fecha_local = models.DateField(null=True, blank=True, editable=False)
+
+    objects = RegistroAsistenciaQuerySet.as_manager()
 
     class Meta:
         db_table = 'registros_asistencia'
         verbose_name = 'Registro de Asistencia'
         verbose_name_plural = 'Registros de Asistencias'
+        indexes = [
+            # Info: Último registro por empleado (saveRecord, reconstrucción de estados)
+            models.Index(fields=['fk_empleado', '-fecha_hora_registro', '-id'], name='reg_asist_empleado_fecha_idx'),
+            # Info: Orden global del listado y rangos de fechas
+            models.Index(fields=['-fecha_hora_registro', '-id'], name='reg_asist_fecha_idx'),
+            # Info: Filtro por sede + fecha del listado DataTables
+            models.Index(fields=['lugar_registro', '-fecha_hora_registro'], name='reg_asist_sede_fecha_idx'),
+            # Info: Agrupación y filtros por día local en reportes
+            models.Index(fields=['fecha_local'], name='reg_asist_fecha_local_idx'),
+            # Info: Última Entrada por empleado (puntualidad de salidas)
+            models.Index(
+                fields=['fk_empleado', '-fecha_hora_registro'],
+                condition=Q(descripcion_registro='Entrada'),
+                name='reg_asist_entradas_idx'
+            ),
+            # Info: Registros con novedad de puntualidad (retrasos, anticipaciones, automáticas)
+            models.Index(
+                fields=['-fecha_hora_registro'],
+                condition=Q(estado_registro__isnull=False),
+                name='reg_asist_estado_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['clave_idempotencia'], name='reg_asist_clave_idem_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.fk_empleado} - {self.descripcion_registro} - {self.fecha_hora_registro}"
+
+    def save(self, *args, **kwargs):
+        self.set_local_date()
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            records_created.send(sender=type(self), records=[self])
+
+    def set_local_date(self) -> None:
+        # Info: Calcula fecha_local a partir de fecha_hora_registro en la zona horaria local
+        if isinstance(self.fecha_hora_registro, datetime):
+            value = self.fecha_hora_registro
+            self.fecha_local = timezone.localdate(value) if timezone.is_aware(value) else value.date()
@@ -0,0 +1,35 @@
+from django.db import models
+from .empleados import Empleado
+
+
+class ResumenDiarioAsistencia(models.Model):
+    # Info: Resumen precalculado de la asistencia de un empleado en un día local (America/Bogota).
+    # Se actualiza en la misma transacción que los registros del día (ver control/services/daily_rollup.py)
+    fk_empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name="resumenes_diarios")
+    fecha = models.DateField()
+    primera_entrada = models.DateTimeField(null=True, blank=True)
+    ultima_salida = models.DateTimeField(null=True, blank=True)
+    # Info: Minutos entre cada Entrada del día y su Salida (aunque la Salida ocurra después de medianoche)
+    minutos_trabajados = models.IntegerField(default=0)
+    minutos_retraso = models.IntegerField(default=0)
+    minutos_anticipacion = models.IntegerField(default=0)
+    registros = models.IntegerField(default=0)
+    # Info: IDs de las sedes donde el empleado registró asistencia ese día
+    sedes = models.JSONField(default=list)
+    salida_automatica = models.BooleanField(default=False)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'resumenes_diarios_asistencia'
+        verbose_name = 'Resumen Diario de Asistencia'
+        verbose_name_plural = 'Resúmenes Diarios de Asistencia'
+        constraints = [
+            models.UniqueConstraint(fields=['fk_empleado', 'fecha'], name='resumen_diario_empleado_fecha_uniq'),
+        ]
+        indexes = [
+            # Info: Reportes de un día o rango de días para todos los empleados
+            models.Index(fields=['fecha'], name='resumen_diario_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fk_empleado_id} - {self.fecha} - {self.minutos_trabajados} min"
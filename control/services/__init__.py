@@ -0,0 +1,11 @@
+from .roster_cache import *
+from .attendance_state import *
+from .attendance_rules import *
+from .record_counts import *
+from .local_dates import *
+from .employee_search import *
+from .daily_rollup import *
+from .record_events import *
+from .qr_codes import *
+from .qr_sheets import *
+from .qr_mail import *
\ No newline at end of file
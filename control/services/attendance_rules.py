@@ -0,0 +1,73 @@
+from datetime import datetime, time, timedelta
+from control.models import RegistroAsistencia
+
+
+# Info: Tiempo tras el cual una Entrada sin Salida se cierra con una salida automática
+AUTOMATIC_EXIT_AFTER = timedelta(hours=18)
+
+
+# ---------------------
+# Salida automática
+# ---------------------
+
+
+def compute_automatic_exit_time(entry_datetime: datetime) -> datetime:
+    '''
+    Info:
+        Calcula la hora de salida automática para una entrada sin salida según su rango horario.
+
+    Params:
+        entry_datetime (datetime): Fecha y hora de la entrada abierta.
+
+    Return:
+        datetime: Fecha y hora de la salida automática.
+    '''
+
+    # Info: Definir rangos horarios y reglas para salida automática
+    entry_time = entry_datetime.time()
+
+    # Info: Rangos horarios para aplicar reglas específicas
+    start_range_1, end_range_1 = time(5, 00), time(13, 30)  # 5:30 am - 1:30 pm
+    start_range_2, end_range_2 = time(13, 30), time(21, 0)  # 1:30 pm - 9:00 pm
+    fixed_exit_time = time(21, 30)  # 9:30 pm
+
+    # Info: Calcular hora de salida automática según reglas establecidas
+    if start_range_1 <= entry_time < end_range_1:
+        # Regla 1: Salida 9 horas después de la entrada (turno mañana)
+        return entry_datetime + timedelta(hours=9)
+    if start_range_2 <= entry_time < end_range_2:
+        # Regla 2: Salida fija a las 9:30 pm (turno tarde)
+        return entry_datetime.replace(
+            hour=fixed_exit_time.hour,
+            minute=fixed_exit_time.minute,
+            second=0,
+            microsecond=0
+        )
+
+    # Warn: Caso fuera de rangos definidos, aplicar regla por defecto
+    return entry_datetime + timedelta(hours=9)
+
+
+def build_automatic_exit(employee_id: int, entry_datetime: datetime, sede_id: int) -> RegistroAsistencia:
+    '''
+    Info:
+        Construye (sin guardar) el registro de salida automática cuando un empleado olvida registrar su salida.
+        Compartida por el escaneo y el cierre nocturno por lotes (comando close_open_entries).
+
+    Params:
+        employee_id (int): ID del empleado para el cual se crea la salida automática.
+        entry_datetime (datetime): Fecha y hora de la entrada abierta del empleado.
+        sede_id (int): ID de la sede donde se registra la asistencia.
+
+    Return:
+        RegistroAsistencia: Registro de salida automática sin guardar.
+    '''
+
+    # Info: Construir registro de salida automática
+    return RegistroAsistencia(
+        fk_empleado_id=employee_id,
+        descripcion_registro="Salida",
+        fecha_hora_registro=compute_automatic_exit_time(entry_datetime),
+        lugar_registro_id=sede_id,
+        estado_registro="Automática"
+    )
@@ -0,0 +1,171 @@
+from django.db import transaction
+from django.utils import timezone
+from control.models import EstadoAsistencia, RegistroAsistencia
+
+
+# ---------------------
+# Estado actual de asistencia
+# ---------------------
+
+
+def get_attendance_state(employee_id: int, lock: bool = False) -> EstadoAsistencia:
+    '''
+    Info:
+        Obtiene el estado actual de asistencia de un empleado con una lectura por llave primaria.
+        Si el empleado aún no tiene estado materializado, lo construye desde su historial (sin guardarlo).
+
+    Params:
+        employee_id (int): ID del empleado.
+        lock (bool): Bloquear la fila del estado hasta el fin de la transacción (ver lock_attendance_states).
+
+    Return:
+        EstadoAsistencia: Estado del empleado; nuevo (sin persistir) si no existía.
+    '''
+
+    if lock:
+        return lock_attendance_states([employee_id])[employee_id]
+
+    # Info: Lectura directa por llave primaria
+    if state := EstadoAsistencia.objects.filter(pk=employee_id).first():
+        return state
+
+    # Warn: Empleado sin estado materializado (historial previo a la tabla o estado eliminado)
+    return EstadoAsistencia.from_history(employee_id)
+
+
+def record_attendance_state(state: EstadoAsistencia, *records: RegistroAsistencia) -> EstadoAsistencia:
+    '''
+    Info:
+        Avanza el estado con los registros recién insertados y lo persiste.
+        Debe llamarse dentro de la misma transacción que inserta los registros.
+
+    Params:
+        state (EstadoAsistencia): Estado actual del empleado.
+        records (RegistroAsistencia): Registros insertados, en orden cronológico.
+
+    Return:
+        EstadoAsistencia: Estado actualizado.
+    '''
+
+    for record in records:
+        state.apply(record)
+    state.persist()
+    return state
+
+
+@transaction.atomic
+def refresh_attendance_state(employee_id: int) -> EstadoAsistencia | None:
+    '''
+    Info:
+        Recalcula el estado de un empleado desde su historial (tras ediciones o eliminaciones de registros).
+
+    Params:
+        employee_id (int): ID del empleado.
+
+    Return:
+        EstadoAsistencia | None: Estado recalculado, o None si el empleado ya no tiene registros.
+    '''
+
+    # Warn: El historial se lee después de bloquear el estado (como en los escaneos): un escaneo concurrente espera
+    # al recálculo o ya está confirmado y se incluye; leerlo antes sobrescribiría su estado con uno obsoleto
+    EstadoAsistencia.objects.bulk_create([EstadoAsistencia(fk_empleado_id=employee_id)], ignore_conflicts=True)
+    state = lock_attendance_states([employee_id])[employee_id]
+    last_record = (
+        RegistroAsistencia.objects
+        .filter(fk_empleado_id=employee_id)
+        .order_by('-fecha_hora_registro', '-id')
+        .first()
+    )
+
+    # Info: Sin registros no hay estado que conservar
+    if not last_record:
+        state.delete()
+        return None
+
+    state.apply(last_record)
+    state.persist()
+    return state
+
+
+def get_attendance_states(employee_ids: list[int], lock: bool = False) -> dict[int, EstadoAsistencia]:
+    '''
+    Info:
+        Obtiene en una sola consulta el estado de varios empleados (ingestas por lote).
+        Los empleados sin estado materializado se construyen desde su historial.
+
+    Params:
+        employee_ids (list[int]): IDs de los empleados.
+        lock (bool): Bloquear las filas de los estados hasta el fin de la transacción (ver lock_attendance_states).
+
+    Return:
+        dict[int, EstadoAsistencia]: Estados indexados por ID de empleado.
+    '''
+
+    if lock:
+        return lock_attendance_states(employee_ids)
+
+    states = EstadoAsistencia.objects.in_bulk(employee_ids)
+    for employee_id in employee_ids:
+        if employee_id not in states:
+            states[employee_id] = EstadoAsistencia.from_history(employee_id)
+    return states
+
+
+def lock_attendance_states(employee_ids: list[int]) -> dict[int, EstadoAsistencia]:
+    '''
+    Info:
+        Obtiene y bloquea (SELECT ... FOR UPDATE) el estado de los empleados hasta el fin de la transacción,
+        serializando los escaneos concurrentes de un mismo empleado sin bloquear a los demás.
+        Los estados faltantes se materializan antes de bloquear para que siempre exista una fila:
+        si dos transacciones los insertan a la vez, la segunda espera a la primera y conserva su fila.
+        Debe ejecutarse dentro de una transacción.
+
+    Params:
+        employee_ids (list[int]): IDs de los empleados.
+
+    Return:
+        dict[int, EstadoAsistencia]: Estados bloqueados indexados por ID de empleado.
+    '''
+
+    # Info: Bloquear siempre en orden de llave primaria evita interbloqueos entre lotes
+    employee_ids = sorted(set(employee_ids))
+    states = _select_states_for_update(employee_ids)
+
+    if missing := [employee_id for employee_id in employee_ids if employee_id not in states]:
+        # Warn: Empleado sin estado materializado; ignore_conflicts conserva la fila de quien la insertó primero
+        EstadoAsistencia.objects.bulk_create(
+            [EstadoAsistencia.from_history(employee_id) for employee_id in missing], ignore_conflicts=True)
+        states.update(_select_states_for_update(missing))
+
+    return states
+
+
+def _select_states_for_update(employee_ids: list[int]) -> dict[int, EstadoAsistencia]:
+    # Info: Lectura con bloqueo de fila (sin efecto en motores sin SELECT ... FOR UPDATE)
+    queryset = EstadoAsistencia.objects.select_for_update().filter(pk__in=employee_ids).order_by("pk")
+    return {state.pk: state for state in queryset}
+
+
+def save_attendance_states(states: list[EstadoAsistencia]) -> None:
+    '''
+    Info:
+        Persiste varios estados con una inserción y una actualización masivas.
+        Debe llamarse dentro de la misma transacción que inserta los registros.
+
+    Params:
+        states (list[EstadoAsistencia]): Estados ya avanzados con los registros insertados.
+
+    Return:
+        None: La función no retorna valor.
+    '''
+
+    fields = [
+        "fk_ultimo_registro", "ultima_descripcion", "ultima_fecha_hora",
+        "fk_entrada_abierta", "entrada_abierta_fecha_hora", "fecha_modificacion",
+    ]
+    now = timezone.now()
+    for state in states:
+        state.fecha_modificacion = now
+
+    EstadoAsistencia.objects.bulk_create([state for state in states if state._state.adding])
+    EstadoAsistencia.objects.bulk_update([state for state in states if not state._state.adding], fields)
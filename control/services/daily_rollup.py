@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, NamedTuple
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from control.models import EstadoAsistencia, RegistroAsistencia, ResumenDiarioAsistencia
+from .local_dates import local_day_start
+
+
+# Info: Campos recalculados de cada resumen diario (update_conflicts del upsert)
+ROLLUP_FIELDS = (
+    "primera_entrada", "ultima_salida", "minutos_trabajados", "minutos_retraso", "minutos_anticipacion",
+    "registros", "sedes", "salida_automatica", "fecha_modificacion",
+)
+
+
+class _Scan(NamedTuple):
+    fecha: date
+    fecha_hora: datetime
+    descripcion: str
+    sede_id: int
+    minutos: int | None
+    estado: str | None
+
+
+# ---------------------
+# Resumen diario de asistencia
+# ---------------------
+
+
+def update_daily_rollups(records: Iterable[RegistroAsistencia]) -> None:
+    '''
+    Info:
+        Actualiza los resúmenes diarios tras insertar registros (escaneos, lotes y salidas automáticas).
+        Recalcula el día local de cada registro y, si una Salida cierra una Entrada del día anterior
+        (turno nocturno), también ese día. Una consulta de lectura y un upsert por llamada.
+        Debe ejecutarse en la misma transacción que inserta los registros.
+
+    Params:
+        records (Iterable[RegistroAsistencia]): Registros recién insertados.
+    '''
+
+    record_days = defaultdict(set)
+    for record in records:
+        record_days[record.fk_empleado_id].add(rollup_day(record))
+    if not record_days:
+        return
+
+    all_days = set().union(*record_days.values())
+    sequences = _load_sequences(record_days, min(all_days) - timedelta(days=1), max(all_days))
+
+    rollups = []
+    for employee_id, days in record_days.items():
+        sequence = sequences.get(employee_id, [])
+
+        # Info: Día de la Entrada que cierra cada Salida de los días afectados (puede ser el día anterior)
+        days = days | {
+            previous.fecha for previous, current in zip(sequence, sequence[1:])
+            if current.fecha in days and current.descripcion == "Salida" and previous.descripcion == "Entrada"
+        }
+        rollups.extend(_build_rollups(employee_id, sequence, days).values())
+
+    _upsert(rollups)
+
+
+@transaction.atomic
+def refresh_daily_rollups(employee_days: dict[int, Iterable[date]]) -> None:
+    '''
+    Info:
+        Recalcula los resúmenes de días puntuales tras editar o eliminar registros.
+        También se recalcula el día anterior a cada uno: la Salida editada pudo cerrar una Entrada de ese día.
+        Los días que quedan sin registros pierden su resumen.
+
+    Params:
+        employee_days (dict[int, Iterable[date]]): Días locales afectados por ID de empleado.
+    '''
+
+    expanded = {
+        employee_id: {day - offset for day in days for offset in (timedelta(0), timedelta(days=1))}
+        for employee_id, days in employee_days.items() if days
+    }
+    if not expanded:
+        return
+
+    all_days = set().union(*expanded.values())
+    sequences = _load_sequences(expanded, min(all_days), max(all_days))
+
+    rollups, empty = [], Q(pk__in=[])
+    for employee_id, days in expanded.items():
+        built = _build_rollups(employee_id, sequences.get(employee_id, []), days)
+        rollups.extend(built.values())
+        if missing := days - built.keys():
+            empty |= Q(fk_empleado_id=employee_id, fecha__in=missing)
+
+    ResumenDiarioAsistencia.objects.filter(empty).delete()
+    _upsert(rollups)
+
+
+@transaction.atomic
+def rebuild_daily_rollups(employee_ids: list[int], start: date, end: date) -> int:
+    '''
+    Info:
+        Reconstruye desde los registros todos los resúmenes de los empleados indicados en un rango de días
+        (comando rebuild_daily_rollups, una transacción por bloque de empleados y días).
+        Reescribe los resúmenes del rango con el mismo upsert de los escaneos y elimina los que quedaron sin registros.
+
+    Params:
+        employee_ids (list[int]): IDs de los empleados.
+        start (date): Primer día local del rango.
+        end (date): Último día local del rango (incluido).
+
+    Return:
+        int: Cantidad de resúmenes escritos.
+    '''
+
+    # Warn: Bloquear los estados de asistencia del bloque (como los escaneos) antes de leer los registros:
+    # un escaneo simultáneo espera a la reconstrucción o ya está confirmado y se incluye en ella
+    list(EstadoAsistencia.objects.select_for_update().filter(pk__in=employee_ids).order_by("pk").values_list("pk", flat=True))
+
+    days = {start + timedelta(days=offset) for offset in range((end - start).days + 1)}
+    sequences = _load_sequences(employee_ids, start, end)
+
+    rollups = []
+    for employee_id, sequence in sequences.items():
+        rollups.extend(_build_rollups(employee_id, sequence, days).values())
+
+    rebuilt = {(rollup.fk_empleado_id, rollup.fecha) for rollup in rollups}
+    existing = (
+        ResumenDiarioAsistencia.objects
+        .filter(fk_empleado_id__in=employee_ids, fecha__gte=start, fecha__lte=end)
+        .values_list("id", "fk_empleado_id", "fecha")
+    )
+    ResumenDiarioAsistencia.objects.filter(
+        id__in=[rollup_id for rollup_id, *key in existing if tuple(key) not in rebuilt]).delete()
+    _upsert(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def rollup_day(record: RegistroAsistencia) -> date:
+    # Info: Día local al que pertenece un registro
+    return timezone.localdate(record.fecha_hora_registro)
+
+
+def _load_sequences(employee_ids: Iterable[int], first_day: date, last_day: date) -> dict[int, list[_Scan]]:
+    # Info: Registros de los empleados desde first_day hasta el día siguiente a last_day (Salidas tras medianoche),
+    # en orden cronológico; una sola consulta atendida por reg_asist_empleado_fecha_idx
+    rows = (
+        RegistroAsistencia.objects
+        .filter(
+            fk_empleado_id__in=list(employee_ids),
+            fecha_hora_registro__gte=local_day_start(first_day),
+            fecha_hora_registro__lt=local_day_start(last_day + timedelta(days=2)),
+        )
+        .order_by("fk_empleado_id", "fecha_hora_registro", "id")
+        .values_list("fk_empleado_id", "fecha_hora_registro", "descripcion_registro", "lugar_registro_id", "minutos", "estado_registro")
+    )
+
+    sequences = defaultdict(list)
+    for employee_id, fecha_hora, *rest in rows:
+        sequences[employee_id].append(_Scan(timezone.localdate(fecha_hora), fecha_hora, *rest))
+    return sequences
+
+
+def _build_rollups(employee_id: int, sequence: list[_Scan], days: set[date]) -> dict[date, ResumenDiarioAsistencia]:
+    # Info: Calcula (sin guardar) el resumen de cada día de days que tenga registros
+    rollups = {}
+    now = timezone.now()
+
+    for index, scan in enumerate(sequence):
+        if scan.fecha not in days:
+            continue
+
+        rollup = rollups.get(scan.fecha)
+        if rollup is None:
+            rollup = rollups[scan.fecha] = ResumenDiarioAsistencia(
+                fk_empleado_id=employee_id, fecha=scan.fecha, sedes=[], fecha_modificacion=now)
+
+        rollup.registros += 1
+        if scan.sede_id not in rollup.sedes:
+            rollup.sedes.append(scan.sede_id)
+        if scan.estado == "Con retraso":
+            rollup.minutos_retraso += scan.minutos or 0
+        elif scan.estado == "Con anticipación":
+            rollup.minutos_anticipacion += scan.minutos or 0
+
+        if scan.descripcion == "Salida":
+            rollup.ultima_salida = scan.fecha_hora
+            continue
+
+        # Info: Entrada: primera del día y tiempo trabajado hasta la Salida que la cierra (si existe)
+        rollup.primera_entrada = rollup.primera_entrada or scan.fecha_hora
+        following = sequence[index + 1] if index + 1 < len(sequence) else None
+        if following and following.descripcion == "Salida":
+            rollup.minutos_trabajados += int((following.fecha_hora - scan.fecha_hora).total_seconds() // 60)
+            rollup.salida_automatica |= following.estado == "Automática"
+
+    for rollup in rollups.values():
+        rollup.sedes.sort()
+    return rollups
+
+
+def _upsert(rollups: list[ResumenDiarioAsistencia], batch_size: int | None = None) -> None:
+    # Info: INSERT ... ON CONFLICT (fk_empleado, fecha) DO UPDATE (una sentencia por batch_size filas)
+    if rollups:
+        ResumenDiarioAsistencia.objects.bulk_create(
+            rollups, batch_size=batch_size, update_conflicts=True, unique_fields=["fk_empleado", "fecha"],
+            update_fields=ROLLUP_FIELDS)
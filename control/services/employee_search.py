@@ -0,0 +1,98 @@
+import unicodedata
+from typing import Iterable
+from django.db.models import QuerySet
+from control.models import Empleado, EmpleadoBusqueda
+
+
+# ---------------------
+# Búsqueda de empleados
+# ---------------------
+
+
+def normalize_search_text(value: str) -> str:
+    '''
+    Info:
+        Normaliza un texto para la búsqueda: sin tildes, en minúsculas y con espacios simples.
+        Se aplica igual al texto almacenado y a los términos buscados, por lo que "PEREZ" encuentra "Pérez".
+
+    Params:
+        value (str): Texto a normalizar.
+
+    Return:
+        str: Texto normalizado.
+    '''
+
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_accents.lower().split())
+
+
+def employee_search_text(employee: Empleado) -> str:
+    # Info: Nombres, apellidos y número de documento del empleado en un solo texto normalizado
+    parts = (
+        employee.primer_nombre, employee.segundo_nombre,
+        employee.primer_apellido, employee.segundo_apellido,
+        str(employee.numero_documento),
+    )
+    return normalize_search_text(" ".join(part for part in parts if part))
+
+
+def employee_sort_name(employee: Empleado) -> str:
+    # Info: Apellidos y nombres del empleado normalizados (mismo orden que nombre_completo del listado)
+    parts = (employee.primer_apellido, employee.segundo_apellido, employee.primer_nombre, employee.segundo_nombre)
+    return normalize_search_text(" ".join(part for part in parts if part))
+
+
+def sync_employee_search(employees: Iterable[Empleado]) -> None:
+    '''
+    Info:
+        Crea o actualiza el texto de búsqueda de los empleados indicados (un solo INSERT ... ON CONFLICT).
+
+    Params:
+        employees (Iterable[Empleado]): Empleados a sincronizar.
+    '''
+
+    rows = [
+        EmpleadoBusqueda(fk_empleado_id=employee.id, texto=employee_search_text(employee), nombre=employee_sort_name(employee))
+        for employee in employees
+    ]
+    if rows:
+        EmpleadoBusqueda.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["fk_empleado"], update_fields=["texto", "nombre", "fecha_modificacion"])
+
+
+def search_employee_ids(term: str) -> list[int]:
+    '''
+    Info:
+        Resuelve los empleados cuyo texto de búsqueda contiene todas las palabras del término, en cualquier orden.
+        Cada palabra es un LIKE '%palabra%' sobre empleados_busqueda, atendido por el índice GIN de trigramas
+        en PostgreSQL (pg_trgm); sin la extensión, o en SQLite, recorre solo la tabla de empleados.
+
+    Params:
+        term (str): Término buscado (nombre parcial, apellidos o número de documento).
+
+    Return:
+        list[int]: Ids de los empleados coincidentes.
+    '''
+
+    if not normalize_search_text(term):
+        return []
+    return list(filter_employee_search(EmpleadoBusqueda.objects.all(), term).values_list("fk_empleado_id", flat=True))
+
+
+def filter_employee_search(queryset: QuerySet, term: str) -> QuerySet:
+    '''
+    Info:
+        Filtra filas de empleados_busqueda por todas las palabras del término (LIKE '%palabra%' sobre el texto normalizado).
+
+    Params:
+        queryset (QuerySet): Filas de EmpleadoBusqueda.
+        term (str): Término buscado; vacío no filtra.
+
+    Return:
+        QuerySet: Filas coincidentes.
+    '''
+
+    for word in normalize_search_text(term).split():
+        queryset = queryset.filter(texto__contains=word)
+    return queryset
@@ -0,0 +1,40 @@
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+
+
+# ---------------------
+# Días locales (America/Bogota)
+# ---------------------
+
+
+def local_day_start(day: date) -> datetime:
+    '''
+    Info:
+        Retorna el instante en que inicia un día en la zona horaria local (TIME_ZONE).
+
+    Params:
+        day (date): Día local.
+
+    Return:
+        datetime: Medianoche local del día, con zona horaria.
+    '''
+
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def local_day_range(start: date, end: date | None = None) -> tuple[datetime, datetime]:
+    '''
+    Info:
+        Convierte un rango de días locales en un rango semiabierto [inicio, fin) de instantes.
+        Filtrar con fecha_hora_registro__gte / __lt compara la columna directamente, por lo que PostgreSQL
+        puede recorrer los índices sobre fecha_hora_registro (a diferencia de __date, que convierte cada fila).
+
+    Params:
+        start (date): Primer día local incluido.
+        end (date | None): Último día local incluido (por defecto, el mismo día de inicio).
+
+    Return:
+        tuple: (inicio, fin) con zona horaria; fin es la medianoche local del día siguiente a end.
+    '''
+
+    return local_day_start(start), local_day_start((end or start) + timedelta(days=1))
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+import qrcode
+from django.conf import settings
+
+
+# Info: Parámetros de dibujo de los códigos QR de los empleados (forman parte de la llave de la caché)
+QR_RENDER_OPTIONS = {
+    "version": 1,
+    "error_correction": "L",
+    "box_size": 10,
+    "border": 4,
+    "fill_color": "black",
+    "back_color": "white",
+}
+
+_ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+
+# ---------------------
+# Códigos QR
+# ---------------------
+
+
+def render_qr_png(payload: str, options: dict = QR_RENDER_OPTIONS) -> bytes:
+    '''
+    Info:
+        Dibuja un código QR como PNG con qrcode + PIL (operación costosa; usar qr_cache.get_png).
+
+    Params:
+        payload (str): Contenido del código (número de documento del empleado).
+        options (dict): Parámetros de dibujo.
+
+    Return:
+        bytes: Imagen PNG.
+    '''
+
+    qr = qrcode.QRCode(
+        version=options["version"],
+        error_correction=_ERROR_CORRECTION[options["error_correction"]],
+        box_size=options["box_size"],
+        border=options["border"],
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color=options["fill_color"], back_color=options["back_color"])
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def qr_cache_key(payload: str, options: dict = QR_RENDER_OPTIONS) -> str:
+    # Info: Hash del contenido y de los parámetros de dibujo: misma llave, misma imagen (sirve también como ETag)
+    rendering = "|".join(f"{name}={options[name]}" for name in sorted(options))
+    return hashlib.sha256(f"{payload}|{rendering}".encode()).hexdigest()
+
+
+class QRImageCache:
+    '''
+    Info:
+        Caché de imágenes QR direccionada por contenido (qr_cache_key): en memoria del proceso con desalojo LRU
+        y, si se configura un directorio, también en disco para conservarlas entre reinicios y compartirlas
+        entre procesos. Como la llave incluye el contenido, un cambio de documento produce otra llave
+        y no requiere invalidación.
+    '''
+
+    def __init__(self, max_size: int = 2000, directory: str = "") -> None:
+        self.max_size = max_size
+        self.directory = directory
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_png(self, payload: str) -> tuple[str, bytes]:
+        '''
+        Info:
+            Obtiene la imagen QR de un contenido: desde memoria, desde disco o dibujándola (y guardándola).
+
+        Params:
+            payload (str): Contenido del código.
+
+        Return:
+            tuple[str, bytes]: (llave de la imagen, PNG).
+        '''
+
+        key, png = self.peek(payload)
+        if png is None:
+            png = render_qr_png(payload)
+            self.put(payload, png)
+        return key, png
+
+    def peek(self, payload: str) -> tuple[str, bytes | None]:
+        '''
+        Info:
+            Busca la imagen de un contenido en memoria y luego en disco, sin dibujarla.
+
+        Params:
+            payload (str): Contenido del código.
+
+        Return:
+            tuple[str, bytes | None]: (llave de la imagen, PNG o None si no está en la caché).
+        '''
+
+        key = qr_cache_key(payload)
+        with self._lock:
+            if (png := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, png
+
+        # Info: Leer de disco fuera del lock para no bloquear otras lecturas
+        if (png := self._read_disk(key)) is None:
+            with self._lock:
+                self.misses += 1
+            return key, None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._store(key, png)
+        return key, png
+
+    def put(self, payload: str, png: bytes) -> str:
+        '''
+        Info:
+            Guarda una imagen dibujada fuera de get_png (p. ej. en el pool de procesos de la generación masiva).
+
+        Params:
+            payload (str): Contenido del código.
+            png (bytes): Imagen dibujada con los parámetros de QR_RENDER_OPTIONS.
+
+        Return:
+            str: Llave de la imagen.
+        '''
+
+        key = qr_cache_key(payload)
+        self._write_disk(key, png)
+        with self._lock:
+            self._store(key, png)
+        return key
+
+    def clear(self) -> None:
+        # Info: Vacía la memoria (el directorio en disco se conserva)
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        '''
+        Info:
+            Retorna los contadores de uso de la caché.
+
+        Return:
+            dict: Diccionario con tamaño, aciertos en memoria y en disco, imágenes dibujadas y desalojos.
+        '''
+
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _store(self, key: str, png: bytes) -> None:
+        # Info: Agregar la imagen y desalojar las menos usadas al superar el tamaño máximo (con el lock tomado)
+        self._entries[key] = png
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _read_disk(self, key: str) -> bytes | None:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, png: bytes) -> None:
+        # Info: Escritura atómica (archivo temporal + os.replace): otro proceso nunca lee una imagen a medias
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as file:
+            file.write(png)
+        os.replace(file.name, self._path(key))
+
+
+# Info: Instancia compartida por el proceso
+qr_cache = QRImageCache(
+    max_size=getattr(settings, "QR_CACHE_MAX_SIZE", 2000),
+    directory=getattr(settings, "QR_CACHE_DIR", ""),
+)
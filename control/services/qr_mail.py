@@ -0,0 +1,263 @@
+import logging
+import threading
+import uuid
+from datetime import timedelta
+from email.mime.image import MIMEImage
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.template.loader import render_to_string
+from django.utils import timezone
+from control.models import Empleado, CorreoInstitucional, EnvioCorreoQR
+from .qr_codes import qr_cache
+
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+
+QR_MAIL_SUBJECT = "Código QR para Control de Asistencia - Unicorsalud"
+
+QR_MAIL_TEXT = """
+Estimado/a {nombre} {apellido},
+
+Le saludamos cordialmente desde el Sistema de Control de Asistencia de Unicorsalud.
+
+Adjunto a este correo encontrará su código QR personal para el registro de entrada y salida en nuestras instalaciones. Este código es único e intransferible.
+
+INSTRUCCIONES DE USO:
+• Presente el código QR en los lectores ubicados en las entradas principales
+• Mantenga el código visible y en buen estado
+• En caso de pérdida o daño, contacte al departamento de Talento Humano
+
+IMPORTANTE: Este es un correo automático generado por nuestro sistema. Por favor, no responda a este mensaje.
+
+Si tiene alguna consulta o inconveniente, puede contactarnos a través de los canales oficiales de comunicación.
+
+Atentamente,
+
+Sistema de Control de Asistencia
+Unicorsalud
+
+---
+Este mensaje y sus adjuntos son confidenciales y están dirigidos exclusivamente al destinatario indicado.
+"""
+
+
+# ---------------------
+# Cola de correos con el código QR
+# ---------------------
+
+
+def build_qr_email(empleado: Empleado, destinatario: str, png: bytes) -> EmailMultiAlternatives:
+    '''
+    Info:
+        Construye el correo con el código QR del empleado: texto plano, alternativa HTML (utilities/mail_qr.html)
+        y la imagen inline referenciada como cid:qr_code.
+
+    Params:
+        empleado (Empleado): Empleado destinatario.
+        destinatario (str): Correo institucional.
+        png (bytes): Imagen QR (qr_cache).
+
+    Return:
+        EmailMultiAlternatives: Mensaje listo para enviar.
+    '''
+
+    email = EmailMultiAlternatives(
+        subject=QR_MAIL_SUBJECT,
+        body=QR_MAIL_TEXT.format(nombre=empleado.primer_nombre.title(), apellido=empleado.primer_apellido.title()),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[destinatario],
+    )
+    email.attach_alternative(render_to_string("utilities/mail_qr.html", {"empleado": empleado}), "text/html")
+
+    # Info: QR como imagen inline (para cid:qr_code)
+    qr_img = MIMEImage(png)
+    qr_img.add_header("Content-ID", "<qr_code>")
+    qr_img.add_header("Content-Disposition", "inline", filename=f"QR_Asistencia_{empleado.numero_documento}.png")
+    email.attach(qr_img)
+    return email
+
+
+def enqueue_qr_emails(employees: QuerySet) -> dict:
+    '''
+    Info:
+        Encola el correo con el código QR de cada empleado indicado, en un lote, y avisa al worker al confirmar
+        la transacción. Se omiten los empleados sin correo institucional y los que ya tienen un envío en cola.
+
+    Params:
+        employees (QuerySet): Empleados a incluir (se usan sus IDs como subconsulta).
+
+    Return:
+        dict: {"lote", "envios" (list[EnvioCorreoQR]), "sin_correo" (IDs), "en_cola" (IDs)}.
+    '''
+
+    correo = CorreoInstitucional.objects.filter(fk_empleado=OuterRef("pk")).order_by("id").values("correo_institucional")[:1]
+    rows = Empleado.objects.filter(id__in=employees.values("id")).annotate(correo=Subquery(correo)).values_list("id", "correo")
+    en_cola = set(
+        EnvioCorreoQR.objects
+        .filter(fk_empleado__in=employees.values("id"), estado__in=(EnvioCorreoQR.PENDIENTE, EnvioCorreoQR.ENVIANDO))
+        .values_list("fk_empleado_id", flat=True)
+    )
+
+    lote, sin_correo, envios = uuid.uuid4(), [], []
+    for employee_id, destinatario in rows:
+        if not destinatario:
+            sin_correo.append(employee_id)
+        elif employee_id not in en_cola:
+            envios.append(EnvioCorreoQR(fk_empleado_id=employee_id, destinatario=destinatario, lote=lote))
+
+    envios = EnvioCorreoQR.objects.bulk_create(envios)
+    if envios:
+        transaction.on_commit(qr_mail_worker.wake)
+    return {"lote": lote, "envios": envios, "sin_correo": sorted(sin_correo), "en_cola": sorted(en_cola)}
+
+
+def send_pending_qr_emails(batch_size: int | None = None) -> dict:
+    '''
+    Info:
+        Envía un lote de correos vencidos de la cola por una sola conexión (get_connection), mensaje por mensaje
+        para registrar el resultado de cada uno. Los envíos se reservan con SELECT ... FOR UPDATE SKIP LOCKED,
+        así varios workers no toman los mismos; una reserva vence tras QR_MAIL_SEND_TIMEOUT segundos
+        (worker caído) y el envío vuelve a tomarse. La reserva se renueva antes de cada mensaje y el resultado
+        se guarda apenas se envía, solo si la reserva sigue siendo de este worker.
+        Un envío fallido se reintenta con espera exponencial (QR_MAIL_RETRY_SECONDS, el doble en cada intento)
+        hasta QR_MAIL_MAX_ATTEMPTS intentos; luego queda "fallido" con el último error.
+
+    Params:
+        batch_size (int | None): Máximo de correos del lote; None usa QR_MAIL_BATCH_SIZE.
+
+    Return:
+        dict: {"enviados", "reintentos", "fallidos"}.
+    '''
+
+    batch_size = batch_size or getattr(settings, "QR_MAIL_BATCH_SIZE", 50)
+    send_timeout = timedelta(seconds=getattr(settings, "QR_MAIL_SEND_TIMEOUT", 300))
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EnvioCorreoQR.objects.select_for_update(skip_locked=True)
+            .filter(estado__in=(EnvioCorreoQR.PENDIENTE, EnvioCorreoQR.ENVIANDO), fecha_programada__lte=now)
+            .order_by("fecha_programada", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        EnvioCorreoQR.objects.filter(id__in=ids).update(
+            estado=EnvioCorreoQR.ENVIANDO, intentos=F("intentos") + 1, fecha_programada=now + send_timeout)
+
+    envios = list(EnvioCorreoQR.objects.filter(id__in=ids).select_related("fk_empleado").order_by("id"))
+    _send_qr_emails(envios, send_timeout)
+
+    result = {
+        "enviados": sum(envio.estado == EnvioCorreoQR.ENVIADO for envio in envios),
+        "reintentos": sum(envio.estado == EnvioCorreoQR.PENDIENTE for envio in envios),
+        "fallidos": sum(envio.estado == EnvioCorreoQR.FALLIDO for envio in envios),
+    }
+    if envios:
+        logger.info(f"Correos QR: {result}")
+    return result
+
+
+def _claimed(envio: EnvioCorreoQR) -> QuerySet:
+    # Info: El envío solo si sigue reservado por este worker (otra reserva incrementa intentos)
+    return EnvioCorreoQR.objects.filter(id=envio.id, estado=EnvioCorreoQR.ENVIANDO, intentos=envio.intentos)
+
+
+def _finish_qr_email(envio: EnvioCorreoQR, error: str | None) -> None:
+    # Info: Guarda el resultado de un envío: enviado, reintento programado o fallido
+    now = timezone.now()
+    if error is None:
+        envio.estado, envio.fecha_envio, envio.error = EnvioCorreoQR.ENVIADO, now, ""
+    elif envio.intentos >= getattr(settings, "QR_MAIL_MAX_ATTEMPTS", 5):
+        envio.estado, envio.error = EnvioCorreoQR.FALLIDO, error
+    else:
+        retry_seconds = getattr(settings, "QR_MAIL_RETRY_SECONDS", 60)
+        envio.estado, envio.error = EnvioCorreoQR.PENDIENTE, error
+        envio.fecha_programada = now + timedelta(seconds=retry_seconds * 2 ** (envio.intentos - 1))
+
+    if not _claimed(envio).update(
+            estado=envio.estado, fecha_envio=envio.fecha_envio, error=envio.error, fecha_programada=envio.fecha_programada):
+        logger.warning(f"Correo QR {envio.id}: la reserva venció durante el envío (QR_MAIL_SEND_TIMEOUT)")
+
+
+def _send_qr_emails(envios: list[EnvioCorreoQR], send_timeout: timedelta) -> None:
+    # Info: Envía los correos por una conexión abierta una vez y guarda el resultado de cada uno
+    if not envios:
+        return
+
+    connection = get_connection()
+    pending = iter(envios)
+    try:
+        connection.open()
+        for envio in pending:
+            # Warn: Si la reserva venció (p. ej. SMTP lento) otro worker pudo tomar el envío: se omite para no duplicarlo
+            envio.fecha_programada = timezone.now() + send_timeout
+            if not _claimed(envio).update(fecha_programada=envio.fecha_programada):
+                continue
+
+            try:
+                _, png = qr_cache.get_png(str(envio.fk_empleado.numero_documento))
+                if not connection.send_messages([build_qr_email(envio.fk_empleado, envio.destinatario, png)]):
+                    raise RuntimeError("El servidor no aceptó el mensaje")
+            except Exception as e:
+                _finish_qr_email(envio, f"{type(e).__name__}: {e}")
+                # Warn: Un error puede dejar la conexión SMTP inutilizable: se reabre para el resto del lote
+                connection.close()
+                connection.open()
+            else:
+                _finish_qr_email(envio, None)
+    except Exception as e:
+        # Warn: Sin conexión (al abrir o reabrir), el resto del lote queda para el siguiente intento
+        for envio in pending:
+            _finish_qr_email(envio, f"{type(e).__name__}: {e}")
+    finally:
+        connection.close()
+
+
+class QRMailWorker:
+    '''
+    Info:
+        Hilo opcional del proceso web que vacía la cola de correos QR: despierta al encolar (wake) y cada
+        poll_seconds para los reintentos programados, y envía lotes hasta que no quedan correos vencidos.
+        Solo corre con QR_MAIL_WORKER = True; por defecto los correos los envía el comando send_qr_emails --loop
+        como servicio aparte, sin hilos de fondo en los procesos de waitress.
+    '''
+
+    def __init__(self, poll_seconds: float = 30) -> None:
+        self.poll_seconds = poll_seconds
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    def wake(self) -> None:
+        # Info: Avisa que hay correos nuevos; inicia el hilo la primera vez
+        if not getattr(settings, "QR_MAIL_WORKER", False):
+            return
+        self._ensure_worker()
+        self._event.set()
+
+    def _ensure_worker(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if not (self._worker and self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="qr-mail-worker", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._event.wait(self.poll_seconds)
+            self._event.clear()
+
+            # Info: El hilo mantiene su propia conexión a la base de datos; se renueva si quedó obsoleta
+            close_old_connections()
+            try:
+                while any(send_pending_qr_emails().values()):
+                    pass
+            except Exception:
+                logger.exception("Error al enviar correos QR")
+
+
+# Info: Instancia compartida por el proceso
+qr_mail_worker = QRMailWorker(poll_seconds=getattr(settings, "QR_MAIL_POLL_SECONDS", 30))
@@ -0,0 +1,193 @@
+import base64
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from typing import Iterable, Iterator, NamedTuple
+import django
+from django.conf import settings
+from django.db.models import Exists, OuterRef, QuerySet
+from django.template.loader import render_to_string
+from django.utils.text import slugify
+from control.models import Empleado, RegistroAsistencia
+from .qr_codes import qr_cache, render_qr_png
+
+
+# Info: Empleados por bloque: solo las imágenes de un bloque viven en memoria a la vez
+QR_SHEET_CHUNK_SIZE = 200
+
+# Info: Tarjetas por página de la hoja imprimible (3 columnas x 4 filas en carta/A4)
+QR_SHEET_PER_PAGE = 12
+
+
+class QRSheetEmployee(NamedTuple):
+    id: int
+    nombre_completo: str
+    documento: str
+    numero_documento: int
+
+
+# ---------------------
+# Generación masiva de códigos QR
+# ---------------------
+
+
+def qr_sheet_employees(
+    sede_id: int | None = None, area_id: int | None = None, activo: bool | None = None, ids: list[int] | None = None,
+) -> QuerySet:
+    '''
+    Info:
+        Empleados a incluir en una generación masiva de códigos QR, ordenados por apellidos y nombres.
+        Los empleados no tienen sede asignada: el filtro por sede incluye a quienes tienen registros en ella.
+
+    Params:
+        sede_id (int | None): Sede donde el empleado tiene registros.
+        area_id (int | None): Área de trabajo del empleado.
+        activo (bool | None): Estado del empleado.
+        ids (list[int] | None): IDs puntuales.
+
+    Return:
+        QuerySet: Filas (id, apellidos, nombres, número y tipo de documento).
+    '''
+
+    queryset = Empleado.objects.order_by("primer_apellido", "segundo_apellido", "primer_nombre", "segundo_nombre", "id")
+    if ids:
+        queryset = queryset.filter(id__in=ids)
+    if activo is not None:
+        queryset = queryset.filter(activo=activo)
+    if area_id is not None:
+        queryset = queryset.filter(grupos__id=area_id)
+    if sede_id is not None:
+        queryset = queryset.filter(Exists(
+            RegistroAsistencia.objects.filter(fk_empleado=OuterRef("pk"), lugar_registro_id=sede_id)))
+    return queryset.values_list(
+        "id", "primer_apellido", "segundo_apellido", "primer_nombre", "segundo_nombre",
+        "numero_documento", "fk_tipo_documento__tipo_documento")
+
+
+def iter_qr_images(rows: Iterable[tuple], workers: int | None = None) -> Iterator[tuple[QRSheetEmployee, bytes]]:
+    '''
+    Info:
+        Produce el código QR de cada empleado en el orden recibido. Las imágenes que no están en qr_cache
+        se dibujan en paralelo en un pool de procesos (un proceso por núcleo), por bloques de QR_SHEET_CHUNK_SIZE.
+        Con workers <= 1 se dibujan en el proceso actual.
+
+    Params:
+        rows (Iterable[tuple]): Filas de qr_sheet_employees.
+        workers (int | None): Procesos del pool; None usa QR_SHEET_WORKERS (0 = núcleos disponibles).
+
+    Return:
+        Iterator[tuple[QRSheetEmployee, bytes]]: Empleado y PNG de su código.
+    '''
+
+    if workers is None:
+        workers = getattr(settings, "QR_SHEET_WORKERS", 0)
+    workers = workers or os.cpu_count() or 1
+    executor = _qr_executor(workers) if workers > 1 else None
+
+    try:
+        rows = iter(rows)
+        while chunk := [_sheet_employee(row) for row in islice(rows, QR_SHEET_CHUNK_SIZE)]:
+            payloads = [str(employee.numero_documento) for employee in chunk]
+            images = dict(zip(payloads, (png for _, png in map(qr_cache.peek, payloads))))
+            missing = [payload for payload, png in images.items() if png is None]
+
+            # Info: Solo las imágenes ausentes de la caché se dibujan (en paralelo si hay pool)
+            if executor and missing:
+                rendered = executor.map(render_qr_png, missing, chunksize=max(1, len(missing) // (workers * 4)))
+            else:
+                rendered = map(render_qr_png, missing)
+            for payload, png in zip(missing, rendered):
+                qr_cache.put(payload, png)
+                images[payload] = png
+
+            for employee, payload in zip(chunk, payloads):
+                yield employee, images[payload]
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def stream_qr_zip(rows: Iterable[tuple], workers: int | None = None) -> Iterator[bytes]:
+    '''
+    Info:
+        ZIP con un PNG por empleado (QR_<documento>_<nombre>.png), producido por fragmentos a medida que
+        se agregan los archivos: ni el ZIP ni el total de imágenes se arman en memoria.
+
+    Params:
+        rows (Iterable[tuple]): Filas de qr_sheet_employees.
+        workers (int | None): Procesos del pool de dibujo.
+
+    Return:
+        Iterator[bytes]: Fragmentos del archivo ZIP.
+    '''
+
+    buffer = _ZipBuffer()
+    # Info: PNG ya está comprimido: los archivos se almacenan sin volver a comprimir
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for employee, png in iter_qr_images(rows, workers):
+            archive.writestr(f"QR_{employee.numero_documento}_{slugify(employee.nombre_completo)}.png", png)
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def stream_qr_sheet_html(rows: Iterable[tuple], workers: int | None = None) -> Iterator[str]:
+    '''
+    Info:
+        Hoja HTML imprimible (o guardable como PDF desde el navegador) con el código, nombre y documento
+        de cada empleado, en páginas de QR_SHEET_PER_PAGE tarjetas. Se produce página por página.
+
+    Params:
+        rows (Iterable[tuple]): Filas de qr_sheet_employees.
+        workers (int | None): Procesos del pool de dibujo.
+
+    Return:
+        Iterator[str]: Fragmentos del documento HTML.
+    '''
+
+    yield render_to_string("utilities/qr_sheet.html", {"per_page": QR_SHEET_PER_PAGE})
+
+    cards = iter(
+        {"empleado": employee, "imagen": base64.b64encode(png).decode()}
+        for employee, png in iter_qr_images(rows, workers)
+    )
+    while page := list(islice(cards, QR_SHEET_PER_PAGE)):
+        yield render_to_string("utilities/qr_sheet_page.html", {"tarjetas": page})
+
+    yield "</body>\n</html>\n"
+
+
+class _ZipBuffer:
+    # Info: Destino de zipfile sin posicionamiento (sin tell/seek): acumula lo escrito hasta el siguiente pop()
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _sheet_employee(row: tuple) -> QRSheetEmployee:
+    # Info: Nombre completo y documento con el mismo formato de EmpleadoSerializer
+    employee_id, primer_apellido, segundo_apellido, primer_nombre, segundo_nombre, numero, tipo = row
+    return QRSheetEmployee(
+        id=employee_id,
+        nombre_completo=f"{primer_apellido} {segundo_apellido or ''} {primer_nombre} {segundo_nombre or ''}".strip(),
+        documento=f"{tipo} - " + f"{numero:,}".replace(",", "."),
+        numero_documento=numero,
+    )
+
+
+def _qr_executor(workers: int) -> ProcessPoolExecutor:
+    # Warn: Procesos "spawn" (no fork): el proceso web tiene hilos y conexiones abiertas que no deben duplicarse.
+    # Cada proceso inicializa Django antes de importar control.services.qr_codes
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=django.setup)
@@ -0,0 +1,69 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from control.models import RegistroAsistencia
+
+
+# ---------------------
+# Conteos del listado de registros
+# ---------------------
+
+
+def count_total_records() -> tuple[int, bool]:
+    '''
+    Info:
+        Retorna el total de registros de asistencia sin recorrer la tabla.
+        En PostgreSQL usa la estimación del planificador (pg_class.reltuples, actualizada por autovacuum/ANALYZE);
+        en otros motores, o si la tabla aún no tiene estadísticas, un COUNT(*) memorizado por RECORD_COUNT_CACHE_TTL.
+
+    Return:
+        tuple: (total, aproximado) donde aproximado indica que el total proviene de la estimación.
+    '''
+
+    estimate = _cached("record_count:estimate", lambda: _estimate_rows() or 0)
+    if estimate:
+        return estimate, True
+    return _cached("record_count:total", RegistroAsistencia.objects.count), False
+
+
+def count_filtered_records(queryset: QuerySet, signature: str) -> tuple[int, bool]:
+    '''
+    Info:
+        Cuenta los registros de un listado filtrado, memorizando el resultado por firma de filtros.
+        El conteo se acota a RECORD_COUNT_CAP: para filtros muy amplios se reporta "al menos N"
+        en lugar de recorrer todas las filas coincidentes.
+
+    Params:
+        queryset (QuerySet): Registros filtrados.
+        signature (str): Firma de los filtros aplicados (misma firma, mismo conteo).
+
+    Return:
+        tuple: (conteo, aproximado) donde aproximado indica que hay al menos ese número de registros.
+    '''
+
+    cap = getattr(settings, "RECORD_COUNT_CAP", 10000)
+    key = "record_count:" + hashlib.sha1(signature.encode()).hexdigest()
+
+    # Info: COUNT sobre una subconsulta con LIMIT cap + 1: se detiene al superar el tope
+    count = _cached(key, lambda: queryset.order_by()[:cap + 1].count())
+    return (cap, True) if count > cap else (count, False)
+
+
+def _cached(key: str, compute) -> int:
+    # Info: Memoriza el conteo durante RECORD_COUNT_CACHE_TTL segundos
+    if (value := cache.get(key)) is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, "RECORD_COUNT_CACHE_TTL", 30))
+    return value
+
+
+def _estimate_rows() -> int | None:
+    # Info: Estimación del planificador; None si no es PostgreSQL o la tabla nunca fue analizada
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [RegistroAsistencia._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] > 0 else None
@@ -0,0 +1,111 @@
+import queue
+import threading
+from django.conf import settings
+
+
+# ---------------------
+# Eventos de registros nuevos (pub/sub del proceso)
+# ---------------------
+
+
+class RecordSubscription:
+    '''
+    Info:
+        Suscripción de un cliente SSE: cola acotada con los eventos de registros nuevos (filtrados por sede).
+        Si la cola se llena, los eventos se descartan y se marca overflow: el cliente se resincroniza
+        consultando la base de datos en lugar de bloquear al hilo que publica.
+    '''
+
+    def __init__(self, sede_id: int | None, max_queue: int) -> None:
+        self.sede_id = sede_id
+        self.overflow = False
+        self._queue: queue.Queue[list[dict]] = queue.Queue(maxsize=max_queue)
+
+    def offer(self, events: list[dict]) -> None:
+        # Info: Encola los eventos de la sede suscrita sin bloquear al publicador
+        if self.sede_id is not None:
+            events = [event for event in events if event["fk_sede"] == self.sede_id]
+        if not events:
+            return
+        try:
+            self._queue.put_nowait(events)
+        except queue.Full:
+            self.overflow = True
+
+    def get(self, timeout: float) -> list[dict] | None:
+        '''
+        Info:
+            Espera el siguiente grupo de eventos publicado.
+
+        Params:
+            timeout (float): Segundos máximos de espera.
+
+        Return:
+            list[dict] | None: Eventos publicados, o None si se agotó la espera.
+        '''
+
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RecordEventBus:
+    '''
+    Info:
+        Pub/sub en memoria del proceso para los registros de asistencia recién insertados.
+        Se alimenta desde la señal records_created tras confirmar la transacción (ver control/signals.py)
+        y entrega los eventos a los flujos SSE de /api/registros-asistencias/eventos/.
+        Solo ve las inserciones de su propio proceso: los flujos SSE complementan con consultas periódicas.
+    '''
+
+    def __init__(self, max_queue: int = 100) -> None:
+        self.max_queue = max_queue
+        self._subscriptions: set[RecordSubscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(self, sede_id: int | None = None, limit: int | None = None) -> RecordSubscription | None:
+        '''
+        Info:
+            Registra un nuevo cliente (opcionalmente filtrado por sede).
+
+        Params:
+            sede_id (int | None): Sede a filtrar, o None para todas.
+            limit (int | None): Máximo de suscripciones simultáneas, o None sin límite.
+
+        Return:
+            RecordSubscription | None: Suscripción creada, o None si ya hay limit suscripciones.
+        '''
+
+        subscription = RecordSubscription(sede_id, self.max_queue)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                return None
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RecordSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, events: list[dict]) -> None:
+        '''
+        Info:
+            Entrega un grupo de eventos a todas las suscripciones activas.
+
+        Params:
+            events (list[dict]): Registros nuevos, con el formato del listado (serialize_record_rows).
+        '''
+
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.offer(events)
+
+
+# Info: Instancia compartida por el proceso
+record_events = RecordEventBus(max_queue=getattr(settings, "RECORD_EVENTS_MAX_QUEUE", 100))
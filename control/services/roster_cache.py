@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import time as time_of_day
+from typing import NamedTuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from control.models import Empleado
+
+
+# ---------------------
+# Estructuras del roster
+# ---------------------
+
+
+class HorarioRoster(NamedTuple):
+    # Info: Copia inmutable de un horario asignado al empleado
+    id: int
+    hora_entrada: time_of_day
+    hora_salida: time_of_day
+
+
+class EmpleadoRoster(NamedTuple):
+    # Info: Copia inmutable de los datos del empleado requeridos por el lector QR
+    id: int
+    numero_documento: int
+    activo: bool
+    primer_nombre: str
+    segundo_nombre: str | None
+    primer_apellido: str
+    segundo_apellido: str | None
+    cargo: str
+    horarios: tuple[HorarioRoster, ...]
+    areas_trabajo: tuple[int, ...]
+
+
+# ---------------------
+# Caché del roster
+# ---------------------
+
+
+class RosterCache:
+    '''
+    Info:
+        Caché en memoria del proceso con los empleados consultados por el lector QR, indexada por número de documento.
+        Limita el número de entradas con desalojo LRU, expira entradas por TTL y se invalida explícitamente
+        desde las señales de Empleado, Horario.miembros y AreaTrabajo.miembros (ver control/signals.py).
+
+        La tabla de empleados es externa (managed=False): los cambios hechos fuera de Django no emiten señales,
+        por lo que el TTL acota el tiempo máximo que un dato puede permanecer desactualizado.
+    '''
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, EmpleadoRoster]] = OrderedDict()
+        self._keys_by_id: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, numero_documento: int | str) -> EmpleadoRoster | None:
+        '''
+        Info:
+            Obtiene el empleado desde la caché o, si no está vigente, lo carga desde la base de datos.
+
+        Params:
+            numero_documento (int | str): Número de documento del empleado (código leído del QR).
+
+        Return:
+            EmpleadoRoster | None: Datos del empleado, o None si no existe un empleado con ese documento.
+        '''
+
+        key = int(numero_documento)
+        now = time.monotonic()
+
+        # Info: Buscar entrada vigente en la caché
+        with self._lock:
+            if (cached := self._entries.get(key)) and cached[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            generation = self._generation
+
+        # Info: Cargar el empleado fuera del lock para no bloquear otras lecturas
+        if (entry := self._load(key)) is None:
+            return None  # Return: Los documentos inexistentes no se almacenan
+
+        with self._lock:
+            # Warn: Si hubo una invalidación durante la carga, el dato leído puede estar desactualizado
+            if generation == self._generation:
+                self._store(key, entry, now)
+
+        return entry
+
+    async def aget(self, numero_documento: int | str) -> EmpleadoRoster | None:
+        '''
+        Info:
+            Variante asíncrona de get(): los aciertos se resuelven en memoria sin cambiar de hilo;
+            solo los fallos consultan la base de datos en un hilo de sincronización.
+
+        Params:
+            numero_documento (int | str): Número de documento del empleado (código leído del QR).
+
+        Return:
+            EmpleadoRoster | None: Datos del empleado, o None si no existe un empleado con ese documento.
+        '''
+
+        key = int(numero_documento)
+        with self._lock:
+            if (cached := self._entries.get(key)) and cached[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+
+        # Info: Fallo de caché; get() registra el fallo y carga el empleado
+        return await sync_to_async(self.get)(key)
+
+    def invalidate(self, employee_id: int) -> None:
+        '''
+        Info:
+            Elimina de la caché la entrada asociada a un empleado.
+
+        Params:
+            employee_id (int): ID del empleado modificado.
+
+        Return:
+            None: La función no retorna valor.
+        '''
+
+        with self._lock:
+            self._generation += 1
+            if (key := self._keys_by_id.pop(employee_id, None)) is not None:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        '''
+        Info:
+            Vacía la caché completa (cambios que afectan a un número indeterminado de empleados).
+
+        Return:
+            None: La función no retorna valor.
+        '''
+
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def stats(self) -> dict:
+        '''
+        Info:
+            Retorna los contadores de uso de la caché.
+
+        Return:
+            dict: Diccionario con tamaño, aciertos, fallos, desalojos y tasa de aciertos.
+        '''
+
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _store(self, key: int, entry: EmpleadoRoster, now: float) -> None:
+        # Info: Reemplazar entrada previa del mismo empleado (el documento pudo cambiar)
+        if (old_key := self._keys_by_id.get(entry.id)) is not None and old_key != key:
+            self._entries.pop(old_key, None)
+
+        self._entries[key] = (now + self.ttl, entry)
+        self._entries.move_to_end(key)
+        self._keys_by_id[entry.id] = key
+
+        # Info: Desalojar las entradas menos usadas al superar el tamaño máximo
+        while len(self._entries) > self.max_size:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._keys_by_id.pop(evicted.id, None)
+            self.evictions += 1
+
+    def _load(self, key: int) -> EmpleadoRoster | None:
+        # Info: Consultar el empleado con sus horarios y áreas en una sola carga
+        employee = (
+            Empleado.objects
+            .filter(numero_documento=key)
+            .prefetch_related("horarios", "grupos")
+            .first()
+        )
+        if not employee:
+            return None
+
+        return EmpleadoRoster(
+            id=employee.id,
+            numero_documento=employee.numero_documento,
+            activo=employee.activo,
+            primer_nombre=employee.primer_nombre,
+            segundo_nombre=employee.segundo_nombre,
+            primer_apellido=employee.primer_apellido,
+            segundo_apellido=employee.segundo_apellido,
+            cargo=employee.cargo,
+            horarios=tuple(
+                HorarioRoster(h.id, h.hora_entrada, h.hora_salida)
+                for h in employee.horarios.all()
+            ),
+            areas_trabajo=tuple(a.id for a in employee.grupos.all()),
+        )
+
+
+# Info: Instancia compartida por el proceso
+roster_cache = RosterCache(
+    max_size=getattr(settings, "ROSTER_CACHE_MAX_SIZE", 5000),
+    ttl=getattr(settings, "ROSTER_CACHE_TTL", 300),
+)
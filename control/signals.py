@@ -0,0 +1,109 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db import transaction
+from django.dispatch import receiver
+from control.models import Empleado, Horario, AreaTrabajo, RegistroAsistencia, records_created
+from control.services.roster_cache import roster_cache
+from control.services.employee_search import sync_employee_search
+from control.services.record_events import record_events
+from control.api.events import build_record_events
+
+
+# ---------------------
+# Invalidación del roster
+# ---------------------
+
+
+@receiver([post_save, post_delete], sender=Empleado)
+def invalidate_roster_employee(sender, instance: Empleado, **kwargs) -> None:
+    '''
+    Info:
+        Invalida la entrada del roster cuando se crea, modifica o elimina un empleado.
+    '''
+
+    roster_cache.invalidate(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Horario)
+def invalidate_roster_schedule(sender, instance: Horario, **kwargs) -> None:
+    '''
+    Info:
+        Vacía el roster cuando cambia un horario, ya que sus horas afectan a todos sus miembros.
+    '''
+
+    roster_cache.clear()
+
+
+@receiver(m2m_changed, sender=Horario.miembros.through)
+@receiver(m2m_changed, sender=AreaTrabajo.miembros.through)
+def invalidate_roster_members(sender, instance, action: str, reverse: bool, pk_set: set | None, **kwargs) -> None:
+    '''
+    Info:
+        Invalida el roster cuando cambian los miembros de un horario o de un área de trabajo.
+        Desde el lado del empleado (reverse) solo se invalida ese empleado; desde el horario/área
+        se invalidan los miembros afectados, o toda la caché en un clear() donde se desconocen.
+    '''
+
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+
+    # Info: Cambio realizado desde el empleado (empleado.horarios / empleado.grupos)
+    if reverse:
+        roster_cache.invalidate(instance.id)
+        return
+
+    # Warn: En clear() no se conoce el conjunto de miembros afectados
+    if pk_set is None:
+        roster_cache.clear()
+        return
+
+    for employee_id in pk_set:
+        roster_cache.invalidate(employee_id)
+
+
+@receiver(post_delete, sender=AreaTrabajo)
+def invalidate_roster_area(sender, instance: AreaTrabajo, **kwargs) -> None:
+    '''
+    Info:
+        Vacía el roster cuando se elimina un área de trabajo: sus membresías se borran en cascada sin emitir
+        m2m_changed (Django no envía señales de borrado para la tabla intermedia automática).
+    '''
+
+    roster_cache.clear()
+
+
+# ---------------------
+# Texto de búsqueda de empleados
+# ---------------------
+
+
+@receiver(post_save, sender=Empleado)
+def sync_employee_search_text(sender, instance: Empleado, raw: bool = False, **kwargs) -> None:
+    '''
+    Info:
+        Actualiza el texto de búsqueda normalizado cuando se crea o modifica un empleado.
+        Los empleados modificados fuera de Django se sincronizan con: python manage.py rebuild_employee_search
+    '''
+
+    if not raw:
+        sync_employee_search([instance])
+
+
+# ---------------------
+# Eventos en vivo de registros
+# ---------------------
+
+
+@receiver(records_created, sender=RegistroAsistencia)
+def publish_record_events(sender, records: list[RegistroAsistencia], **kwargs) -> None:
+    '''
+    Info:
+        Publica los registros nuevos a los flujos SSE del proceso una vez confirmada la transacción
+        (un registro revertido nunca llega al tablero). Sin clientes conectados no se hace ninguna consulta.
+    '''
+
+    if not record_events.has_subscribers:
+        return
+
+    # Info: robust: un error al publicar se registra en el log sin afectar al escaneo ya confirmado
+    ids = [record.id for record in records]
+    transaction.on_commit(lambda: record_events.publish(build_record_events(ids)), robust=True)
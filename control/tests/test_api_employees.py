@@ -0,0 +1,214 @@
+import os
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from control.models import Empleado, TipoDocumento, CorreoInstitucional, AreaTrabajo, Sede, RegistroAsistencia
+from control.services.qr_codes import QRImageCache, qr_cache, render_qr_png
+from control.services.qr_sheets import iter_qr_images, qr_sheet_employees
+
+
+class EmpleadoApiTestCase(TestCase):
+
+    def setUp(self):
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleados = [
+            Empleado.objects.create(
+                cargo="Docente", primer_nombre=f"Empleado {n}", primer_apellido="Pérez", segundo_apellido="Gómez",
+                fk_tipo_documento=tipo, numero_documento=1000 + n, activo=n < 3)
+            for n in range(5)
+        ]
+        CorreoInstitucional.objects.create(fk_empleado=self.empleados[0], correo_institucional="empleado0@colegio.edu.co")
+
+    def test_listado_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(reverse("ApiEmpleados")).json()
+
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]["correo_institucional"], "empleado0@colegio.edu.co")
+        self.assertEqual(data[0]["documento"], "CC - 1.000")
+        self.assertIsNone(data[1]["correo_institucional"])
+
+        activos = self.client.get(reverse("ApiEmpleados"), {"activo": "true"}).json()
+        self.assertEqual([row["id"] for row in activos], [empleado.id for empleado in self.empleados[:3]])
+
+    def test_opciones_compactas(self):
+        data = self.client.get(reverse("ApiEmpleadosOpciones"), {"activo": "false"}).json()
+        self.assertEqual(data, [
+            {"id": empleado.id, "nombre_completo": f"Pérez Gómez Empleado {n}", "activo": False}
+            for n, empleado in enumerate(self.empleados[3:], start=3)
+        ])
+
+    def test_opciones_condicionales(self):
+        url = reverse("ApiEmpleadosOpciones")
+        etag = self.client.get(url)["ETag"]
+
+        # Info: Sin cambios: 304 con la única consulta de la lista, sin serializarla ni enviarla
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Info: Cambio hecho por otro sistema (sin save() ni empleados_busqueda): nombre y estado forman parte del ETag
+        Empleado.objects.filter(id=self.empleados[2].id).update(primer_nombre="Renombrado", activo=False)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Pérez Gómez Renombrado", [row["nombre_completo"] for row in response.json()])
+        etag = response["ETag"]
+
+        empleado = self.empleados[1]
+        empleado.primer_nombre = "Carlos"
+        empleado.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.empleados[4].delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class EmpleadoBuscarTestCase(TestCase):
+
+    def setUp(self):
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        nombres = [("Ana", "Pérez"), ("Carlos", "Pérez"), ("Lucía", "Gómez"), ("José", "Núñez"), ("María", "Álvarez")]
+        self.empleados = {
+            nombre: Empleado.objects.create(
+                cargo="Docente", primer_nombre=nombre, primer_apellido=apellido, segundo_apellido="Ruiz",
+                fk_tipo_documento=tipo, numero_documento=2000 + n, activo=nombre != "José")
+            for n, (nombre, apellido) in enumerate(nombres)
+        }
+        self.area = AreaTrabajo.objects.create(area="Docencia")
+        self.area.miembros.add(self.empleados["Ana"], self.empleados["Lucía"])
+        self.url = reverse("ApiEmpleadosBuscar")
+
+    def ids(self, data):
+        return [row["id"] for row in data["results"]]
+
+    def test_busqueda_sin_tildes_por_nombre_y_documento(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(self.url, {"q": "PEREZ car"}).json()
+        self.assertEqual(data["results"], [
+            {"id": self.empleados["Carlos"].id, "nombre_completo": "Pérez Ruiz Carlos", "activo": True, "numero_documento": 2001},
+        ])
+        self.assertEqual(self.ids(self.client.get(self.url, {"q": "2003"}).json()), [self.empleados["José"].id])
+        self.assertEqual(self.ids(self.client.get(self.url, {"q": "nun"}).json()), [self.empleados["José"].id])
+
+    def test_paginas_por_cursor_en_orden_de_apellidos(self):
+        ids, params = [], {"limit": 2, "activo": "true"}
+        while True:
+            data = self.client.get(self.url, params).json()
+            ids += self.ids(data)
+            if not data["next"]:
+                break
+            params["cursor"] = data["next"]
+
+        expected = [self.empleados[nombre].id for nombre in ("María", "Lucía", "Ana", "Carlos")]
+        self.assertEqual(ids, expected)
+
+    def test_filtro_por_area(self):
+        data = self.client.get(self.url, {"area": self.area.id}).json()
+        self.assertEqual(self.ids(data), [self.empleados["Lucía"].id, self.empleados["Ana"].id])
+        self.assertEqual(self.client.get(self.url, {"area": "x"}).status_code, 400)
+
+
+class QRCacheTestCase(TestCase):
+
+    def setUp(self):
+        qr_cache.clear()
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+        self.url = reverse("ApiEmpleadoQR", args=[self.empleado.id])
+
+    def test_etag_y_304_sin_dibujar(self):
+        with mock.patch("control.services.qr_codes.render_qr_png", wraps=render_qr_png) as render:
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "image/png")
+            self.assertIn("max-age=", response["Cache-Control"])
+            etag = response["ETag"]
+
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(self.url).content, response.content)
+            self.assertEqual(render.call_count, 1)
+
+        # Info: Otro documento, otra llave (sin invalidación explícita)
+        self.empleado.numero_documento = 1002
+        self.empleado.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_cache_en_disco_y_lru(self):
+        with tempfile.TemporaryDirectory() as directory:
+            QRImageCache(directory=directory).get_png("1001")
+
+            cache = QRImageCache(max_size=1, directory=directory)
+            with mock.patch("control.services.qr_codes.render_qr_png", wraps=render_qr_png) as render:
+                cache.get_png("1001")
+                cache.get_png("1002")
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+            self.assertEqual((cache.stats()["size"], cache.stats()["evictions"]), (1, 1))
+
+
+@override_settings(QR_SHEET_WORKERS=1)
+class QRLoteTestCase(TestCase):
+
+    def setUp(self):
+        qr_cache.clear()
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        nombres = [("Ana", "Pérez"), ("Carlos", "Gómez"), ("Lucía", "Díaz")]
+        self.empleados = [
+            Empleado.objects.create(
+                cargo="Docente", primer_nombre=nombre, primer_apellido=apellido, segundo_apellido="Ruiz",
+                fk_tipo_documento=tipo, numero_documento=3000 + n, activo=nombre != "Carlos")
+            for n, (nombre, apellido) in enumerate(nombres)
+        ]
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        RegistroAsistencia.objects.create(
+            fk_empleado=self.empleados[0], descripcion_registro="Entrada", lugar_registro=self.sede)
+        self.url = reverse("ApiEmpleadosQRLote")
+
+    def test_zip_con_un_png_por_empleado(self):
+        response = self.client.get(self.url, {"activo": "true"})
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        with zipfile.ZipFile(BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), ["QR_3002_diaz-ruiz-lucia.png", "QR_3000_perez-ruiz-ana.png"])
+            self.assertEqual(archive.read("QR_3000_perez-ruiz-ana.png"), render_qr_png("3000"))
+
+    def test_hoja_html_y_filtros(self):
+        response = self.client.get(self.url, {"file_format": "html", "sede": self.sede.id})
+        html = b"".join(response.streaming_content).decode()
+        self.assertIn("Pérez Ruiz Ana", html)
+        self.assertIn("CC - 3.000", html)
+        self.assertNotIn("Gómez", html)
+        self.assertTrue(html.rstrip().endswith("</html>"))
+
+        ids = [row[0] for row in qr_sheet_employees(ids=[self.empleados[1].id, self.empleados[2].id])]
+        self.assertEqual(ids, [self.empleados[2].id, self.empleados[1].id])
+        self.assertEqual(self.client.get(self.url, {"file_format": "pdf"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"ids": "1,x"}).status_code, 400)
+
+    def test_pool_de_procesos_y_cache(self):
+        rows = list(qr_sheet_employees())
+        images = [png for _, png in iter_qr_images(rows, workers=2)]
+        self.assertEqual(images, [render_qr_png(str(row[5])) for row in rows])
+
+        # Info: Segunda pasada desde la caché, sin dibujar
+        with mock.patch("control.services.qr_sheets.render_qr_png") as render:
+            self.assertEqual([png for _, png in iter_qr_images(rows, workers=1)], images)
+        render.assert_not_called()
+
+    def test_comando(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "qr.zip")
+            call_command("generate_qr_sheets", "--output", output, "--ids", str(self.empleados[1].id), stdout=StringIO())
+            with zipfile.ZipFile(output) as archive:
+                self.assertEqual(archive.namelist(), ["QR_3001_gomez-ruiz-carlos.png"])
@@ -0,0 +1,337 @@
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia, AreaTrabajo, EmpleadoBusqueda
+from control.api.serializers import RegistroAsistenciaSerializer, RECORD_ROW_FIELDS, serialize_record_rows
+from control.api.exports import EXPORT_COLUMNS
+
+
+class RegistroAsistenciaListTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+        # Info: 8 registros; los dos más antiguos comparten fecha (desempate por id)
+        start = timezone.now() - timedelta(days=10)
+        fechas = [start, start] + [start + timedelta(hours=n) for n in range(1, 7)]
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(
+                fk_empleado=self.empleado, descripcion_registro="Entrada" if n % 2 == 0 else "Salida",
+                fecha_hora_registro=fecha, lugar_registro=self.sede)
+            for n, fecha in enumerate(fechas)
+        ])
+        self.expected = list(
+            RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id").values_list("id", flat=True))
+        self.url = reverse("ApiRegistrosAsistencias")
+
+    def get(self, **params):
+        return self.client.get(self.url, {"length": 3, **params}).json()
+
+    def test_cursor_recorre_todas_las_paginas(self):
+        page = self.get()
+        ids = [row["id"] for row in page["data"]]
+        while page["cursor"]["next"]:
+            page = self.get(cursor=page["cursor"]["next"])
+            ids += [row["id"] for row in page["data"]]
+
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(page["recordsFiltered"], 8)
+
+    def test_cursor_pagina_anterior(self):
+        first = self.get()
+        second = self.get(cursor=first["cursor"]["next"])
+        previous = self.get(cursor=second["cursor"]["previous"], direction="prev")
+
+        self.assertEqual([row["id"] for row in previous["data"]], self.expected[:3])
+        self.assertIsNone(previous["cursor"]["previous"])
+
+    def test_desplazamiento_como_respaldo(self):
+        # Info: Sin cursor (o con uno inválido) se mantiene el contrato draw/start/length
+        page = self.get(start=3, draw=4, cursor="invalido")
+
+        self.assertEqual(page["draw"], 4)
+        self.assertEqual([row["id"] for row in page["data"]], self.expected[3:6])
+
+    def test_conteo_filtrado_memorizado(self):
+        self.get(employee=self.empleado.id)
+
+        # Info: Misma firma de filtros -> sin consultas de conteo
+        with CaptureQueriesContext(connection) as queries:
+            page = self.get(employee=self.empleado.id)
+        self.assertFalse([q for q in queries.captured_queries if "COUNT(" in q["sql"]])
+        self.assertEqual(page["recordsFiltered"], 8)
+        self.assertFalse(page["recordsApproximate"])
+
+    @override_settings(RECORD_COUNT_CAP=5)
+    def test_conteo_acotado_al_menos_n(self):
+        page = self.get(sede=self.sede.id)
+
+        self.assertEqual(page["recordsFiltered"], 5)
+        self.assertTrue(page["recordsApproximate"])
+
+    def test_serializador_rapido_identico(self):
+        otro = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Luis", primer_apellido="Gómez", segundo_apellido="Ruiz",
+            fk_tipo_documento=self.empleado.fk_tipo_documento, numero_documento=1234567890, activo=True)
+        for nombre in ("Docencia", "Investigación"):
+            AreaTrabajo.objects.create(area=nombre).miembros.add(self.empleado)
+        RegistroAsistencia.objects.create(
+            fk_empleado=otro, descripcion_registro="Entrada", fecha_hora_registro=timezone.now(),
+            lugar_registro=self.sede, minutos=12, estado_registro="Con retraso")
+
+        queryset = RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id")
+        expected = RegistroAsistenciaSerializer(queryset, many=True).data
+
+        # Info: Página completa en 2 consultas (filas + áreas) y mismo JSON que el serializador DRF
+        with self.assertNumQueries(2):
+            rows = serialize_record_rows(list(queryset.values(*RECORD_ROW_FIELDS)))
+        self.assertEqual(json.dumps(rows), json.dumps(expected))
+
+
+class RegistroAsistenciaPorDiaTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        area = AreaTrabajo.objects.create(area="Docencia")
+        empleados = [
+            Empleado.objects.create(
+                cargo="Docente", primer_nombre=f"Empleado {n}", primer_apellido="Pérez",
+                fk_tipo_documento=tipo, numero_documento=1000 + n, activo=True)
+            for n in range(6)
+        ]
+        area.miembros.add(*empleados)
+
+        self.day = date(2025, 3, 14)
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(
+                fk_empleado=empleado, descripcion_registro="Entrada", lugar_registro=self.sede,
+                fecha_hora_registro=timezone.make_aware(datetime.combine(self.day, time(7, n))))
+            for n, empleado in enumerate(empleados)
+        ])
+        self.expected = list(
+            RegistroAsistencia.objects.order_by("-fecha_hora_registro", "-id").values_list("id", flat=True))
+        self.url = reverse("ApiRegistrosAsistenciasPorDia")
+
+    def get(self, **params):
+        return self.client.get(self.url, {"fecha": self.day.isoformat(), **params}).json()
+
+    def test_paginas_por_cursor_con_consultas_constantes(self):
+        # Info: Conteo del día, página y áreas de sus empleados: sin consultas por fila
+        with self.assertNumQueries(3):
+            page = self.get(length=4, draw=2)
+        self.assertEqual((page["draw"], page["recordsTotal"]), (2, 6))
+        self.assertEqual(page["data"][0]["fk_areas_trabajo"], [AreaTrabajo.objects.get().id])
+
+        with self.assertNumQueries(2):
+            following = self.get(length=4, cursor=page["cursor"]["next"])
+        self.assertEqual([row["id"] for row in page["data"] + following["data"]], self.expected)
+        self.assertIsNone(following["cursor"]["next"])
+
+    @override_settings(RECORD_PAGE_MAX_LENGTH=2)
+    def test_tope_de_pagina(self):
+        self.assertEqual(len(self.get(length=50)["data"]), 2)
+        self.assertEqual(len(self.get(length=-1)["data"]), 2)
+        self.assertEqual(len(self.get()["data"]), 2)
+        self.assertEqual(len(self.client.get(reverse("ApiRegistrosAsistencias"), {"length": -1}).json()["data"]), 2)
+
+    def test_fecha_invalida(self):
+        self.assertEqual(self.client.get(self.url, {"fecha": "14/03/2025"}).status_code, 400)
+
+
+class LocalDateFilterTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+        # Info: 23:30 en Bogotá ya es el día siguiente en UTC
+        self.day = date(2025, 3, 14)
+        self.late = RegistroAsistencia.objects.create(
+            fk_empleado=self.empleado, descripcion_registro="Salida", lugar_registro=self.sede,
+            fecha_hora_registro=timezone.make_aware(datetime.combine(self.day, time(23, 30))))
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(
+                fk_empleado=self.empleado, descripcion_registro="Entrada", lugar_registro=self.sede,
+                fecha_hora_registro=timezone.make_aware(datetime.combine(self.day + timedelta(days=1), time(0, 10)))),
+        ])
+
+    def test_registro_nocturno_en_su_dia_local(self):
+        page = self.client.get(reverse("ApiRegistrosAsistencias"), {
+            "start_date": "2025-03-14", "end_date": "2025-03-14", "length": 10}).json()
+        self.assertEqual([row["id"] for row in page["data"]], [self.late.id])
+
+        data = self.client.get(reverse("ApiRegistrosAsistenciasPorDia"), {"fecha": "2025-03-14"}).json()
+        self.assertEqual([row["id"] for row in data["data"]], [self.late.id])
+
+    def test_fecha_local_en_save_y_bulk_create(self):
+        self.assertEqual(
+            list(RegistroAsistencia.objects.order_by("fecha_hora_registro").values_list("fecha_local", flat=True)),
+            [self.day, self.day + timedelta(days=1)])
+
+    def test_backfill_fecha_local(self):
+        RegistroAsistencia.objects.update(fecha_local=None)
+        call_command("backfill_fecha_local", chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(RegistroAsistencia.objects.get(pk=self.late.pk).fecha_local, self.day)
+        self.assertFalse(RegistroAsistencia.objects.filter(fecha_local__isnull=True).exists())
+
+
+class RecordSearchTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Sede Norte", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.maria = Empleado.objects.create(
+            cargo="Docente", primer_nombre="María", segundo_nombre="José", primer_apellido="Núñez",
+            fk_tipo_documento=tipo, numero_documento=52123456, activo=True)
+        self.luis = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Luis", primer_apellido="Gómez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+        for empleado in (self.maria, self.luis):
+            RegistroAsistencia.objects.create(
+                fk_empleado=empleado, descripcion_registro="Entrada", lugar_registro=self.sede)
+
+    def search(self, value):
+        page = self.client.get(reverse("ApiRegistrosAsistencias"), {"search[value]": value, "length": 10}).json()
+        return {row["fk_empleado"] for row in page["data"]}
+
+    def test_busqueda_sin_tildes_y_en_cualquier_orden(self):
+        self.assertEqual(self.search("MARIA nunez"), {self.maria.id})
+        self.assertEqual(self.search("núñez maría"), {self.maria.id})
+        self.assertEqual(self.search("5212"), {self.maria.id})
+        self.assertEqual(self.search("zzz"), set())
+
+    def test_busqueda_por_sede_y_descripcion(self):
+        self.assertEqual(self.search("norte"), {self.maria.id, self.luis.id})
+        self.assertEqual(self.search("entrada"), {self.maria.id, self.luis.id})
+
+    def test_texto_sincronizado_al_guardar(self):
+        self.luis.primer_apellido = "Peña"
+        self.luis.save()
+
+        self.assertEqual(self.search("pena"), {self.luis.id})
+        self.assertEqual(self.search("gomez"), set())
+
+    def test_rebuild_employee_search(self):
+        EmpleadoBusqueda.objects.all().delete()
+        call_command("rebuild_employee_search", stdout=StringIO())
+
+        self.assertEqual(EmpleadoBusqueda.objects.get(pk=self.maria.id).texto, "maria jose nunez 52123456")
+
+
+class RegistroAsistenciaExportTestCase(TestCase):
+
+    def setUp(self):
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        otra = Sede.objects.create(ubicacion="Norte", ciudad="Soledad")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1234567, activo=True)
+
+        start = timezone.now() - timedelta(days=3)
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(
+                fk_empleado=self.empleado, descripcion_registro="Entrada" if n % 2 == 0 else "Salida",
+                fecha_hora_registro=start + timedelta(hours=n), lugar_registro=self.sede if n < 5 else otra,
+                minutos=n if n % 2 == 0 else None)
+            for n in range(7)
+        ])
+        self.url = reverse("ApiRegistrosAsistenciasExport")
+
+    def expected(self, **filters):
+        queryset = RegistroAsistencia.objects.filter(**filters).order_by("-fecha_hora_registro", "-id")
+        return RegistroAsistenciaSerializer(queryset, many=True).data
+
+    def test_exportar_csv_con_filtros(self):
+        response = self.client.get(self.url, {"sede": self.sede.id})
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(rows[0], [header for header, _ in EXPORT_COLUMNS])
+        self.assertEqual(rows[1:], [
+            ["" if record[field] is None else str(record[field]) for _, field in EXPORT_COLUMNS]
+            for record in self.expected(lugar_registro=self.sede)
+        ])
+
+    def test_exportar_xlsx(self):
+        response = self.client.get(self.url, {"file_format": "xlsx"})
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)["Registros"]
+        rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[1], [self.expected()[0][field] for _, field in EXPORT_COLUMNS])
+
+    def test_formato_no_soportado(self):
+        self.assertEqual(self.client.get(self.url, {"file_format": "pdf"}).status_code, 400)
+
+
+class RegistroAsistenciaResumenDiaTestCase(TestCase):
+
+    def setUp(self):
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        self.norte = Sede.objects.create(ubicacion="Norte", ciudad="Soledad")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        ana = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+        luis = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Luis", primer_apellido="Gómez",
+            fk_tipo_documento=tipo, numero_documento=1002, activo=True)
+        AreaTrabajo.objects.create(area="Docencia").miembros.add(ana, luis)
+        AreaTrabajo.objects.create(area="Investigación").miembros.add(ana)
+
+        self.day = date(2025, 3, 14)
+        local = lambda day, hour, minute=0: timezone.make_aware(datetime.combine(day, time(hour, minute)))
+        RegistroAsistencia.objects.bulk_create([
+            RegistroAsistencia(fk_empleado=ana, descripcion_registro="Entrada", fecha_hora_registro=local(self.day, 6, 50), lugar_registro=self.sede),
+            RegistroAsistencia(fk_empleado=luis, descripcion_registro="Entrada", fecha_hora_registro=local(self.day, 7, 5), lugar_registro=self.norte),
+            RegistroAsistencia(fk_empleado=ana, descripcion_registro="Salida", fecha_hora_registro=local(self.day, 16, 0), lugar_registro=self.sede),
+            RegistroAsistencia(fk_empleado=luis, descripcion_registro="Salida", fecha_hora_registro=local(self.day, 23, 30), lugar_registro=self.norte),
+            RegistroAsistencia(fk_empleado=ana, descripcion_registro="Entrada", fecha_hora_registro=local(date(2025, 3, 10), 7), lugar_registro=self.sede),
+            RegistroAsistencia(fk_empleado=ana, descripcion_registro="Entrada", fecha_hora_registro=local(date(2025, 3, 20), 7), lugar_registro=self.sede),
+        ])
+
+    def test_resumen_del_dia(self):
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse("ApiRegistrosAsistenciasResumenDia"), {"fecha": "2025-03-14"}).json()
+
+        rangos = {r["hora_inicio"]: (r["entradas"], r["salidas"]) for r in data["rangos"]}
+        self.assertEqual(data["total"], 4)
+        self.assertEqual(rangos[5], (1, 0))
+        self.assertEqual(rangos[7], (1, 0))
+        self.assertEqual(rangos[15], (0, 1))
+        self.assertEqual(data["fuera_de_rango"], {"entradas": 0, "salidas": 1})
+        self.assertEqual(
+            [(s["sede"], s["registros"], s["entradas"], s["salidas"]) for s in data["sedes"]],
+            [("Norte - Soledad", 2, 1, 1), ("Principal - Barranquilla", 2, 1, 1)])
+        self.assertEqual(
+            [(a["area"], a["entradas"], a["salidas"]) for a in data["areas"]],
+            [("Docencia", 2, 2), ("Investigación", 1, 1)])
+        self.assertEqual((data["fecha_min"], data["fecha_max"]), ("2025-03-10", "2025-03-20"))
+
+    def test_fecha_invalida(self):
+        response = self.client.get(reverse("ApiRegistrosAsistenciasResumenDia"), {"fecha": "14/03/2025"})
+        self.assertEqual(response.status_code, 400)
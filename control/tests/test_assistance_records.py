@@ -0,0 +1,243 @@
+import json
+import threading
+from datetime import datetime, time, timedelta
+from unittest import mock, skipUnless
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia, EstadoAsistencia, Horario
+from control.services import attendance_state
+from control.services.roster_cache import roster_cache
+
+
+class SaveRecordTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+        session = self.client.session
+        session["sede_id"] = self.sede.id
+        session.save()
+
+        self.url = reverse("saveRecord")
+
+    def scan(self, codigo=1001, at=None):
+        with mock.patch("django.utils.timezone.now", return_value=at or timezone.now()):
+            return self.client.post(self.url, data=json.dumps({"codigo": codigo}), content_type="application/json")
+
+    def test_empleado_no_encontrado(self):
+        response = self.scan(codigo=999)
+        self.assertEqual(response.status_code, 404)
+
+    def test_entrada_y_salida_alternadas(self):
+        start = timezone.now() - timedelta(hours=10)
+        self.scan(at=start)
+        self.scan(at=start + timedelta(hours=8))
+
+        descripciones = list(
+            RegistroAsistencia.objects.order_by("fecha_hora_registro").values_list("descripcion_registro", flat=True))
+        self.assertEqual(descripciones, ["Entrada", "Salida"])
+
+        state = EstadoAsistencia.objects.get(pk=self.empleado.id)
+        self.assertEqual(state.ultima_descripcion, "Salida")
+        self.assertIsNone(state.fk_entrada_abierta_id)
+
+    def test_tiempo_minimo_no_cumplido(self):
+        start = timezone.now() - timedelta(hours=1)
+        self.scan(at=start)
+        response = self.scan(at=start + timedelta(minutes=5))
+
+        self.assertEqual(response.json()["status"], "info")
+        self.assertEqual(RegistroAsistencia.objects.count(), 1)
+
+    def test_salida_automatica_tras_18_horas(self):
+        start = timezone.now() - timedelta(days=2)
+        self.scan(at=start)
+        self.scan(at=start + timedelta(hours=20))
+
+        records = list(RegistroAsistencia.objects.order_by("fecha_hora_registro"))
+        self.assertEqual([r.descripcion_registro for r in records], ["Entrada", "Salida", "Entrada"])
+        self.assertEqual(records[1].estado_registro, "Automática")
+
+        state = EstadoAsistencia.objects.get(pk=self.empleado.id)
+        self.assertEqual(state.fk_entrada_abierta_id, records[2].id)
+
+    def test_rebuild_attendance_state(self):
+        self.scan(at=timezone.now() - timedelta(hours=3))
+        EstadoAsistencia.objects.all().delete()
+
+        call_command("rebuild_attendance_state", stdout=mock.MagicMock())
+
+        state = EstadoAsistencia.objects.get(pk=self.empleado.id)
+        self.assertEqual(state.ultima_descripcion, "Entrada")
+        self.assertIsNotNone(state.fk_entrada_abierta_id)
+
+        # Info: Un estado existente desactualizado se corrige en su lugar
+        EstadoAsistencia.objects.update(ultima_descripcion="Salida", fk_entrada_abierta=None)
+        call_command("rebuild_attendance_state", stdout=mock.MagicMock())
+        self.assertEqual(EstadoAsistencia.objects.get(pk=self.empleado.id).fk_entrada_abierta_id, state.fk_entrada_abierta_id)
+
+    def test_eliminar_registro_recalcula_el_estado_bloqueado(self):
+        start = timezone.now() - timedelta(hours=10)
+        self.scan(at=start)
+        self.scan(at=start + timedelta(hours=8))
+        entrada, salida = RegistroAsistencia.objects.order_by("fecha_hora_registro")
+
+        # Info: El estado se bloquea antes de leer el historial, igual que en los escaneos
+        with mock.patch("control.services.attendance_state.lock_attendance_states",
+                        wraps=attendance_state.lock_attendance_states) as lock:
+            self.client.delete(reverse("ApiRegistroAsistenciaDetail", args=[salida.id]))
+        lock.assert_called_once_with([self.empleado.id])
+        state = EstadoAsistencia.objects.get(pk=self.empleado.id)
+        self.assertEqual((state.fk_ultimo_registro_id, state.fk_entrada_abierta_id), (entrada.id, entrada.id))
+
+        # Info: Sin registros el estado se elimina
+        self.client.delete(reverse("ApiRegistroAsistenciaDetail", args=[entrada.id]))
+        self.assertFalse(EstadoAsistencia.objects.exists())
+
+    def test_close_open_entries(self):
+        self.scan(at=timezone.now() - timedelta(hours=20))
+        otro = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Luis", primer_apellido="Gómez",
+            fk_tipo_documento=self.empleado.fk_tipo_documento, numero_documento=1002, activo=True)
+        self.scan(codigo=1002, at=timezone.now() - timedelta(hours=2))  # Info: Entrada reciente, sigue abierta
+
+        call_command("close_open_entries", stdout=mock.MagicMock())
+        call_command("close_open_entries", stdout=mock.MagicMock())  # Info: Idempotente
+
+        salida = RegistroAsistencia.objects.get(fk_empleado=self.empleado, descripcion_registro="Salida")
+        self.assertEqual(salida.estado_registro, "Automática")
+        self.assertEqual(salida.lugar_registro_id, self.sede.id)
+        self.assertIsNone(EstadoAsistencia.objects.get(pk=self.empleado.id).fk_entrada_abierta_id)
+        self.assertIsNotNone(EstadoAsistencia.objects.get(pk=otro.id).fk_entrada_abierta_id)
+
+        # Info: El siguiente escaneo ya no paga la salida automática: es una Entrada normal
+        response = self.scan()
+        self.assertEqual(response.json()["data"]["empleado"]["descripcion_registro"], "Entrada")
+        self.assertEqual(RegistroAsistencia.objects.filter(fk_empleado=self.empleado).count(), 3)
+
+    def test_retraso_calculado_en_un_solo_insert(self):
+        horario = Horario.objects.create(hora_entrada=time(7, 0), hora_salida=time(16, 0))
+        horario.miembros.add(self.empleado)
+
+        # Info: Lunes 7:45 am (hora local) -> 45 minutos de retraso
+        entrada = timezone.make_aware(datetime(2025, 10, 6, 7, 45))
+        self.scan(at=entrada)
+
+        record = RegistroAsistencia.objects.get()
+        self.assertEqual(record.estado_registro, "Con retraso")
+        self.assertEqual(record.minutos, 45)
+
+    def test_presupuesto_de_consultas_por_escaneo(self):
+        start = timezone.now() - timedelta(hours=9)
+        self.scan(at=start)  # Info: Primer escaneo carga roster y crea el estado
+
+        # Info: sesión + SAVEPOINT/RELEASE + sede + estado (FOR UPDATE) + INSERT + UPDATE del estado
+        # + registros del día (resumen diario) + upsert del resumen
+        with self.assertNumQueries(9):
+            response = self.scan(at=start + timedelta(hours=8))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["empleado"]["descripcion_registro"], "Salida")
+
+    def test_escaneo_duplicado_retorna_registro_existente(self):
+        start = timezone.now() - timedelta(hours=9)
+        self.scan(at=start)
+        salida = self.scan(at=start + timedelta(hours=8))
+        duplicado = self.scan(at=start + timedelta(hours=8, seconds=3))
+
+        # Info: El duplicado no alterna a Entrada; retorna la Salida ya guardada
+        self.assertEqual(duplicado.status_code, 200)
+        self.assertEqual(duplicado.json()["data"], salida.json()["data"])
+        self.assertEqual(RegistroAsistencia.objects.count(), 2)
+
+
+@skipUnless(connection.features.has_select_for_update, "Requiere bloqueo de filas (SELECT ... FOR UPDATE)")
+class ConcurrentScanTestCase(TransactionTestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleados = [
+            Empleado.objects.create(
+                cargo="Docente", primer_nombre="Empleado", primer_apellido=str(n),
+                fk_tipo_documento=tipo, numero_documento=2000 + n, activo=True)
+            for n in range(3)
+        ]
+
+    def tearDown(self):
+        # Warn: El vaciado de TransactionTestCase omite las tablas no administradas (empleados, sedes, tipos de documento):
+        # se eliminan aquí para que la siguiente prueba no choque con los mismos números de documento
+        RegistroAsistencia.objects.all().delete()
+        Empleado.objects.all().delete()
+        Sede.objects.all().delete()
+        TipoDocumento.objects.all().delete()
+        roster_cache.clear()
+
+    def client_for_sede(self):
+        client = Client()
+        session = client.session
+        session["sede_id"] = self.sede.id
+        session.save()
+        return client
+
+    def fire(self, scans):
+        # Info: Lanza todos los escaneos a la vez desde hilos (cada uno con su propia conexión)
+        barrier = threading.Barrier(len(scans))
+        responses = [None] * len(scans)
+
+        def worker(index, client, codigo):
+            try:
+                barrier.wait()
+                responses[index] = client.post(
+                    reverse("saveRecord"), data=json.dumps({"codigo": codigo}), content_type="application/json")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i, *scan)) for i, scan in enumerate(scans)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+        return responses
+
+    def test_escaneos_simultaneos_alternan_entrada_y_salida(self):
+        clients = [self.client_for_sede() for _ in range(4)]
+        start = timezone.now() - timedelta(days=1)
+
+        # Info: En cada ronda dos lectores y dobles lecturas envían el mismo empleado a la vez
+        for round_number in range(6):
+            at = start + timedelta(hours=round_number)
+            scans = [(client, empleado.numero_documento) for client in clients for empleado in self.empleados]
+            with mock.patch("django.utils.timezone.now", return_value=at):
+                responses = self.fire(scans)
+            self.assertTrue(all(r is not None and r.status_code == 200 for r in responses))
+
+        # Info: Cada ronda agrega exactamente un registro por empleado, alternando estrictamente
+        for empleado in self.empleados:
+            descripciones = list(
+                RegistroAsistencia.objects.filter(fk_empleado=empleado)
+                .order_by("fecha_hora_registro", "id").values_list("descripcion_registro", flat=True))
+            self.assertEqual(descripciones, ["Entrada", "Salida"] * 3)
+
+    def test_empleados_distintos_no_se_bloquean(self):
+        client = self.client_for_sede()
+        bloqueado, libre = self.empleados[0], self.empleados[1]
+        self.client_for_sede().post(
+            reverse("saveRecord"), data=json.dumps({"codigo": bloqueado.numero_documento}), content_type="application/json")
+
+        # Info: Mantener bloqueado el estado de un empleado mientras otro escanea
+        with transaction.atomic():
+            EstadoAsistencia.objects.select_for_update().get(pk=bloqueado.id)
+            responses = self.fire([(client, libre.numero_documento)])
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertTrue(RegistroAsistencia.objects.filter(fk_empleado=libre).exists())
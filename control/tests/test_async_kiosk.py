@@ -0,0 +1,51 @@
+import json
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from control import views
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia
+from control.services.roster_cache import roster_cache
+
+
+# Info: Rutas del lector QR con las variantes asíncronas (equivalente a KIOSK_ASYNC_VIEWS=True)
+urlpatterns = [
+    path('app/qr-reader/', views.appQrReaderRenderAsync),
+    path('app/qr-reader/define-location/', views.defineLocationAsync),
+    path('app/qr-reader/save/', views.saveRecordAsync),
+    path('app/', include('control.urls')),
+    path('api/', include('control.api.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF="control.tests.test_async_kiosk")
+class AsyncKioskViewsTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+    async def post(self, url, data):
+        return await self.async_client.post(url, data=json.dumps(data), content_type="application/json")
+
+    async def test_definir_sede_y_registrar(self):
+        response = await self.post("/app/qr-reader/define-location/", {"sede": self.sede.id})
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.post("/app/qr-reader/save/", {"codigo": 1001})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["empleado"]["descripcion_registro"], "Entrada")
+        self.assertEqual(await RegistroAsistencia.objects.acount(), 1)
+
+    async def test_empleado_no_encontrado(self):
+        await self.post("/app/qr-reader/define-location/", {"sede": self.sede.id})
+        response = await self.post("/app/qr-reader/save/", {"codigo": 999})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_render_lector_con_sede(self):
+        await self.post("/app/qr-reader/define-location/", {"sede": self.sede.id})
+        response = await self.async_client.get("/app/qr-reader/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["sede_info"]["id"], self.sede.id)
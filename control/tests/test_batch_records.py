@@ -0,0 +1,91 @@
+import json
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia, EstadoAsistencia
+from control.services.roster_cache import roster_cache
+
+
+class SaveRecordsBatchTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+        session = self.client.session
+        session["sede_id"] = self.sede.id
+        session.save()
+
+        self.url = reverse("saveRecordsBatch")
+        self.start = timezone.now() - timedelta(days=1)
+
+    def send(self, registros):
+        return self.client.post(self.url, data=json.dumps({"registros": registros}), content_type="application/json")
+
+    def scan(self, key, hours, codigo=1001):
+        return {"codigo": codigo, "fecha_hora": (self.start + timedelta(hours=hours)).isoformat(), "clave": key}
+
+    def test_lote_ordenado_por_fecha(self):
+        # Info: Escaneos enviados fuera de orden se procesan cronológicamente
+        response = self.send([self.scan("c", 9), self.scan("a", 0), self.scan("b", 8)])
+        self.assertEqual(response.status_code, 200)
+
+        estados = [r["estado"] for r in response.json()["data"]["resultados"]]
+        self.assertEqual(estados, ["guardado", "guardado", "guardado"])
+
+        descripciones = list(
+            RegistroAsistencia.objects.order_by("fecha_hora_registro").values_list("descripcion_registro", flat=True))
+        self.assertEqual(descripciones, ["Entrada", "Salida", "Entrada"])
+
+        state = EstadoAsistencia.objects.get(pk=self.empleado.id)
+        self.assertEqual(state.fk_entrada_abierta.clave_idempotencia, "c")
+
+    def test_reenvio_idempotente(self):
+        registros = [self.scan("a", 0), self.scan("b", 8)]
+        self.send(registros)
+        response = self.send(registros)
+
+        estados = [r["estado"] for r in response.json()["data"]["resultados"]]
+        self.assertEqual(estados, ["duplicado", "duplicado"])
+        self.assertEqual(RegistroAsistencia.objects.count(), 2)
+
+    def test_resultados_por_escaneo(self):
+        response = self.send([
+            self.scan("a", 0),
+            self.scan("b", 0.1),  # Info: Tiempo mínimo no cumplido
+            self.scan("c", 1, codigo=999),
+            {"codigo": 1001, "fecha_hora": "no-es-fecha", "clave": "d"},
+            {"codigo": 1001, "fecha_hora": self.start.isoformat()},
+        ])
+
+        estados = [r["estado"] for r in response.json()["data"]["resultados"]]
+        self.assertEqual(estados, ["guardado", "omitido", "error", "error", "error"])
+        self.assertEqual(RegistroAsistencia.objects.count(), 1)
+
+    def test_escaneo_repetido_se_reporta_como_duplicado(self):
+        # Info: Doble lectura dentro de la ventana anti-rebote: no se guarda ni se cuenta como guardada
+        response = self.send([self.scan("a", 0), self.scan("b", 2 / 3600)])
+        primero, repetido = response.json()["data"]["resultados"]
+
+        self.assertEqual((primero["estado"], repetido["estado"]), ("guardado", "duplicado"))
+        self.assertEqual(repetido["registro_id"], primero["registro_id"])
+        self.assertIn("1 de 2 registros guardados", response.json()["message"])
+        self.assertEqual(RegistroAsistencia.objects.count(), 1)
+
+    def test_reenvio_con_la_misma_hora_es_duplicado(self):
+        # Info: El lector reenvía el escaneo con otra clave pero la misma hora: duplicado, no escaneo fuera de orden
+        self.send([self.scan("a", 0)])
+        response = self.send([self.scan("a-reenvio", 0)])
+
+        [result] = response.json()["data"]["resultados"]
+        self.assertEqual(result["estado"], "duplicado")
+        self.assertEqual(result["registro_id"], RegistroAsistencia.objects.get().id)
+
+    def test_lote_vacio(self):
+        response = self.send([])
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,107 @@
+import json
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia, ResumenDiarioAsistencia, Horario
+from control.services.roster_cache import roster_cache
+
+
+class DailyRollupTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+        session = self.client.session
+        session["sede_id"] = self.sede.id
+        session.save()
+
+        # Info: Lunes (la puntualidad no se evalúa los fines de semana)
+        self.day = date(2025, 10, 6)
+
+    def at(self, hour, minute=0, days=0):
+        return timezone.make_aware(datetime.combine(self.day + timedelta(days=days), time(hour, minute)))
+
+    def scan(self, at):
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            return self.client.post(reverse("saveRecord"), data=json.dumps({"codigo": 1001}), content_type="application/json")
+
+    def rollup(self, days=0):
+        return ResumenDiarioAsistencia.objects.get(fk_empleado=self.empleado, fecha=self.day + timedelta(days=days))
+
+    def test_resumen_actualizado_por_escaneo(self):
+        Horario.objects.create(hora_entrada=time(7, 0), hora_salida=time(16, 0)).miembros.add(self.empleado)
+        self.scan(self.at(7, 45))
+        self.scan(self.at(15, 30))
+
+        rollup = self.rollup()
+        self.assertEqual((rollup.primera_entrada, rollup.ultima_salida), (self.at(7, 45), self.at(15, 30)))
+        self.assertEqual(rollup.minutos_trabajados, 465)
+        self.assertEqual((rollup.minutos_retraso, rollup.minutos_anticipacion), (45, 30))
+        self.assertEqual((rollup.registros, rollup.sedes, rollup.salida_automatica), (2, [self.sede.id], False))
+
+    def test_turno_nocturno_se_asigna_al_dia_de_la_entrada(self):
+        self.scan(self.at(22, 0))
+        self.scan(self.at(6, 0, days=1))
+
+        self.assertEqual(self.rollup().minutos_trabajados, 480)
+        siguiente = self.rollup(days=1)
+        self.assertEqual((siguiente.minutos_trabajados, siguiente.registros), (0, 1))
+        self.assertEqual(siguiente.ultima_salida, self.at(6, 0, days=1))
+
+    def test_salida_automatica(self):
+        self.scan(self.at(8, 0))
+        with mock.patch("django.utils.timezone.now", return_value=self.at(8, 0, days=1)):
+            call_command("close_open_entries", stdout=mock.MagicMock())
+
+        rollup = self.rollup()
+        self.assertTrue(rollup.salida_automatica)
+        self.assertEqual(rollup.minutos_trabajados, 9 * 60)
+
+    def test_edicion_y_eliminacion_de_registros(self):
+        self.scan(self.at(8, 0))
+        self.scan(self.at(12, 0))
+        salida = RegistroAsistencia.objects.get(descripcion_registro="Salida")
+        url = reverse("ApiRegistroAsistenciaDetail", args=[salida.id])
+
+        response = self.client.patch(url, data=json.dumps({"minutos": 20, "estado_registro": "Con anticipación"}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.rollup().minutos_trabajados, self.rollup().minutos_anticipacion), (240, 20))
+
+        self.client.delete(url)
+        self.assertEqual((self.rollup().minutos_trabajados, self.rollup().registros), (0, 1))
+        self.assertIsNone(self.rollup().ultima_salida)
+
+        self.client.delete(reverse("ApiRegistroAsistenciaDetail", args=[RegistroAsistencia.objects.get().id]))
+        self.assertFalse(ResumenDiarioAsistencia.objects.exists())
+
+    def test_rebuild_daily_rollups(self):
+        self.scan(self.at(22, 0))
+        self.scan(self.at(6, 0, days=1))
+        self.scan(self.at(7, 0, days=1))
+        expected = list(ResumenDiarioAsistencia.objects.order_by("fecha").values_list(
+            "fecha", "minutos_trabajados", "registros", "primera_entrada", "ultima_salida"))
+
+        ResumenDiarioAsistencia.objects.all().delete()
+        call_command("rebuild_daily_rollups", stdout=mock.MagicMock())
+
+        self.assertEqual(list(ResumenDiarioAsistencia.objects.order_by("fecha").values_list(
+            "fecha", "minutos_trabajados", "registros", "primera_entrada", "ultima_salida")), expected)
+
+        # Info: Los resúmenes existentes se reescriben en su lugar (upsert) y los días sin registros pierden el suyo
+        ids = list(ResumenDiarioAsistencia.objects.order_by("fecha").values_list("id", flat=True))
+        ResumenDiarioAsistencia.objects.update(minutos_trabajados=0, registros=99)
+        ResumenDiarioAsistencia.objects.create(
+            fk_empleado=self.empleado, fecha=self.day - timedelta(days=1), sedes=[], fecha_modificacion=timezone.now())
+        call_command("rebuild_daily_rollups", "--start", str(self.day - timedelta(days=1)), stdout=mock.MagicMock())
+
+        self.assertEqual(list(ResumenDiarioAsistencia.objects.order_by("fecha").values_list("id", flat=True)), ids)
+        self.assertEqual(list(ResumenDiarioAsistencia.objects.order_by("fecha").values_list(
+            "fecha", "minutos_trabajados", "registros", "primera_entrada", "ultima_salida")), expected)
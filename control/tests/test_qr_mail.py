@@ -0,0 +1,147 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from control.models import Empleado, TipoDocumento, CorreoInstitucional, AreaTrabajo, EnvioCorreoQR
+from control.services.qr_mail import QRMailWorker, send_pending_qr_emails
+
+
+@override_settings(QR_MAIL_WORKER=False, QR_MAIL_BATCH_SIZE=50, QR_MAIL_MAX_ATTEMPTS=3, QR_MAIL_RETRY_SECONDS=60)
+class QRMailTestCase(TestCase):
+
+    def setUp(self):
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleados = [
+            Empleado.objects.create(
+                cargo="Docente", primer_nombre=f"Empleado {n}", primer_apellido="Pérez",
+                fk_tipo_documento=tipo, numero_documento=4000 + n, activo=True)
+            for n in range(4)
+        ]
+        # Info: El último empleado no tiene correo institucional
+        for n, empleado in enumerate(self.empleados[:3]):
+            CorreoInstitucional.objects.create(fk_empleado=empleado, correo_institucional=f"empleado{n}@colegio.edu.co")
+        self.area = AreaTrabajo.objects.create(area="Docencia")
+        self.area.miembros.add(*self.empleados)
+
+    def test_encola_y_responde_sin_enviar(self):
+        url = reverse("ApiEmpleadoEmailQR", args=[self.empleados[0].id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 202)
+        envio = response.json()["envio"]
+        self.assertEqual((envio["estado"], envio["destinatario"]), ("pendiente", "empleado0@colegio.edu.co"))
+        self.assertEqual(mail.outbox, [])
+
+        # Info: Un segundo clic no duplica el correo en cola
+        self.assertEqual(self.client.post(url).json()["envio"]["id"], envio["id"])
+
+        self.assertEqual(send_pending_qr_emails(), {"enviados": 1, "reintentos": 0, "fallidos": 0})
+        [message] = mail.outbox
+        self.assertEqual(message.to, ["empleado0@colegio.edu.co"])
+        self.assertIn("Empleado 0 Pérez", message.body)
+        self.assertEqual(message.attachments[0].get("Content-ID"), "<qr_code>")
+
+        detail = self.client.get(reverse("ApiEnvioCorreoQRDetail", args=[envio["id"]])).json()
+        self.assertEqual((detail["estado"], detail["intentos"]), ("enviado", 1))
+        self.assertIsNotNone(detail["fecha_envio"])
+
+        sin_correo = self.client.post(reverse("ApiEmpleadoEmailQR", args=[self.empleados[3].id]))
+        self.assertEqual(sin_correo.json()["codigo"], "EMAIL_NOT_FOUND")
+        self.assertEqual(self.client.post(reverse("ApiEmpleadoEmailQR", args=[0])).status_code, 404)
+
+    def test_lote_por_area_en_una_conexion(self):
+        url = reverse("ApiEmpleadosEmailQRLote")
+        self.assertEqual(self.client.post(url, {}).status_code, 400)
+
+        data = self.client.post(url, {"area": self.area.id}).json()
+        self.assertEqual((data["encolados"], data["sin_correo"]), (3, [self.empleados[3].id]))
+
+        with mock.patch("control.services.qr_mail.get_connection", wraps=EmailBackend) as get_connection:
+            self.assertEqual(send_pending_qr_emails()["enviados"], 3)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+        estado = self.client.get(reverse("ApiEnviosCorreoQR"), {"lote": data["lote"]}).json()
+        self.assertEqual(estado["resumen"], {"pendiente": 0, "enviando": 0, "enviado": 3, "fallido": 0})
+        self.assertEqual(self.client.get(reverse("ApiEnviosCorreoQR"), {"lote": "x"}).status_code, 400)
+
+    def test_reintentos_con_espera_y_fallo_definitivo(self):
+        self.client.post(reverse("ApiEmpleadosEmailQRLote"), {"ids": f"{self.empleados[0].id},{self.empleados[1].id}"})
+        send_messages = EmailBackend.send_messages
+
+        def rechazar_empleado1(backend, messages):
+            if messages[0].to == ["empleado1@colegio.edu.co"]:
+                raise ConnectionError("Buzón no disponible")
+            return send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", rechazar_empleado1):
+            self.assertEqual(send_pending_qr_emails(), {"enviados": 1, "reintentos": 1, "fallidos": 0})
+            envio = EnvioCorreoQR.objects.get(fk_empleado=self.empleados[1])
+            self.assertEqual((envio.estado, envio.intentos), ("pendiente", 1))
+            self.assertIn("Buzón no disponible", envio.error)
+            self.assertGreater(envio.fecha_programada, timezone.now() + timedelta(seconds=50))
+
+            # Info: Antes de la espera no se reintenta; después, hasta QR_MAIL_MAX_ATTEMPTS intentos
+            self.assertEqual(send_pending_qr_emails(), {"enviados": 0, "reintentos": 0, "fallidos": 0})
+            for _ in range(2):
+                EnvioCorreoQR.objects.filter(id=envio.id).update(fecha_programada=timezone.now())
+                send_pending_qr_emails()
+
+        envio.refresh_from_db()
+        self.assertEqual((envio.estado, envio.intentos), ("fallido", 3))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_envio_abandonado_se_retoma(self):
+        self.client.post(reverse("ApiEmpleadoEmailQR", args=[self.empleados[0].id]))
+        # Info: Un worker caído dejó el envío "enviando" con la reserva vencida
+        EnvioCorreoQR.objects.update(estado=EnvioCorreoQR.ENVIANDO, intentos=1, fecha_programada=timezone.now())
+        self.assertEqual(send_pending_qr_emails()["enviados"], 1)
+        self.assertEqual(EnvioCorreoQR.objects.get().intentos, 2)
+
+    def test_reserva_perdida_no_duplica_el_envio(self):
+        self.client.post(reverse("ApiEmpleadosEmailQRLote"), {"ids": f"{self.empleados[0].id},{self.empleados[1].id}"})
+        primero, segundo = EnvioCorreoQR.objects.order_by("id")
+        send_messages = EmailBackend.send_messages
+
+        def smtp_lento(backend, messages):
+            # Info: Mientras se envía el primero vencen las reservas y otro worker toma ambos envíos
+            EnvioCorreoQR.objects.update(intentos=F("intentos") + 1, fecha_programada=timezone.now() + timedelta(minutes=5))
+            return send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", smtp_lento):
+            self.assertEqual(send_pending_qr_emails(), {"enviados": 1, "reintentos": 0, "fallidos": 0})
+
+        # Info: El segundo no se envía y ninguno se marca: el resultado lo guarda el worker que los tiene
+        self.assertEqual(mail.outbox[0].to, ["empleado0@colegio.edu.co"])
+        self.assertEqual(len(mail.outbox), 1)
+        for envio in (primero, segundo):
+            envio.refresh_from_db()
+            self.assertEqual((envio.estado, envio.intentos), ("enviando", 2))
+
+    def test_hilo_del_worker_es_opcional(self):
+        worker = QRMailWorker()
+        with mock.patch.object(QRMailWorker, "_run"):
+            worker.wake()
+            self.assertIsNone(worker._worker)
+            with self.settings(QR_MAIL_WORKER=True):
+                worker.wake()
+        self.assertIsNotNone(worker._worker)
+
+    def test_comando_con_backend_de_archivos(self):
+        self.client.post(reverse("ApiEmpleadosEmailQRLote"), {"activo": "true"})
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(EMAIL_BACKEND="django.core.mail.backends.filebased.EmailBackend", EMAIL_FILE_PATH=directory):
+                out = StringIO()
+                call_command("send_qr_emails", stdout=out)
+            self.assertIn("Enviados: 3", out.getvalue())
+            # Info: Una conexión por lote: un solo archivo con los tres correos
+            [filename] = os.listdir(directory)
+            with open(os.path.join(directory, filename)) as file:
+                self.assertEqual(file.read().count("Subject: "), 3)
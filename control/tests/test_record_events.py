@@ -0,0 +1,122 @@
+import json
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia
+from control.api import events as record_stream
+from control.services.record_events import RecordEventBus, record_events
+
+
+@override_settings(
+    RECORD_EVENTS_POLL_SECONDS=0.05, RECORD_EVENTS_MAX_SECONDS=0.2, RECORD_EVENTS_OVERLAP_SECONDS=0.1,
+    RECORD_EVENTS_MAX_STREAMS=2)
+class RecordEventsTestCase(TestCase):
+
+    def setUp(self):
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        self.otra_sede = Sede.objects.create(ubicacion="Norte", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+
+    def record(self, sede=None, descripcion="Entrada"):
+        return RegistroAsistencia.objects.create(
+            fk_empleado=self.empleado, descripcion_registro=descripcion, lugar_registro=sede or self.sede)
+
+    def events(self, chunks):
+        # Info: Grupos de registros de cada evento "registros" del flujo
+        return [
+            json.loads(chunk.split("data: ", 1)[1])
+            for chunk in chunks if "event: registros" in chunk
+        ]
+
+    def test_bus_filtra_por_sede_y_marca_desborde(self):
+        bus = RecordEventBus(max_queue=1)
+        todas, sede = bus.subscribe(), bus.subscribe(self.sede.id)
+
+        bus.publish([{"id": 1, "fk_sede": self.otra_sede.id}])
+        self.assertEqual(todas.get(timeout=0), [{"id": 1, "fk_sede": self.otra_sede.id}])
+        self.assertIsNone(sede.get(timeout=0))
+
+        bus.publish([{"id": 2, "fk_sede": self.sede.id}])
+        bus.publish([{"id": 3, "fk_sede": self.sede.id}])
+        self.assertTrue(sede.overflow)
+
+        bus.unsubscribe(todas)
+        bus.unsubscribe(sede)
+        self.assertFalse(bus.has_subscribers)
+
+    def test_publica_registros_al_confirmar(self):
+        subscription = record_events.subscribe()
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                registro = self.record()
+                self.assertIsNone(subscription.get(timeout=0))
+
+            [event] = subscription.get(timeout=0)
+            self.assertEqual((event["id"], event["fk_sede"], event["descripcion_registro"]), (registro.id, self.sede.id, "Entrada"))
+        finally:
+            record_events.unsubscribe(subscription)
+
+    def test_flujo_reanuda_desde_last_event_id(self):
+        anterior = self.record()
+        registro = self.record()
+        self.record(sede=self.otra_sede)
+
+        response = self.client.get(
+            reverse("ApiRegistrosAsistenciasEventos"), {"sede": self.sede.id}, HTTP_LAST_EVENT_ID=str(anterior.id))
+        self.assertEqual(response["Content-Type"], "text/event-stream; charset=utf-8")
+
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertTrue(chunks[0].startswith("retry: "))
+        self.assertEqual([[event["id"] for event in group] for group in self.events(chunks)], [[registro.id]])
+        # Info: La marca de reanudación no avanza con lo enviado sino con las consultas, tras la ventana de solape
+        self.assertIn(f"id: {anterior.id}\n", chunks[1])
+        self.assertIn(f"id: {registro.id}\n", chunks[-1])
+        self.assertFalse(record_events.has_subscribers)
+
+    def test_flujo_entrega_por_bus_y_por_consulta_de_respaldo(self):
+        self.record()
+        response = self.client.get(reverse("ApiRegistrosAsistenciasEventos"))
+        chunks = iter(response.streaming_content)
+        next(chunks)
+
+        # Info: Inserción del proceso: llega por el bus
+        with self.captureOnCommitCallbacks(execute=True):
+            por_bus = self.record(descripcion="Salida")
+        # Info: Sin confirmar la transacción no se publica (como una inserción de otro proceso): la recoge la consulta de respaldo
+        por_consulta = self.record()
+
+        received = [event["id"] for group in self.events(chunk.decode() for chunk in chunks) for event in group]
+        self.assertEqual(received, [por_bus.id, por_consulta.id])
+
+    def test_registro_confirmado_fuera_de_orden(self):
+        # Info: Un registro con id menor se vuelve visible después de uno con id mayor (otra transacción u otro proceso)
+        menor, mayor = self.record(), self.record()
+        visible = {"menor": False}
+        poll_records = record_stream._poll_records
+
+        def poll_hiding_menor(after_id, sede_id):
+            rows = [row for row in poll_records(after_id, sede_id) if visible["menor"] or row["id"] != menor.id]
+            visible["menor"] = any(row["id"] == mayor.id for row in rows)
+            return rows
+
+        with mock.patch.object(record_stream, "_poll_records", poll_hiding_menor):
+            response = self.client.get(reverse("ApiRegistrosAsistenciasEventos"), {"desde": menor.id - 1})
+            received = [event["id"] for group in self.events(c.decode() for c in response.streaming_content) for event in group]
+
+        self.assertEqual(received, [mayor.id, menor.id])
+
+    @override_settings(RECORD_EVENTS_MAX_STREAMS=1)
+    def test_limite_de_flujos_simultaneos(self):
+        subscription = record_events.subscribe()
+        try:
+            response = self.client.get(reverse("ApiRegistrosAsistenciasEventos"))
+            self.assertEqual([chunk.decode() for chunk in response.streaming_content], ["retry: 60000\n: ocupado\n\n"])
+        finally:
+            record_events.unsubscribe(subscription)
+
+    def test_parametros_invalidos(self):
+        response = self.client.get(reverse("ApiRegistrosAsistenciasEventos"), {"sede": "x"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,76 @@
+from datetime import time
+from unittest import mock
+from django.test import TestCase
+from control.models import Empleado, TipoDocumento, Horario, AreaTrabajo
+from control.services.roster_cache import RosterCache, roster_cache
+
+
+class RosterCacheTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        self.empleado = Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=self.tipo, numero_documento=1001, activo=True)
+        self.horario = Horario.objects.create(hora_entrada=time(7, 0), hora_salida=time(16, 0))
+        self.horario.miembros.add(self.empleado)
+
+    def test_miss_then_hit_without_queries(self):
+        cache = RosterCache()
+        entry = cache.get("1001")
+        self.assertEqual(entry.id, self.empleado.id)
+        self.assertEqual(entry.horarios[0].hora_entrada, time(7, 0))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get(1001), entry)
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_unknown_document_is_not_cached(self):
+        cache = RosterCache()
+        self.assertIsNone(cache.get(999))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_lru_eviction(self):
+        Empleado.objects.create(
+            cargo="Auxiliar", primer_nombre="Luis", primer_apellido="Gómez",
+            fk_tipo_documento=self.tipo, numero_documento=1002, activo=True)
+        cache = RosterCache(max_size=1)
+        cache.get(1001)
+        cache.get(1002)
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiration(self):
+        cache = RosterCache(ttl=10)
+        with mock.patch("control.services.roster_cache.time.monotonic", return_value=100):
+            cache.get(1001)
+        with mock.patch("control.services.roster_cache.time.monotonic", return_value=111):
+            cache.get(1001)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_invalidation_on_employee_save(self):
+        self.assertTrue(roster_cache.get(1001).activo)
+        self.empleado.activo = False
+        self.empleado.save()
+        self.assertFalse(roster_cache.get(1001).activo)
+
+    def test_invalidation_on_members_change(self):
+        self.assertEqual(roster_cache.get(1001).areas_trabajo, ())
+        area = AreaTrabajo.objects.create(area="Docencia")
+        area.miembros.add(self.empleado)
+        self.assertEqual(roster_cache.get(1001).areas_trabajo, (area.id,))
+
+        self.horario.miembros.clear()
+        self.assertEqual(roster_cache.get(1001).horarios, ())
+
+    def test_invalidation_on_area_delete(self):
+        area = AreaTrabajo.objects.create(area="Docencia")
+        area.miembros.add(self.empleado)
+        self.assertEqual(roster_cache.get(1001).areas_trabajo, (area.id,))
+
+        # Info: La cascada de membresías no emite m2m_changed ni post_delete
+        area.delete()
+        self.assertEqual(roster_cache.get(1001).areas_trabajo, ())
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest import mock
+from django.http import JsonResponse
+from django.test import TestCase
+from django.utils import timezone
+from control.models import Empleado, TipoDocumento, Sede, RegistroAsistencia, EstadoAsistencia
+from control.services.roster_cache import roster_cache
+from control.views.scan_buffer import ScanBuffer, ScanBufferFull
+
+
+class ScanBufferTestCase(TestCase):
+
+    def setUp(self):
+        roster_cache.clear()
+        self.sede = Sede.objects.create(ubicacion="Principal", ciudad="Barranquilla")
+        tipo = TipoDocumento.objects.create(tipo_documento="CC", descripcion="Cédula de ciudadanía")
+        Empleado.objects.create(
+            cargo="Docente", primer_nombre="Ana", primer_apellido="Pérez",
+            fk_tipo_documento=tipo, numero_documento=1001, activo=True)
+        self.employee = roster_cache.get(1001)
+        self.buffer = ScanBuffer(max_queue=2, max_batch=10, autostart=False)
+
+    def submit(self, at):
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            return self.buffer.submit(self.employee, self.sede)
+
+    def test_lote_agrupado(self):
+        # Info: Entrada y salida encoladas se escriben en un solo lote
+        start = timezone.now() - timedelta(hours=9)
+        entrada = self.submit(start)
+        salida = self.submit(start + timedelta(hours=8))
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertTrue(entrada.wait(0) and salida.wait(0))
+        self.assertEqual(entrada.result.descripcion_registro, "Entrada")
+        self.assertEqual(salida.result.descripcion_registro, "Salida")
+        self.assertEqual(RegistroAsistencia.objects.count(), 2)
+
+        estado = EstadoAsistencia.objects.get(fk_empleado_id=self.employee.id)
+        self.assertEqual(estado.fk_ultimo_registro_id, salida.result.id)
+        self.assertEqual(self.buffer.stats()["batches"], 1)
+
+    def test_tiempo_minimo_en_lote(self):
+        # Info: Un segundo escaneo inmediato recibe la respuesta informativa sin insertar
+        start = timezone.now()
+        self.submit(start)
+        repetido = self.submit(start + timedelta(minutes=5))
+        self.buffer.flush()
+
+        self.assertIsInstance(repetido.result, JsonResponse)
+        self.assertEqual(RegistroAsistencia.objects.count(), 1)
+
+    def test_cola_llena(self):
+        # Warn: Con la cola llena se rechaza el escaneo (contrapresión)
+        start = timezone.now()
+        self.submit(start)
+        self.submit(start + timedelta(hours=1))
+        with self.assertRaises(ScanBufferFull):
+            self.submit(start + timedelta(hours=2))
+        self.assertEqual(self.buffer.stats()["rejected"], 1)
+
+    def test_lote_fallido_responde_a_cada_solicitud(self):
+        # Warn: Un fallo revierte el lote; cada solicitud recibe su propia respuesta de error
+        start = timezone.now()
+        pendientes = [self.submit(start), self.submit(start + timedelta(hours=8))]
+        with mock.patch("control.views.batch_records._record_scans", side_effect=RuntimeError("fallo")):
+            self.buffer.flush()
+
+        primero, segundo = (pending.result for pending in pendientes)
+        self.assertEqual((primero.status_code, segundo.status_code), (500, 500))
+        self.assertIsNot(primero, segundo)
+        self.assertEqual(self.buffer.stats()["failed_batches"], 1)
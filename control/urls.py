@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.urls import path
 from control import views
 
+# Info: Variantes asíncronas del lector QR para despliegues ASGI (ver KIOSK_ASYNC_VIEWS)
+kiosk_async = getattr(settings, "KIOSK_ASYNC_VIEWS", False)
+
 urlpatterns = [
     # Renderizar páginas
     path('lobby/', views.appLobbyRender, name='appLobbyRender'), # Página inicial
-    path('qr-reader/', views.appQrReaderRender, name='appQrReaderRender'), # Página para uso del lector QR
+    path('qr-reader/', views.appQrReaderRenderAsync if kiosk_async else views.appQrReaderRender, name='appQrReaderRender'), # Página para uso del lector QR
     path('dashboard/home/', views.appDashboardHomeRender, name='appDashboardHomeRender'), # Dashboard principal
     path('dashboard/employees/active/', views.appDashboardActiveEmployeesRender, name='appDashboardActiveEmployeesRender'), # Gestión Empleados Activos
     path('dashboard/assistance-records/', views.appDashboardAssistanceRecordRender, name='appDashboardAssistanceRecordRender'), # Gestión Registros de Asistencias
@@ -16,8 +20,9 @@ urlpatterns = [
 
     # Funciones AJAX
     path('lobby/login/authentication/', views.validateAuthentication, name='validateAuthentication'), # Validar credenciales para el inicio de sesión
-    path('qr-reader/define-location/', views.defineLocation, name='defineLocation'), # Guardar sede seleccionada
-    path('qr-reader/save/', views.saveRecord, name='saveRecord'),
+    path('qr-reader/define-location/', views.defineLocationAsync if kiosk_async else views.defineLocation, name='defineLocation'), # Guardar sede seleccionada
+    path('qr-reader/save/', views.saveRecordAsync if kiosk_async else views.saveRecord, name='saveRecord'),
+    path('qr-reader/save-batch/', views.saveRecordsBatch, name='saveRecordsBatch'), # Lote de escaneos almacenados sin conexión
 
     # Cerrar sesión
     path('dashboard/logout/', views.logoutSesion, name='logoutSesion'),
@@ -4,3 +4,5 @@ from .helpers import *
 from .render import *
 from .assistance_records import *
 from .location import *
+from .batch_records import *
+from .async_kiosk import *
@@ -1,13 +1,18 @@
-from datetime import time
 from datetime import datetime, timedelta
-from django.db.models import QuerySet
+from typing import Iterable
+from django.conf import settings
 from django.http import HttpRequest, JsonResponse
 from django.utils import timezone
+from django.utils.timezone import localtime
 from django.views.decorators.http import require_POST
-from django.core.exceptions import ObjectDoesNotExist
-from control.models import Empleado, Sede, RegistroAsistencia, Horario
+from django.db import transaction
+from control.models import Sede, RegistroAsistencia, EstadoAsistencia
+from control.services.roster_cache import roster_cache, EmpleadoRoster, HorarioRoster
+from control.services.attendance_state import get_attendance_state, record_attendance_state
+from control.services.attendance_rules import AUTOMATIC_EXIT_AFTER, build_automatic_exit
+from control.services.daily_rollup import update_daily_rollups
 from .helpers import _success, _error, _warning, _info, _parse_request_body
-from control.api import RegistroAsistenciaSerializer
+from .scan_buffer import scan_buffer, ScanBufferFull
 
 
 # ---------------------
@@ -45,7 +50,7 @@ def saveRecord(request: HttpRequest) -> JsonResponse:
         if response := _validate_employee_code(employee_code):
             return response
 
-        # Info: Obtener información del empleado desde la base de datos
+        # Info: Obtener información del empleado desde el roster en caché
         employee, response = _get_employee(employee_code)
         if response:
             return response
@@ -54,9 +59,12 @@ def saveRecord(request: HttpRequest) -> JsonResponse:
         if response := _validate_active_employee(employee):
             return response
 
+        # Info: Obtener la sede donde se registra la asistencia
+        if not (sede := Sede.objects.filter(id=sede_id).first()):
+            return _sede_not_found(sede_id)
+
         # Info: Guardar registro de asistencia y obtener información
-        record, response = _save_attendance(
-            employee, sede_id)
+        record, response = _store_attendance(employee, sede)
 
         # Warn: Manejar caso donde no se pudo guardar el registro
         if not record:
@@ -140,26 +148,31 @@ def _validate_employee_code(employee_code: str) -> JsonResponse | None:
     ) if not employee_code_str.isdigit() else None
 
 
-def _get_employee(employee_code: str) -> tuple[Empleado | None, JsonResponse | None]:
+def _get_employee(employee_code: str) -> tuple[EmpleadoRoster | None, JsonResponse | None]:
     '''
     Info:
-        Obtiene un empleado por su código/número de documento.
+        Obtiene un empleado por su código/número de documento desde el roster en caché.
 
     Params:
         employee_code (str): Código o número de documento del empleado a buscar.
 
     Return:
         tuple: Tupla con (empleado, error_response) donde:
-            - empleado: Objeto Empleado si se encuentra, None en caso contrario
+            - empleado: Datos EmpleadoRoster si se encuentra, None en caso contrario
             - error_response: JsonResponse de error si no se encuentra, None en caso exitoso
     '''
 
-    # Info: Intenta obtener el empleado por su número de documento
-    if employee := Empleado.objects.filter(numero_documento=employee_code).first():
+    # Info: Intenta obtener el empleado por su número de documento (sin consulta si está en caché)
+    if employee := roster_cache.get(employee_code):
         return employee, None
 
     # Warn: Empleado no encontrado; genera una respuesta de error estructurada
-    return None, _error(
+    return None, _employee_not_found(employee_code)
+
+
+def _employee_not_found(employee_code: str) -> JsonResponse:
+    # Info: Respuesta de error para un código sin empleado vinculado
+    return _error(
         user_message=f"No se ha encontrado un empleado vinculado <br><br>"
         f"<strong class='fs-5'>Código recibido:</strong> {employee_code}",
         code=404,
@@ -167,13 +180,22 @@ def _get_employee(employee_code: str) -> tuple[Empleado | None, JsonResponse | N
     )
 
 
-def _validate_active_employee(employee: Empleado) -> JsonResponse | None:
+def _sede_not_found(sede_id: int) -> JsonResponse:
+    # Info: Respuesta de error para una sede de sesión que ya no existe
+    return _error(
+        user_message="La sede seleccionada no existe",
+        code=404,
+        log_message=f"Sede no encontrada con ID {sede_id}"
+    )
+
+
+def _validate_active_employee(employee: EmpleadoRoster) -> JsonResponse | None:
     '''
     Info:
         Valida si un empleado está activo en el sistema.
 
     Params:
-        employee (Empleado): Objeto empleado a validar.
+        employee (EmpleadoRoster): Datos del empleado a validar.
 
     Return:
         JsonResponse | None: Respuesta JSON de advertencia si el empleado está inactivo, None si el empleado está activo.
@@ -188,14 +210,37 @@ def _validate_active_employee(employee: Empleado) -> JsonResponse | None:
     ) if not employee.activo else None
 
 
-def _save_attendance(employee: Empleado, sede_id: int) -> tuple[RegistroAsistencia | None, dict | JsonResponse]:
+def _store_attendance(employee: EmpleadoRoster, sede: Sede) -> tuple[RegistroAsistencia | None, dict | JsonResponse]:
+    '''
+    Info:
+        Guarda el escaneo con el modo configurado: escritura diferida por lotes (SCAN_WRITE_BEHIND)
+        o inserción directa en una sola transacción. Compartida por saveRecord y saveRecordAsync.
+
+    Params:
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
+        sede (Sede): Sede donde se registra la asistencia.
+
+    Return:
+        tuple: Tupla con (registro, respuesta) con la misma estructura que _save_attendance.
+    '''
+
+    if scan_buffer.enabled:
+        return _save_attendance_buffered(employee, sede)
+
+    with transaction.atomic():
+        return _save_attendance(employee, sede)
+
+
+def _save_attendance(employee: EmpleadoRoster, sede: Sede) -> tuple[RegistroAsistencia | None, dict | JsonResponse]:
     '''
     Info:
-        Registra una entrada o salida según el último registro histórico del empleado.
+        Registra una entrada o salida según el estado actual de asistencia del empleado.
+        La puntualidad se calcula antes de insertar, de modo que el registro se escribe con un único INSERT.
+        Debe ejecutarse dentro de una transacción (ver _store_attendance).
 
     Params:
-        employee (Empleado): Objeto del empleado que realiza el registro.
-        sede_id (int): ID de la sede donde se registra la asistencia.
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
+        sede (Sede): Sede donde se registra la asistencia.
 
     Return:
         tuple: Tupla con (registro, respuesta) donde:
@@ -206,127 +251,166 @@ def _save_attendance(employee: Empleado, sede_id: int) -> tuple[RegistroAsistenc
     # Info: Obtener fecha y hora actual
     current_time = timezone.now()
 
-    # Info: Obtener último registro histórico
-    last_record = RegistroAsistencia.objects.filter(
-        fk_empleado=employee).order_by('-fecha_hora_registro').first()
-    record_type = _determine_record_type(last_record)
+    # Info: Obtener y bloquear el estado del empleado: escaneos simultáneos del mismo empleado se serializan
+    state = get_attendance_state(employee.id, lock=True)
 
-    # Warn: Si hay una Entrada sin Salida y ya pasaron más de 18h, crear Salida automática
-    if last_record and last_record.descripcion_registro == "Entrada":
-        time_difference = current_time - last_record.fecha_hora_registro
-        if time_difference > timedelta(hours=18):
-            _create_automatic_exit(employee, last_record, sede_id)
-            record_type = "Entrada"  # Nueva entrada tras cierre automática
+    # Info: Escaneo duplicado (doble lectura o dos lectores a la vez): retornar el registro existente
+    if _is_duplicate_scan(state, current_time) and (record := RegistroAsistencia.objects.filter(pk=state.fk_ultimo_registro_id).first()):
+        return _build_record_response(employee, record, record.descripcion_registro)
 
-    # Warn: Validar diferencia mínima solo si es una Salida normal.
-    if record_type == "Salida" and last_record:
-        if response := _validate_minimum_difference(last_record, current_time, employee):
-            return None, response  # Return: No cumple el tiempo mínimo
+    # Info: Aplicar reglas de registro (salida automática, tiempo mínimo, puntualidad)
+    records, response = _plan_attendance(employee, state, current_time, sede)
+    if response:
+        return None, response  # Return: No cumple el tiempo mínimo
+
+    # Info: Insertar la salida automática (si aplica) y el registro en un único INSERT
+    RegistroAsistencia.objects.bulk_create(records)
+
+    # Info: Actualizar estado y resumen diario del empleado en la misma transacción
+    record_attendance_state(state, *records)
+    update_daily_rollups(records)
+
+    # Return: Registro creado exitosamente
+    record = records[-1]
+    return _build_record_response(employee, record, record.descripcion_registro)
+
+
+def _save_attendance_buffered(employee: EmpleadoRoster, sede: Sede) -> tuple[RegistroAsistencia | None, dict | JsonResponse]:
+    '''
+    Info:
+        Variante de _save_attendance para el modo de escritura diferida (SCAN_WRITE_BEHIND).
+        Encola el escaneo en el buffer del proceso y espera a que su lote se confirme en la base de datos,
+        de modo que la respuesta al lector QR solo se envía cuando el registro ya es durable.
+
+    Params:
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
+        sede (Sede): Sede donde se registra la asistencia.
 
-    # Info: Obtener la sede correspondiente al ID proporcionado
+    Return:
+        tuple: Tupla con (registro, respuesta) con la misma estructura que _save_attendance.
+    '''
+
+    # Warn: Contrapresión: con la cola llena se rechaza el escaneo en lugar de acumular latencia
     try:
-        sede = Sede.objects.get(id=sede_id)
-    except ObjectDoesNotExist:
+        pending = scan_buffer.submit(employee, sede)
+    except ScanBufferFull:
+        return None, _warning(
+            user_message="Hay muchos registros en proceso, intente nuevamente en unos segundos",
+            code=503,
+            log_message=f"Buffer de escaneos lleno, registro rechazado para empleado {employee.numero_documento}"
+        )
+
+    if not pending.wait(scan_buffer.wait_timeout):
         return None, _error(
-            user_message="La sede seleccionada no existe",
-            code=404,
-            log_message=f"Sede no encontrada con ID {sede_id}"
+            user_message="El registro está tardando más de lo esperado. Verifique antes de escanear de nuevo",
+            code=504,
+            log_message=f"Tiempo de espera agotado en el buffer para empleado {employee.numero_documento}"
         )
 
-    # Info: Crear registro de asistencia
-    record = RegistroAsistencia.objects.create(
-        fk_empleado=employee,
+    # Return: Registro confirmado o respuesta informativa/de error del lote
+    if isinstance(pending.result, RegistroAsistencia):
+        return _build_record_response(employee, pending.result, pending.result.descripcion_registro)
+    return None, pending.result
+
+
+def _plan_attendance(employee: EmpleadoRoster, state: EstadoAsistencia, current_time: datetime, sede: Sede) -> tuple[list[RegistroAsistencia], JsonResponse | None]:
+    '''
+    Info:
+        Aplica las reglas de registro sobre el estado del empleado y construye (sin guardar) los registros resultantes.
+        El estado se avanza en memoria, por lo que puede encadenarse para varios escaneos del mismo empleado.
+
+    Params:
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
+        state (EstadoAsistencia): Estado actual de asistencia del empleado.
+        current_time (datetime): Fecha y hora del escaneo.
+        sede (Sede): Sede donde se registra la asistencia.
+
+    Return:
+        tuple: Tupla con (registros, respuesta) donde:
+            - registros: Registros a insertar en orden cronológico (salida automática opcional + registro)
+            - respuesta: Respuesta informativa si no se cumple el tiempo mínimo, None en caso contrario
+    '''
+
+    records = []
+    record_type = _determine_record_type(state)
+
+    # Warn: Si hay una Entrada sin Salida y ya pasaron más de 18h, crear Salida automática
+    # (normalmente ya la cerró el comando close_open_entries; esto cubre las entradas aún no procesadas)
+    if state.entrada_abierta_fecha_hora:
+        time_difference = current_time - state.entrada_abierta_fecha_hora
+        if time_difference > AUTOMATIC_EXIT_AFTER:
+            records.append(build_automatic_exit(employee.id, state.entrada_abierta_fecha_hora, sede.id))
+            state.apply(records[-1])
+            record_type = "Entrada"  # Nueva entrada tras cierre automática
+
+    # Warn: Validar diferencia mínima solo si es una Salida normal.
+    if record_type == "Salida" and state.ultima_fecha_hora:
+        if response := _validate_minimum_difference(state.ultima_fecha_hora, current_time, employee):
+            return [], response  # Return: No cumple el tiempo mínimo
+
+    # Info: Evaluar puntualidad antes de insertar (la entrada abierta del estado es la última Entrada)
+    minutes, status = _evaluate_punctuality(employee, current_time, record_type, state.entrada_abierta_fecha_hora)
+
+    # Info: Construir registro de asistencia con la puntualidad ya calculada
+    records.append(RegistroAsistencia(
+        fk_empleado_id=employee.id,
         descripcion_registro=record_type,
         fecha_hora_registro=current_time,
-        lugar_registro=sede
-    )
+        lugar_registro=sede,
+        minutos=minutes,
+        estado_registro=status
+    ))
+    state.apply(records[-1])
 
-    # Info: Evaluar puntualidad del empleado
-    _evaluate_punctuality(employee, record, record_type)
+    return records, None
 
-    # Return: Registro creado exitosamente
-    return _build_record_response(employee, record, record_type)
 
-
-def _determine_record_type(last_record: RegistroAsistencia | None) -> str:
+def _determine_record_type(state: EstadoAsistencia) -> str:
     '''
     Info:
-        Determina el tipo de registro (Entrada/Salida) basado en el último registro histórico.
+        Determina el tipo de registro (Entrada/Salida) basado en el estado actual del empleado.
 
     Params:
-        last_record (RegistroAsistencia | None): Último registro de asistencia del empleado.
+        state (EstadoAsistencia): Estado actual de asistencia del empleado.
 
     Return:
         str: Tipo de registro - "Entrada" si no hay registro anterior o la última fue Salida, "Salida" si el último registro fue una Entrada.
     '''
 
     # Info: Determinar tipo basado en último registro
-    return "Entrada" if not last_record or last_record.descripcion_registro == "Salida" else "Salida"
+    return "Entrada" if not state.ultima_descripcion or state.ultima_descripcion == "Salida" else "Salida"
 
 
-def _create_automatic_exit(employee: Empleado, last_record: RegistroAsistencia, sede_id: int) -> None:
+def _is_duplicate_scan(state: EstadoAsistencia, current_time: datetime) -> bool:
     '''
     Info:
-        Crea un registro de salida automática cuando un empleado olvida registrar su salida.
+        Determina si un escaneo cae dentro de la ventana anti-rebote (SCAN_DEBOUNCE_SECONDS) del último registro,
+        en cuyo caso se considera un duplicado y no debe alternar Entrada/Salida.
 
     Params:
-        employee (Empleado): Objeto del empleado para el cual se crea la salida automática.
-        last_record (RegistroAsistencia): Último registro de entrada del empleado.
-        sede_id (int): ID de la sede donde se registra la asistencia.
+        state (EstadoAsistencia): Estado actual de asistencia del empleado.
+        current_time (datetime): Fecha y hora del escaneo.
 
     Return:
-        None: La función no retorna valor, solo crea el registro en la base de datos.
+        bool: True si el escaneo es un duplicado del último registro.
     '''
 
-    # Info: Obtener objeto sede por ID
-    try:
-        sede = Sede.objects.get(id=sede_id)
-    except Sede.DoesNotExist:
-        return  # Return: Si la sede no existe
-
-    # Info: Definir rangos horarios y reglas para salida automática
-    entry_time = last_record.fecha_hora_registro.time()
-
-    # Info: Rangos horarios para aplicar reglas específicas
-    start_range_1, end_range_1 = time(5, 00), time(13, 30)  # 5:30 am - 1:30 pm
-    start_range_2, end_range_2 = time(13, 30), time(21, 0)  # 1:30 pm - 9:00 pm
-    fixed_exit_time = time(21, 30)  # 9:30 pm
-
-    # Info: Calcular hora de salida automática según reglas establecidas
-    if start_range_1 <= entry_time < end_range_1:
-        # Regla 1: Salida 9 horas después de la entrada (turno mañana)
-        automatic_exit = last_record.fecha_hora_registro + timedelta(hours=9)
-    elif start_range_2 <= entry_time < end_range_2:
-        # Regla 2: Salida fija a las 9:30 pm (turno tarde)
-        automatic_exit = last_record.fecha_hora_registro.replace(
-            hour=fixed_exit_time.hour,
-            minute=fixed_exit_time.minute,
-            second=0,
-            microsecond=0
-        )
-    else:
-        # Warn: Caso fuera de rangos definidos, aplicar regla por defecto
-        automatic_exit = last_record.fecha_hora_registro + timedelta(hours=9)
-
-    # Info: Crear registro de salida automática en base de datos
-    RegistroAsistencia.objects.create(
-        fk_empleado=employee,
-        descripcion_registro="Salida",
-        fecha_hora_registro=automatic_exit,
-        lugar_registro=sede,
-        estado_registro="Automática"
-    )
+    if not state.ultima_fecha_hora:
+        return False
+
+    window = timedelta(seconds=getattr(settings, "SCAN_DEBOUNCE_SECONDS", 10))
+    return timedelta(0) <= current_time - state.ultima_fecha_hora < window
 
 
-def _validate_minimum_difference(last_record: RegistroAsistencia, current_time: datetime, employee: Empleado) -> JsonResponse | None:
+def _validate_minimum_difference(last_time: datetime, current_time: datetime, employee: EmpleadoRoster) -> JsonResponse | None:
     '''
     Info:
         Valida que haya pasado el tiempo mínimo requerido entre registros consecutivos.
 
     Params:
-        last_record (RegistroAsistencia): Último registro de asistencia del empleado.
+        last_time (datetime): Fecha y hora del último registro de asistencia del empleado.
         current_time (datetime): Momento actual del registro.
-        employee (Empleado): Objeto del empleado que realiza el registro.
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
 
     Return:
         JsonResponse | None: Respuesta informativa si no cumple el tiempo mínimo, None si la validación es exitosa.
@@ -334,7 +418,7 @@ def _validate_minimum_difference(last_record: RegistroAsistencia, current_time:
 
     # Info: Calcular diferencia de tiempo desde el último registro
     # Warn: Retornar advertencia si no ha pasado el tiempo mínimo requerido
-    if (time_difference := current_time - last_record.fecha_hora_registro) < timedelta(minutes=30):
+    if (time_difference := current_time - last_time) < timedelta(minutes=30):
         return _info(
             user_message="Tiempo mínimo entre Entrada y Salida no cumplido",
             code=200,
@@ -344,33 +428,33 @@ def _validate_minimum_difference(last_record: RegistroAsistencia, current_time:
     return None
 
 
-def _evaluate_punctuality(employee: Empleado, record: RegistroAsistencia, record_type: str) -> None:
+def _evaluate_punctuality(employee: EmpleadoRoster, record_datetime: datetime, record_type: str, last_entry_time: datetime | None) -> tuple[int | None, str | None]:
     '''
     Info:
-        Evalúa la puntualidad de un registro comparándolo con los horarios asignados al empleado.
+        Evalúa la puntualidad de un registro (antes de insertarlo) comparándolo con los horarios asignados al empleado.
 
     Params:
-        employee (Empleado): Objeto del empleado que realiza el registro.
-        record (RegistroAsistencia): Registro de asistencia recién creado.
+        employee (EmpleadoRoster): Datos del empleado que realiza el registro.
+        record_datetime (datetime): Fecha y hora del registro a evaluar.
         record_type (str): Tipo de registro - "Entrada" o "Salida".
+        last_entry_time (datetime | None): Fecha y hora de la última Entrada abierta (para evaluar salidas).
 
     Return:
-        None: La función modifica el estado del registro pero no retorna valor.
+        tuple: Tupla con (minutos, estado_registro); (None, None) si el registro es puntual o no aplica evaluación.
     '''
 
-    # Info: Obtener horarios asignados al empleado
-    schedules = employee.horarios.all()
-    if not schedules.exists():
-        return  # Return: No hay horarios definidos para evaluar
+    # Info: Obtener horarios asignados al empleado (cargados en el roster)
+    schedules = employee.horarios
+    if not schedules:
+        return None, None  # Return: No hay horarios definidos para evaluar
 
     # Info: Configurar tolerancia y zona horaria
     tolerance = timedelta(minutes=10)
     timezone_obj = timezone.get_current_timezone()
-    record_datetime = record.fecha_hora_registro
 
     # Info: Omitir evaluación los fines de semana
     if record_datetime.weekday() in (5, 6):
-        return
+        return None, None
 
     # Info: Evaluar puntualidad para registro de entrada
     if record_type == "Entrada":
@@ -381,24 +465,20 @@ def _evaluate_punctuality(employee: Empleado, record: RegistroAsistencia, record
 
             # Warn: Marcar como retraso si excede la tolerancia
             if (time_difference := record_datetime - scheduled_time) > tolerance:
-                record.minutos = int(time_difference.total_seconds() // 60)
-                record.estado_registro = "Con retraso"
-                record.save()
-        return
+                return int(time_difference.total_seconds() // 60), "Con retraso"
+        return None, None
 
     # Info: Evaluar puntualidad para registro de salida
     if record_type == "Salida":
-        # Info: Buscar última entrada registrada del empleado
-        last_entry = RegistroAsistencia.objects.filter(
-            fk_empleado=employee, descripcion_registro="Entrada").order_by('-fecha_hora_registro').first()
-        if not last_entry:
-            return  # Return: No hay entrada previa para evaluar salida
+        # Info: La última entrada registrada proviene del estado del empleado
+        if not last_entry_time:
+            return None, None  # Return: No hay entrada previa para evaluar salida
 
         # Info: Obtener horario correspondiente a la entrada
-        if best_entry_schedule := _get_most_recent_entry_schedule(schedules, last_entry.fecha_hora_registro, timezone_obj):
+        if best_entry_schedule := _get_most_recent_entry_schedule(schedules, last_entry_time, timezone_obj):
             # Info: Calcular hora programada de salida
             scheduled_exit_time = timezone.make_aware(
-                datetime.combine(last_entry.fecha_hora_registro.date(), best_entry_schedule.hora_salida),
+                datetime.combine(last_entry_time.date(), best_entry_schedule.hora_salida),
                 timezone_obj
             )
 
@@ -406,30 +486,30 @@ def _evaluate_punctuality(employee: Empleado, record: RegistroAsistencia, record
             if best_entry_schedule.hora_salida < best_entry_schedule.hora_entrada:
                 scheduled_exit_time = timezone.make_aware(
                     datetime.combine(
-                        last_entry.fecha_hora_registro.date() + timedelta(days=1),
+                        last_entry_time.date() + timedelta(days=1),
                         best_entry_schedule.hora_salida
                     ), timezone_obj
                 )
 
             # Warn: Marcar como anticipación si sale antes del tiempo permitido
             if (time_difference := record_datetime - scheduled_exit_time) < -tolerance:
-                record.minutos = int(-time_difference.total_seconds() // 60)
-                record.estado_registro = "Con anticipación"
-                record.save()
+                return int(-time_difference.total_seconds() // 60), "Con anticipación"
+
+    return None, None
 
 
-def _get_most_recent_entry_schedule(schedules: QuerySet[Horario], record_datetime: datetime, timezone_obj: timezone) -> Horario | None:
+def _get_most_recent_entry_schedule(schedules: Iterable[HorarioRoster], record_datetime: datetime, timezone_obj: timezone) -> HorarioRoster | None:
     '''
     Info:
         Encuentra el horario asignado cuya hora de entrada programada esté más cercana al registro actual.
 
     Params:
-        schedules (QuerySet[Horario]): Conjunto de horarios asignados al empleado.
+        schedules (Iterable[HorarioRoster]): Conjunto de horarios asignados al empleado.
         record_datetime (datetime): Fecha y hora del registro de asistencia.
         timezone_obj (timezone): Zona horaria activa para las conversiones.
 
     Return:
-        Horario | None: Objeto Horario con la entrada más cercana al registro, o None si no hay horarios.
+        HorarioRoster | None: Horario con la entrada más cercana al registro, o None si no hay horarios.
     '''
 
     # Info: Inicializar variables para búsqueda del horario más cercano
@@ -453,13 +533,13 @@ def _get_most_recent_entry_schedule(schedules: QuerySet[Horario], record_datetim
     return best_schedule
 
 
-def _build_record_response(employee: Empleado, record: RegistroAsistencia, record_type: str) -> tuple[RegistroAsistencia, dict]:
+def _build_record_response(employee: EmpleadoRoster, record: RegistroAsistencia, record_type: str) -> tuple[RegistroAsistencia, dict]:
     '''
     Info:
-        Construye la respuesta del registro de asistencia con datos serializados del empleado.
+        Construye la respuesta del registro de asistencia con los datos del empleado en el roster.
 
     Params:
-        employee (Empleado): Objeto del empleado que realizó el registro.
+        employee (EmpleadoRoster): Datos del empleado que realizó el registro.
         record (RegistroAsistencia): Registro de asistencia creado.
         record_type (str): Tipo de registro - "Entrada" o "Salida".
 
@@ -469,8 +549,8 @@ def _build_record_response(employee: Empleado, record: RegistroAsistencia, recor
             - empleado_info: Diccionario con datos resumidos del empleado para la respuesta
     '''
 
-    # Info: Serializar registro y construir nombre completo del empleado
-    payload = RegistroAsistenciaSerializer(record).data
+    # Info: Formatear fecha y hora local igual que RegistroAsistenciaSerializer, sin consultas adicionales
+    local_datetime = localtime(record.fecha_hora_registro)
 
     # Info: Construir nombre completo filtrando campos vacíos
     full_name = " ".join(filter(None, [
@@ -484,8 +564,8 @@ def _build_record_response(employee: Empleado, record: RegistroAsistencia, recor
     employee_info = {
         "nombre_completo": full_name,
         "cargo": employee.cargo.upper(),
-        "fecha_registro": payload["fecha"],
-        "hora_registro": payload["hora"],
+        "fecha_registro": local_datetime.strftime("%d/%m/%Y"),
+        "hora_registro": local_datetime.strftime("%I:%M:%S %p"),
         "descripcion_registro": record_type
     }
 
@@ -0,0 +1,166 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import render, redirect
+from django.views.decorators.http import require_POST
+from control.models import Sede
+from control.services.roster_cache import roster_cache
+from .helpers import _success, _error, _parse_request_body
+from .location import _validate_sede
+from .assistance_records import (
+    _validate_sede_in_session, _validate_employee_code, _validate_active_employee,
+    _employee_not_found, _sede_not_found, _store_attendance,
+)
+
+
+# ---------------------
+# Vistas asíncronas del lector QR
+# ---------------------
+
+# Info: Variantes ASGI de las vistas del lector QR (ver KIOSK_ASYNC_VIEWS en urls.py).
+# Las lecturas usan el ORM y la sesión asíncronos; la escritura del registro se mantiene en un único
+# bloque síncrono porque el ORM asíncrono de Django no admite transacciones, y el bloqueo por empleado
+# y la inserción deben confirmarse juntos.
+
+
+async def appQrReaderRenderAsync(request: HttpRequest) -> HttpResponse:
+    '''
+    Info:
+        Variante asíncrona de appQrReaderRender: renderiza el lector de QR con la información de la sede de la sesión.
+
+    Params:
+        request (HttpRequest): Objeto de solicitud HTTP para obtener información de la URL.
+
+    Return:
+        HttpResponse: Renderizado de la página QR reader con información de sede o redirección.
+    '''
+
+    # Info: Verifica si el usuario está autenticado y redirige si es necesario
+    if (await request.auser()).is_authenticated:
+        return redirect('appDashboardHomeRender')
+
+    # Info: Obtiene el ID de sede de la sesión y recupera información
+    sede_id = await request.session.aget("sede_id")
+    sede_info = None
+
+    # Info: Si existe sede_id, busca y construye información de la sede
+    if sede_id:
+        try:
+            sede = await Sede.objects.aget(id=sede_id)
+            sede_info = {
+                "id": sede.id,
+                "location": f"{sede.ubicacion} - {sede.ciudad}"
+            }
+        except Sede.DoesNotExist:
+            # Warn: Si la sede no existe, elimina el ID de la sesión
+            await request.session.apop("sede_id", None)
+
+    return render(request, 'qr_reader.html', {'sede_info': sede_info})
+
+
+@require_POST
+async def defineLocationAsync(request: HttpRequest) -> JsonResponse:
+    '''
+    Info:
+        Variante asíncrona de defineLocation: guarda en la sesión la sede de los registros de asistencia.
+
+    Params:
+        request (HttpRequest): Objeto de solicitud HTTP para obtener información de la URL.
+
+    Return:
+        JsonResponse: Respuesta JSON con estructura {"status", "message", "data?"} que indica el resultado de la operación.
+    '''
+
+    try:
+        # Info: Parsear y validar el cuerpo de la solicitud
+        data, response = _parse_request_body(request, "defineLocation")
+        if response:
+            return response
+
+        # Info: Validar ID de sede proporcionado
+        sede_id, response = _validate_sede(data)
+        if response:
+            return response
+
+        # Info: Guardar sede en sesión y retornar confirmación
+        await request.session.aset("sede_id", sede_id)
+        return _success(
+            user_message="La sede se ha definido correctamente",
+            data={"sede_id": sede_id},
+            log_message=f"Sede {sede_id} definida en la sesión."
+        )
+
+    except Exception as e:
+        # Warn: Captura cualquier excepción inesperada durante el proceso
+        return _error(
+            user_message="Ocurrió un problema inesperado. Contacte a Soporte",
+            code=500,
+            log_message="Excepción en defineLocationAsync",
+            exc=e
+        )
+
+
+@require_POST
+async def saveRecordAsync(request: HttpRequest) -> JsonResponse:
+    '''
+    Info:
+        Variante asíncrona de saveRecord. Sesión, empleado (roster en caché) y sede se resuelven sin ocupar un hilo;
+        solo la transacción del registro se ejecuta en un hilo de sincronización.
+
+    Params:
+        request (HttpRequest): Objeto de solicitud HTTP para obtener información de la URL.
+
+    Return:
+        JsonResponse: Respuesta JSON con estructura {"status", "message", "data?"} indicando el resultado de la operación.
+    '''
+
+    try:
+        # Info: Parsear y validar el cuerpo de la solicitud
+        data, response = _parse_request_body(request, "saveRecord")
+        if response:
+            return response
+
+        employee_code = data.get("codigo")
+        sede_id = await request.session.aget("sede_id")
+
+        # Warn: Validar que la sede esté presente en la sesión
+        if response := _validate_sede_in_session(sede_id):
+            return response
+
+        # Warn: Validar formato del código de empleado
+        if response := _validate_employee_code(employee_code):
+            return response
+
+        # Info: Obtener información del empleado desde el roster en caché
+        if not (employee := await roster_cache.aget(employee_code)):
+            return _employee_not_found(employee_code)
+
+        # Warn: Verificar que el empleado esté activo
+        if response := _validate_active_employee(employee):
+            return response
+
+        # Info: Obtener la sede donde se registra la asistencia
+        if not (sede := await Sede.objects.filter(id=sede_id).afirst()):
+            return _sede_not_found(sede_id)
+
+        # Info: Guardar registro de asistencia (transacción síncrona con bloqueo por empleado)
+        record, response = await sync_to_async(_store_attendance)(employee, sede)
+
+        # Warn: Manejar caso donde no se pudo guardar el registro
+        if not record:
+            return response
+
+        # Info: Retornar respuesta exitosa con datos del empleado
+        return _success(
+            user_message="Registro guardado correctamente",
+            data={"empleado": response},
+            log_message=f"Registro de asistencia guardado para empleado {employee_code} en sede {sede_id}"
+        )
+
+    except Exception as e:
+        # Warn: Captura cualquier excepción inesperada durante el proceso
+        return _error(
+            user_message="Ocurrió un problema inesperado. Contacte a Soporte",
+            code=500,
+            log_message="Excepción en saveRecordAsync",
+            exc=e
+        )
@@ -0,0 +1,327 @@
+import json
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import localtime
+from django.views.decorators.http import require_POST
+from control.models import Sede, RegistroAsistencia
+from control.services.roster_cache import roster_cache, EmpleadoRoster
+from control.services.attendance_state import get_attendance_states, save_attendance_states
+from control.services.daily_rollup import update_daily_rollups
+from .helpers import _success, _error, _warning, _parse_request_body
+from .assistance_records import _validate_sede_in_session, _plan_attendance, _is_duplicate_scan
+
+
+class _DebouncedScan(NamedTuple):
+    # Info: Escaneo descartado por la ventana anti-rebote; record es el registro existente que ya lo cubre
+    record: RegistroAsistencia
+
+
+# ---------------------
+# Guardar lote de registros
+# ---------------------
+
+
+@require_POST
+def saveRecordsBatch(request: HttpRequest) -> JsonResponse:
+    '''
+    Info:
+        Procesa un lote de escaneos almacenados por el lector QR (por ejemplo, durante una caída de red).
+        Cada escaneo trae su fecha/hora de lectura y una clave de idempotencia generada por el lector, de modo
+        que reenviar el mismo lote no duplica registros. Los escaneos se procesan en orden cronológico por
+        empleado con las mismas reglas de saveRecord y se insertan con bulk_create en una sola transacción.
+
+    Params:
+        request (HttpRequest): Objeto de solicitud HTTP con cuerpo {"registros": [{"codigo", "fecha_hora", "clave"}]}.
+
+    Return:
+        JsonResponse: Respuesta JSON con estructura {"status", "message", "data"} con el resultado de cada escaneo.
+    '''
+
+    try:
+        # Info: Parsear y validar el cuerpo de la solicitud
+        data, response = _parse_request_body(request, "saveRecordsBatch")
+        if response:
+            return response
+
+        sede_id = request.session.get("sede_id")
+
+        # Warn: Validar que la sede esté presente en la sesión
+        if response := _validate_sede_in_session(sede_id):
+            return response
+
+        # Warn: Validar estructura y tamaño del lote
+        scans, response = _validate_batch(data)
+        if response:
+            return response
+
+        # Info: Obtener la sede de la sesión
+        if not (sede := Sede.objects.filter(id=sede_id).first()):
+            return _error(
+                user_message="La sede seleccionada no existe",
+                code=404,
+                log_message=f"Sede no encontrada con ID {sede_id}"
+            )
+
+        # Info: Procesar el lote completo en una sola transacción
+        with transaction.atomic():
+            results = _ingest_scans(scans, sede)
+
+        # Info: Resumir resultados por estado
+        summary = {}
+        for result in results:
+            summary[result["estado"]] = summary.get(result["estado"], 0) + 1
+
+        return _success(
+            user_message=f"Lote procesado: {summary.get('guardado', 0)} de {len(results)} registros guardados",
+            data={"resumen": summary, "resultados": results},
+            log_message=f"Lote de {len(results)} escaneos procesado en sede {sede_id}: {summary}"
+        )
+
+    except Exception as e:
+        # Warn: Captura cualquier excepción inesperada durante el proceso
+        return _error(
+            user_message="Ocurrió un problema inesperado. Contacte a Soporte",
+            code=500,
+            log_message="Excepción en saveRecordsBatch",
+            exc=e
+        )
+
+
+# ---------------------
+# Helpers
+# ---------------------
+
+
+def _validate_batch(data: dict) -> tuple[list[dict] | None, JsonResponse | None]:
+    '''
+    Info:
+        Valida que el lote sea una lista no vacía de escaneos y que no supere el tamaño máximo permitido.
+
+    Params:
+        data (dict): Cuerpo de la solicitud con la clave "registros".
+
+    Return:
+        tuple: Tupla (escaneos, respuesta) donde respuesta es una advertencia si el lote no es válido.
+    '''
+
+    scans = data.get("registros") if isinstance(data, dict) else None
+    max_size = getattr(settings, "SCAN_BATCH_MAX_SIZE", 500)
+
+    # Warn: El lote debe ser una lista de escaneos
+    if not isinstance(scans, list) or not scans:
+        return None, _warning(
+            user_message="El lote de registros está vacío o no es válido",
+            code=400,
+            log_message="Lote vacío o inválido en saveRecordsBatch"
+        )
+
+    # Warn: Limitar el tamaño del lote
+    if len(scans) > max_size:
+        return None, _warning(
+            user_message=f"El lote supera el máximo de {max_size} registros",
+            code=413,
+            log_message=f"Lote de {len(scans)} escaneos rechazado en saveRecordsBatch"
+        )
+
+    return scans, None
+
+
+def _parse_scan_time(value: str) -> datetime | None:
+    '''
+    Info:
+        Convierte la fecha/hora ISO 8601 del escaneo a datetime con zona horaria; rechaza fechas futuras.
+
+    Params:
+        value (str): Fecha y hora del escaneo enviada por el lector.
+
+    Return:
+        datetime | None: Fecha y hora del escaneo, o None si no es válida.
+    '''
+
+    try:
+        scan_time = parse_datetime(str(value))
+    except ValueError:
+        return None
+
+    if scan_time is None:
+        return None
+
+    # Info: Fechas sin zona horaria se interpretan en la zona local
+    if timezone.is_naive(scan_time):
+        scan_time = timezone.make_aware(scan_time)
+
+    # Warn: Tolerar un pequeño desfase de reloj del lector
+    return scan_time if scan_time <= timezone.now() + timedelta(minutes=5) else None
+
+
+def _batch_result(key: str, status: str, message: str, record: RegistroAsistencia | None = None) -> dict:
+    '''
+    Info:
+        Construye el resultado de un escaneo del lote.
+
+    Params:
+        key (str): Clave de idempotencia del escaneo.
+        status (str): Estado del escaneo: "guardado" | "duplicado" | "omitido" | "error".
+        message (str): Mensaje descriptivo del resultado.
+        record (RegistroAsistencia | None): Registro asociado al escaneo, si existe.
+
+    Return:
+        dict: Resultado del escaneo.
+    '''
+
+    result = {"clave": key, "estado": status, "mensaje": message}
+    if record:
+        local_datetime = localtime(record.fecha_hora_registro)
+        result.update({
+            "registro_id": record.id,
+            "descripcion_registro": record.descripcion_registro,
+            "fecha_registro": local_datetime.strftime("%d/%m/%Y"),
+            "hora_registro": local_datetime.strftime("%I:%M:%S %p"),
+        })
+    return result
+
+
+def _ingest_scans(scans: list[dict], sede: Sede) -> list[dict]:
+    '''
+    Info:
+        Valida, ordena por empleado y fecha, aplica las reglas de registro e inserta masivamente los escaneos.
+        Debe ejecutarse dentro de una transacción.
+
+    Params:
+        scans (list[dict]): Escaneos del lote en el orden recibido.
+        sede (Sede): Sede donde se registran los escaneos.
+
+    Return:
+        list[dict]: Resultado de cada escaneo, en el mismo orden del lote.
+    '''
+
+    results: list[dict | None] = [None] * len(scans)
+    keys = [str(scan.get("clave") or "").strip() for scan in scans if isinstance(scan, dict)]
+
+    # Info: Registros ya guardados en envíos anteriores (una consulta para todo el lote)
+    existing = RegistroAsistencia.objects.in_bulk(keys, field_name="clave_idempotencia")
+    seen_keys = set()
+    accepted, items = [], []
+
+    for index, scan in enumerate(scans):
+        scan = scan if isinstance(scan, dict) else {}
+        key = str(scan.get("clave") or "").strip()
+        code = str(scan.get("codigo") or "").strip()
+
+        # Warn: La clave de idempotencia es obligatoria
+        if not key or len(key) > 64:
+            results[index] = _batch_result(key, "error", "Clave de idempotencia faltante o inválida")
+            continue
+
+        # Info: Escaneo ya procesado (reintento del lector o clave repetida en el lote)
+        if key in existing or key in seen_keys:
+            results[index] = _batch_result(key, "duplicado", "Registro procesado previamente", existing.get(key))
+            continue
+        seen_keys.add(key)
+
+        # Warn: Validar código y fecha/hora del escaneo
+        if not code.isdigit():
+            results[index] = _batch_result(key, "error", f"Código no válido: {code}")
+            continue
+
+        if not (scan_time := _parse_scan_time(scan.get("fecha_hora"))):
+            results[index] = _batch_result(key, "error", "Fecha y hora del escaneo no válida")
+            continue
+
+        # Warn: Validar empleado existente y activo
+        if not (employee := roster_cache.get(code)):
+            results[index] = _batch_result(key, "error", f"No se ha encontrado un empleado vinculado al código {code}")
+            continue
+
+        if not employee.activo:
+            results[index] = _batch_result(key, "error", "El empleado está inactivo y no puede registrar asistencias")
+            continue
+
+        accepted.append((index, key))
+        items.append((employee, scan_time, sede, key))
+
+    # Info: Aplicar reglas, insertar y traducir cada resultado al formato del lote
+    for (index, key), outcome in zip(accepted, _record_scans(items)):
+        if isinstance(outcome, RegistroAsistencia):
+            results[index] = _batch_result(key, "guardado", "Registro guardado correctamente", outcome)
+        elif isinstance(outcome, _DebouncedScan):
+            results[index] = _batch_result(key, "duplicado", "Escaneo repetido del último registro", outcome.record)
+        else:
+            payload = json.loads(outcome.content)
+            status = "omitido" if payload["status"] == "info" else "error"
+            results[index] = _batch_result(key, status, payload["message"])
+
+    return results
+
+
+def _record_scans(scans: list[tuple[EmpleadoRoster, datetime, Sede, str | None]]) -> list[RegistroAsistencia | _DebouncedScan | JsonResponse]:
+    '''
+    Info:
+        Aplica las reglas de registro a varios escaneos ya validados y los inserta con bulk_create.
+        Los escaneos se procesan por empleado en orden cronológico sobre su estado en memoria, por lo que
+        un mismo empleado puede tener varios escaneos en el lote. Debe ejecutarse dentro de una transacción:
+        los estados quedan bloqueados hasta su fin, serializando lotes concurrentes que comparten empleados.
+
+    Params:
+        scans (list[tuple]): Escaneos (empleado, fecha_hora, sede, clave_idempotencia) en el orden recibido.
+
+    Return:
+        list[RegistroAsistencia | _DebouncedScan | JsonResponse]: Por cada escaneo, el registro guardado,
+        el registro existente que lo cubre (ventana anti-rebote) o la respuesta informativa/de advertencia
+        que impidió guardarlo.
+    '''
+
+    outcomes: list[RegistroAsistencia | _DebouncedScan | JsonResponse | None] = [None] * len(scans)
+    pending: dict[int, list[int]] = {}
+    for index, (employee, _, _, _) in enumerate(scans):
+        pending.setdefault(employee.id, []).append(index)
+
+    # Info: Estados actuales (bloqueados) de los empleados del lote
+    states = get_attendance_states(list(pending), lock=True)
+    new_records, last_records = [], {}
+
+    # Info: Aplicar reglas por empleado en orden cronológico sobre el estado en memoria
+    for employee_id, indexes in pending.items():
+        state = states[employee_id]
+        for index in sorted(indexes, key=lambda i: scans[i][1]):
+            employee, scan_time, sede, key = scans[index]
+
+            # Info: Escaneo duplicado dentro de la ventana anti-rebote (incluye el reenvío con la misma hora):
+            # se reporta como tal, con el registro existente, antes de la validación de orden
+            if _is_duplicate_scan(state, scan_time) and (existing := last_records.get(employee_id) or RegistroAsistencia.objects.filter(pk=state.fk_ultimo_registro_id).first()):
+                outcomes[index] = _DebouncedScan(existing)
+                continue
+
+            # Warn: Un escaneo anterior al último registro alteraría la secuencia Entrada/Salida
+            if state.ultima_fecha_hora and scan_time <= state.ultima_fecha_hora:
+                outcomes[index] = _warning(
+                    user_message="El escaneo es anterior al último registro del empleado",
+                    code=409,
+                    log_message=f"Escaneo fuera de orden para empleado {employee.numero_documento}"
+                )
+                continue
+
+            records, response = _plan_attendance(employee, state, scan_time, sede)
+            if response:
+                outcomes[index] = response
+                continue
+
+            records[-1].clave_idempotencia = key
+            new_records.extend(records)
+            outcomes[index] = last_records[employee_id] = records[-1]
+
+    # Info: Inserción masiva de registros (incluye salidas automáticas) y actualización de estados
+    RegistroAsistencia.objects.bulk_create(new_records, batch_size=500)
+
+    # Info: Completar IDs del último registro y de la entrada abierta tras la inserción
+    for employee_id, record in last_records.items():
+        states[employee_id].apply(record)
+    save_attendance_states([states[employee_id] for employee_id in last_records])
+    update_daily_rollups(new_records)
+
+    return outcomes
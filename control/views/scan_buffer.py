@@ -0,0 +1,208 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from control.models import Sede, RegistroAsistencia
+from control.services.roster_cache import EmpleadoRoster
+from .helpers import _error
+
+
+# Configuración del logger
+logger = logging.getLogger(__name__)
+
+
+# ---------------------
+# Buffer de escritura diferida
+# ---------------------
+
+
+class ScanBufferFull(Exception):
+    # Info: El buffer alcanzó su capacidad máxima (contrapresión hacia el lector QR)
+    pass
+
+
+class PendingScan:
+    # Info: Escaneo validado en espera de que su lote sea confirmado en la base de datos
+    __slots__ = ("employee", "scan_time", "sede", "result", "_done")
+
+    def __init__(self, employee: EmpleadoRoster, scan_time: datetime, sede: Sede) -> None:
+        self.employee = employee
+        self.scan_time = scan_time
+        self.sede = sede
+        self.result: RegistroAsistencia | JsonResponse | None = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        # Info: Espera a que el lote del escaneo sea confirmado; False si se agota el tiempo
+        return self._done.wait(timeout)
+
+    def resolve(self, result: RegistroAsistencia | JsonResponse) -> None:
+        self.result = result
+        self._done.set()
+
+
+class ScanBuffer:
+    '''
+    Info:
+        Cola en memoria del proceso para el modo de escritura diferida de saveRecord (SCAN_WRITE_BEHIND).
+        Un único hilo escritor agrupa los escaneos cada flush_interval segundos o cada max_batch escaneos
+        y los inserta con bulk_create en una transacción; cada solicitud espera a que su lote se confirme.
+
+        Al existir un solo escritor por proceso y asignarse la hora del escaneo al encolar (bajo lock),
+        el orden de la cola coincide con el orden cronológico y ningún lote ve un estado desactualizado.
+    '''
+
+    def __init__(self, enabled: bool = True, max_queue: int = 1000, max_batch: int = 100, flush_interval: float = 0.02, wait_timeout: float = 10, autostart: bool = True) -> None:
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.wait_timeout = wait_timeout
+        self.autostart = autostart
+        self._queue: queue.Queue[PendingScan] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._metrics = {
+            "enqueued": 0,
+            "rejected": 0,
+            "batches": 0,
+            "flushed": 0,
+            "failed_batches": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    def submit(self, employee: EmpleadoRoster, sede: Sede) -> PendingScan:
+        '''
+        Info:
+            Encola un escaneo validado, asignándole la hora actual como hora de registro.
+
+        Params:
+            employee (EmpleadoRoster): Empleado activo que realiza el escaneo.
+            sede (Sede): Sede del lector QR.
+
+        Return:
+            PendingScan: Escaneo pendiente; usar wait() para esperar la confirmación de su lote.
+        '''
+
+        self._ensure_worker()
+
+        # Info: La hora se asigna bajo lock para que el orden de la cola sea cronológico
+        with self._lock:
+            pending = PendingScan(employee, timezone.now(), sede)
+            try:
+                self._queue.put_nowait(pending)
+            except queue.Full:
+                self._metrics["rejected"] += 1
+                raise ScanBufferFull()
+            self._metrics["enqueued"] += 1
+
+        return pending
+
+    def flush(self) -> int:
+        '''
+        Info:
+            Procesa de inmediato, en el hilo actual, hasta max_batch escaneos encolados.
+
+        Return:
+            int: Cantidad de escaneos procesados.
+        '''
+
+        batch = []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if batch:
+            self._process(batch)
+        return len(batch)
+
+    def stats(self) -> dict:
+        '''
+        Info:
+            Retorna las métricas del buffer: profundidad de la cola, rechazos y latencia de escritura por lote.
+
+        Return:
+            dict: Métricas acumuladas del buffer.
+        '''
+
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["queue_depth"] = self._queue.qsize()
+        metrics["avg_flush_ms"] = round(metrics["total_flush_ms"] / metrics["batches"], 3) if metrics["batches"] else 0.0
+        return metrics
+
+    def _ensure_worker(self) -> None:
+        # Info: Inicia el hilo escritor la primera vez que se encola un escaneo
+        if not self.autostart or (self._worker and self._worker.is_alive()):
+            return
+        with self._lock:
+            if not (self._worker and self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="scan-buffer-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        # Info: Agrupa escaneos hasta completar max_batch o agotar flush_interval desde el primero
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            # Info: El hilo escritor mantiene su propia conexión; se renueva si quedó obsoleta
+            close_old_connections()
+            self._process(batch)
+
+    def _process(self, batch: list[PendingScan]) -> None:
+        # Info: Importación diferida: batch_records depende de assistance_records, que usa este buffer
+        from .batch_records import _record_scans, _DebouncedScan
+
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                outcomes = _record_scans([(p.employee, p.scan_time, p.sede, None) for p in batch])
+            # Info: Un escaneo repetido responde con el registro existente, igual que saveRecord sin buffer
+            outcomes = [outcome.record if isinstance(outcome, _DebouncedScan) else outcome for outcome in outcomes]
+        except Exception as e:
+            # Warn: Un fallo revierte el lote completo; todas sus solicitudes reciben error
+            with self._lock:
+                self._metrics["failed_batches"] += 1
+            # Info: Una respuesta por solicitud (cada hilo recibe su propio JsonResponse); el error se registra una vez
+            outcomes = [_error(
+                user_message="Ocurrió un problema inesperado. Contacte a Soporte",
+                code=500,
+                log_message=f"Excepción al escribir lote de {len(batch)} escaneos" if n == 0 else None,
+                exc=e if n == 0 else None
+            ) for n in range(len(batch))]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._metrics["batches"] += 1
+            self._metrics["flushed"] += len(batch)
+            self._metrics["last_flush_ms"] = round(elapsed_ms, 3)
+            self._metrics["max_flush_ms"] = round(max(self._metrics["max_flush_ms"], elapsed_ms), 3)
+            self._metrics["total_flush_ms"] += elapsed_ms
+
+        logger.debug(f"Lote de {len(batch)} escaneos escrito en {elapsed_ms:.1f} ms")
+        for pending, outcome in zip(batch, outcomes):
+            pending.resolve(outcome)
+
+
+# Info: Instancia compartida por el proceso
+scan_buffer = ScanBuffer(
+    enabled=getattr(settings, "SCAN_WRITE_BEHIND", False),
+    max_queue=getattr(settings, "SCAN_BUFFER_MAX_QUEUE", 1000),
+    max_batch=getattr(settings, "SCAN_BUFFER_MAX_BATCH", 100),
+    flush_interval=getattr(settings, "SCAN_BUFFER_FLUSH_MS", 20) / 1000,
+    wait_timeout=getattr(settings, "SCAN_BUFFER_WAIT_TIMEOUT", 10),
+)
@@ -181,6 +181,59 @@ LOGGING = {
     },
 }
 
+# Caché de empleados para el lector QR (roster en memoria del proceso)
+ROSTER_CACHE_TTL = config("ROSTER_CACHE_TTL", default=300, cast=int)  # segundos
+ROSTER_CACHE_MAX_SIZE = config("ROSTER_CACHE_MAX_SIZE", default=5000, cast=int)  # empleados
+
+# Máximo de escaneos por lote en la ingesta sin conexión de los lectores QR
+SCAN_BATCH_MAX_SIZE = config("SCAN_BATCH_MAX_SIZE", default=500, cast=int)
+
+# Ventana anti-rebote: un escaneo del mismo empleado dentro de este tiempo retorna el registro existente
+SCAN_DEBOUNCE_SECONDS = config("SCAN_DEBOUNCE_SECONDS", default=10, cast=int)
+
+# Vistas asíncronas del lector QR (activar solo en despliegues ASGI, ver core_asistencia/asgi.py)
+KIOSK_ASYNC_VIEWS = config("KIOSK_ASYNC_VIEWS", default=False, cast=bool)
+
+# Escritura diferida de escaneos: agrupa los registros de saveRecord en inserciones por lote
+SCAN_WRITE_BEHIND = config("SCAN_WRITE_BEHIND", default=False, cast=bool)
+SCAN_BUFFER_MAX_QUEUE = config("SCAN_BUFFER_MAX_QUEUE", default=1000, cast=int)  # escaneos en espera
+SCAN_BUFFER_MAX_BATCH = config("SCAN_BUFFER_MAX_BATCH", default=100, cast=int)  # escaneos por lote
+SCAN_BUFFER_FLUSH_MS = config("SCAN_BUFFER_FLUSH_MS", default=20, cast=int)  # milisegundos
+SCAN_BUFFER_WAIT_TIMEOUT = config("SCAN_BUFFER_WAIT_TIMEOUT", default=10, cast=int)  # segundos
+
+# Conteos del listado de registros (DataTables): memoria en segundos y tope del modo "al menos N"
+RECORD_COUNT_CACHE_TTL = config("RECORD_COUNT_CACHE_TTL", default=30, cast=int)
+RECORD_COUNT_CAP = config("RECORD_COUNT_CAP", default=10000, cast=int)
+
+# Tope de registros por página del listado y de los registros del día (también para length=-1)
+RECORD_PAGE_MAX_LENGTH = config("RECORD_PAGE_MAX_LENGTH", default=500, cast=int)
+
+# Caché de imágenes QR: entradas en memoria, directorio en disco opcional (vacío = solo memoria) y max-age del navegador
+QR_CACHE_MAX_SIZE = config("QR_CACHE_MAX_SIZE", default=2000, cast=int)
+QR_CACHE_DIR = config("QR_CACHE_DIR", default="")
+QR_CACHE_MAX_AGE = config("QR_CACHE_MAX_AGE", default=86400, cast=int)  # segundos
+
+# Generación masiva de códigos QR: procesos del pool de dibujo (0 = núcleos disponibles, 1 = sin pool)
+QR_SHEET_WORKERS = config("QR_SHEET_WORKERS", default=0, cast=int)
+
+# Eventos en vivo de registros (SSE): consulta de respaldo, duración de cada flujo y cola por cliente
+RECORD_EVENTS_POLL_SECONDS = config("RECORD_EVENTS_POLL_SECONDS", default=5, cast=int)  # segundos
+RECORD_EVENTS_MAX_SECONDS = config("RECORD_EVENTS_MAX_SECONDS", default=300, cast=int)  # segundos
+RECORD_EVENTS_MAX_QUEUE = config("RECORD_EVENTS_MAX_QUEUE", default=100, cast=int)  # grupos de eventos
+# Ventana de registros recientes que cada consulta de respaldo vuelve a leer (transacciones confirmadas fuera de orden)
+RECORD_EVENTS_OVERLAP_SECONDS = config("RECORD_EVENTS_OVERLAP_SECONDS", default=30, cast=int)  # segundos
+# Flujos SSE simultáneos por proceso (cada uno ocupa un hilo de waitress); 0 = sin límite
+RECORD_EVENTS_MAX_STREAMS = config("RECORD_EVENTS_MAX_STREAMS", default=2, cast=int)
+
+# Cola de correos QR: hilo en el proceso web (opcional; por defecto el worker es el comando send_qr_emails --loop)
+QR_MAIL_WORKER = config("QR_MAIL_WORKER", default=False, cast=bool)
+QR_MAIL_POLL_SECONDS = config("QR_MAIL_POLL_SECONDS", default=30, cast=int)  # segundos
+QR_MAIL_BATCH_SIZE = config("QR_MAIL_BATCH_SIZE", default=50, cast=int)  # correos por conexión
+QR_MAIL_MAX_ATTEMPTS = config("QR_MAIL_MAX_ATTEMPTS", default=5, cast=int)
+QR_MAIL_RETRY_SECONDS = config("QR_MAIL_RETRY_SECONDS", default=60, cast=int)  # segundos, el doble en cada intento
+# Reserva de cada envío; se renueva antes de cada mensaje y debe superar lo que tarda un envío SMTP
+QR_MAIL_SEND_TIMEOUT = config("QR_MAIL_SEND_TIMEOUT", default=300, cast=int)  # segundos
+
 # Session settings
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 LOGIN_URL = 'appLobbyRender'
@@ -188,7 +241,9 @@ LOGIN_URL = 'appLobbyRender'
 
 # Configuración de correo (Google Workspace / Gmail)
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Info: EMAIL_BACKEND configurable para pruebas (locmem o filebased con EMAIL_FILE_PATH)
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")
+EMAIL_FILE_PATH = config("EMAIL_FILE_PATH", default=str(BASE_DIR / "tmp" / "emails"))
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True